@@ -0,0 +1,180 @@
+import datetime
+import hashlib
+import time
+import urllib
+from email.utils import formatdate
+
+from django.conf import settings
+from django.core.urlresolvers import Resolver404
+from django.http import HttpResponsePermanentRedirect
+from django.http.request import split_domain_port, validate_host
+from django.utils.cache import patch_vary_headers
+from django.utils.encoding import force_str, force_text
+
+from django_statsd.clients import statsd
+
+from bedrock.base.urlresolvers import get_locale_table, split_path
+from bedrock.redirects.util import get_resolver
+
+
+class LocaleRedirector(object):
+    """
+    WSGI middleware redirecting requests for paths without a locale to the
+    path with the best locale for the user before Django handles them.
+
+    The redirects are the ones `LocaleURLMiddleware` would send, with the
+    headers added by the response middleware in `middleware_classes`. If the
+    site uses any other middleware the redirector does nothing. Requests
+    other middleware in the list would answer themselves, e.g. paths matching
+    a redirect or cross-origin requests, are passed on to Django.
+    """
+    middleware_classes = [
+        'sslify.middleware.SSLifyMiddleware',
+        'bedrock.mozorg.middleware.MozorgRequestTimingMiddleware',
+        'django_statsd.middleware.GraphiteMiddleware',
+        'corsheaders.middleware.CorsMiddleware',
+        'bedrock.mozorg.middleware.VaryNoCacheMiddleware',
+        'bedrock.base.middleware.BasicAuthMiddleware',
+        'bedrock.redirects.middleware.RedirectsMiddleware',
+        'bedrock.tabzilla.middleware.TabzillaLocaleURLMiddleware',
+        'commonware.middleware.RobotsTagHeader',
+        'bedrock.mozorg.middleware.ClacksOverheadMiddleware',
+        'bedrock.mozorg.middleware.HostnameMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'bedrock.mozorg.middleware.CacheMiddleware',
+        'dnt.middleware.DoNotTrackMiddleware',
+    ]
+    frame_options_middleware = 'commonware.middleware.FrameOptionsHeader'
+
+    def __init__(self, application):
+        self.application = application
+        middleware = list(settings.MIDDLEWARE_CLASSES)
+        self.frame_options = middleware[-1:] == [self.frame_options_middleware]
+        if self.frame_options:
+            middleware.pop()
+
+        self.enabled = (middleware == self.middleware_classes and
+                        not settings.BASIC_AUTH_CREDS)
+        self.resolver = get_resolver()
+
+        if settings.ENABLE_HOSTNAME_MIDDLEWARE:
+            values = [getattr(settings, x) for x in ['HOSTNAME', 'DEIS_APP', 'DEIS_DOMAIN']]
+            self.backend_server = '.'.join(x for x in values if x)
+        else:
+            self.backend_server = None
+
+    def __call__(self, environ, start_response):
+        response = self.get_response(environ) if self.enabled else None
+        if response is None:
+            return self.application(environ, start_response)
+
+        statsd.incr('response.%s' % response.status_code)
+        status = '%s %s' % (response.status_code, response.reason_phrase)
+        start_response(force_str(status), [(str(k), str(v)) for k, v in response.items()])
+        return [response.content]
+
+    def get_scheme(self, environ):
+        """Return the scheme of the request like `HttpRequest.scheme`."""
+        if settings.SECURE_PROXY_SSL_HEADER:
+            header, value = settings.SECURE_PROXY_SSL_HEADER
+            if environ.get(header) == value:
+                return 'https'
+
+        return environ.get('wsgi.url_scheme')
+
+    def get_host(self, environ, scheme):
+        """Return the host of the request like `HttpRequest.get_host`, or None if it isn't allowed."""
+        if settings.USE_X_FORWARDED_HOST and 'HTTP_X_FORWARDED_HOST' in environ:
+            host = environ['HTTP_X_FORWARDED_HOST']
+        elif 'HTTP_HOST' in environ:
+            host = environ['HTTP_HOST']
+        else:
+            host = environ['SERVER_NAME']
+            server_port = str(environ['SERVER_PORT'])
+            if server_port != ('443' if scheme == 'https' else '80'):
+                host = '%s:%s' % (host, server_port)
+
+        if settings.DEBUG:
+            return host
+
+        domain, port = split_domain_port(host)
+        if domain and validate_host(domain, settings.ALLOWED_HOSTS):
+            return host
+
+    def get_response(self, environ):
+        """Return the redirect for the request, or None to let Django answer it."""
+        if (environ.get('REQUEST_METHOD') not in ('GET', 'HEAD') or
+                environ.get('SCRIPT_NAME') or 'HTTP_ORIGIN' in environ or
+                'lang' in environ.get('QUERY_STRING', '')):
+            return None
+
+        scheme = self.get_scheme(environ)
+        if not settings.SSLIFY_DISABLE and scheme != 'https':
+            return None
+
+        # Django makes the redirect URL absolute and refuses unknown hosts
+        host = self.get_host(environ, scheme)
+        if not host:
+            return None
+
+        path = environ.get('PATH_INFO') or '/'
+        try:
+            path.decode('ascii')
+        except UnicodeDecodeError:
+            return None
+
+        locale, shortened_path = split_path(path)
+        if (locale or 'tabzilla' in path or
+                shortened_path.partition('/')[0] in settings.SUPPORTED_NONLOCALES):
+            return None
+
+        try:
+            self.resolver.resolve(path)
+        except Resolver404:
+            pass
+        else:
+            return None
+
+        accept_lang = environ.get('HTTP_ACCEPT_LANGUAGE')
+        locale = accept_lang and get_locale_table().best_language(accept_lang)
+        full_path = urllib.quote('/'.join(['', locale or settings.LANGUAGE_CODE,
+                                           shortened_path]))
+        query_string = environ.get('QUERY_STRING', '')
+        if query_string:
+            full_path = '?'.join([full_path, force_text(query_string, errors='ignore')])
+
+        response = HttpResponsePermanentRedirect(full_path)
+        if split_path(full_path)[0]:
+            response['Vary'] = 'Accept-Language'
+
+        response['Location'] = '%s://%s%s' % (scheme, host, full_path)
+
+        self.process_response(path, response)
+        return response
+
+    def process_response(self, path, response):
+        """Add the headers the response middleware would add to the redirect."""
+        if self.frame_options:
+            response['X-Frame-Options'] = 'DENY'
+
+        patch_vary_headers(response, ['DNT'])
+
+        d = datetime.datetime.now() + datetime.timedelta(minutes=10)
+        response['Cache-Control'] = 'max-age=600'
+        response['Expires'] = formatdate(timeval=time.mktime(d.timetuple()),
+                                         localtime=False, usegmt=True)
+
+        if settings.USE_ETAGS:
+            response['ETag'] = '"%s"' % hashlib.md5(response.content).hexdigest()
+
+        if self.backend_server is not None:
+            response['X-Backend-Server'] = self.backend_server
+
+        response['X-Robots-Tag'] = getattr(settings, 'X_ROBOTS_DEFAULT', 'noodp')
+
+        if settings.ENABLE_VARY_NOCACHE_MIDDLEWARE and path != '/' and not any(
+                path.startswith(x) for x in settings.VARY_NOCACHE_EXEMPT_URL_PREFIXES):
+            del response['vary']
+            del response['expires']
+            response['Cache-Control'] = 'max-age=0'
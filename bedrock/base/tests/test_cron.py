@@ -0,0 +1,136 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import imp
+import multiprocessing
+import os
+import time
+
+from django.conf import settings
+from django.test import TestCase
+
+from mock import patch
+from nose.plugins.skip import SkipTest
+from nose.tools import eq_, ok_
+
+try:
+    cron = imp.load_source('bedrock_clock', os.path.join(settings.ROOT, 'bin', 'cron.py'))
+except ImportError:
+    # apscheduler is only in the docker requirements
+    cron = None
+
+
+def succeed(command, conn):
+    conn.send(None)
+    conn.close()
+
+
+def hang(command, conn):
+    time.sleep(60)
+
+
+def die(command, conn):
+    os._exit(3)
+
+
+def use_pool(command, conn):
+    pool = multiprocessing.Pool(2)
+    try:
+        conn.send(None if pool.map(abs, [-1, -2]) == [1, 2] else 'wrong results')
+    finally:
+        pool.terminate()
+
+
+class TestCommandRunner(TestCase):
+    def setUp(self):
+        if cron is None:
+            raise SkipTest
+        # Django is already set up by the tests
+        patcher = patch.object(cron, 'setup_django')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.runner = cron.CommandRunner(timeout=5)
+
+    def assert_run_fails(self, command, message):
+        try:
+            self.runner.run(command)
+        except RuntimeError as e:
+            ok_(message in str(e), str(e))
+        else:
+            raise AssertionError('{} did not fail'.format(command))
+
+    def test_run(self):
+        with patch.object(cron, 'run_command', succeed):
+            self.runner.run('dude')
+
+    def test_error(self):
+        """The traceback of the error in the job should be raised in the clock."""
+        self.assert_run_fails('the_dude_abides', 'Unknown command')
+
+    def test_exit(self):
+        with patch.object(cron, 'run_command', die):
+            self.assert_run_fails('dude', 'exited with code 3')
+
+    def test_timeout(self):
+        """Jobs running too long should be terminated."""
+        self.runner.timeout = 0.5
+        start_time = time.time()
+        with patch.object(cron, 'run_command', hang):
+            self.assert_run_fails('dude', 'timed out after 0.5s')
+        ok_(time.time() - start_time < 10)
+
+    def test_job_processes(self):
+        """Jobs should be able to start processes of their own."""
+        with patch.object(cron, 'run_command', use_pool):
+            self.runner.run('dude')
+
+    def test_django_set_up_once(self):
+        with patch.object(cron, 'run_command', succeed):
+            self.runner.run('dude')
+            self.runner.run('dude')
+        eq_(cron.setup_django.call_count, 1)
+
+
+class TestScheduledJob(TestCase):
+    def setUp(self):
+        if cron is None:
+            raise SkipTest
+        for patcher in [patch.object(cron, 'IN_PROCESS', True),
+                        patch.object(cron, 'setup_django'),
+                        patch.object(cron, 'runner', cron.CommandRunner(timeout=5)),
+                        patch.object(cron, 'check_call'),
+                        patch('django_statsd.clients.statsd')]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def job(self, callback):
+        return cron.scheduled_job('interval', minutes=5)(callback)
+
+    def test_subprocess_job_metrics(self):
+        """Jobs run with manage.py should be recorded before any job sets Django up."""
+        from django_statsd.clients import statsd
+
+        def rnasync():
+            cron.call_command('rnasync', in_process=False)
+
+        self.job(rnasync)()
+        ok_(cron.check_call.called)
+        eq_(cron.setup_django.call_count, 1)
+        statsd.incr.assert_called_with('cron.rnasync.success')
+
+    def test_metrics_errors(self):
+        """Failing to send metrics should not fail the job or hide its error."""
+        from django_statsd.clients import statsd
+
+        statsd.timing.side_effect = ValueError('statsd')
+
+        def walter():
+            pass
+
+        def donny():
+            raise KeyError('donny')
+
+        self.job(walter)()
+        with self.assertRaises(KeyError):
+            self.job(donny)()
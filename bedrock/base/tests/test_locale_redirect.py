@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.test import TestCase, RequestFactory
+from django.test.utils import override_settings
+
+from mock import Mock
+from nose.tools import eq_, ok_
+
+from bedrock.base.locale_redirect import LocaleRedirector
+
+
+class TestLocaleRedirector(TestCase):
+    def setUp(self):
+        self.rf = RequestFactory()
+        self.app = Mock(return_value=['django'])
+
+    def call(self, path, **extra):
+        redirector = LocaleRedirector(self.app)
+        environ = self.rf.get(path, **extra).environ
+        start_response = Mock()
+        body = redirector(environ, start_response)
+        if not start_response.called:
+            return None
+
+        status, headers = start_response.call_args[0]
+        return status, dict(headers), body
+
+    def assert_same_as_django(self, path, **extra):
+        response = self.client.get(path, **extra)
+        status, headers, body = self.call(path, **extra)
+        eq_(status, '301 MOVED PERMANENTLY')
+        eq_(response.status_code, 301)
+        eq_(set(headers), set(response._headers[h][0] for h in response._headers))
+        for name, value in headers.items():
+            if name != 'Expires':
+                eq_(value, response[name])
+
+        eq_(body, [response.content])
+        ok_(not self.app.called)
+
+    def test_same_as_django(self):
+        """Redirects should have the headers Django sends."""
+        self.assert_same_as_django('/')
+        self.assert_same_as_django('/', HTTP_ACCEPT_LANGUAGE='de,fr;q=0.8')
+        self.assert_same_as_django('/firefox/', HTTP_ACCEPT_LANGUAGE='fr-FR,fr;q=0.8')
+        self.assert_same_as_django('/the/dude/', HTTP_ACCEPT_LANGUAGE='xx')
+        self.assert_same_as_django('/the/dude/?walter=sobchak', HTTP_ACCEPT_LANGUAGE='pt-BR')
+        self.assert_same_as_django('/the dude/abides', HTTP_DNT='1')
+
+    @override_settings(ENABLE_HOSTNAME_MIDDLEWARE=True, DEIS_APP='bedrock',
+                       USE_ETAGS=True)
+    def test_same_as_django_settings(self):
+        self.assert_same_as_django('/')
+        self.assert_same_as_django('/firefox/')
+
+    def test_passed_on(self):
+        """Requests with a locale or answered by other middleware should go to Django."""
+        for path, extra in [
+            ('/en-US/firefox/', {}),
+            ('/fr/', {}),
+            ('/robots.txt', {}),
+            ('/media/img/favicon.ico', {}),
+            ('/tabzilla/tabzilla.js', {}),
+            ('/firefox/?lang=de', {}),
+            ('/newsletter/', {'HTTP_ORIGIN': 'https://example.com'}),
+        ]:
+            eq_(self.call(path, **extra), None)
+
+        eq_(self.app.call_count, 7)
+
+    def test_passed_on_redirects(self):
+        """Paths of the redirects app should go to Django."""
+        redirector = LocaleRedirector(self.app)
+        redirector.resolver = Mock()
+        redirector(self.rf.get('/the/dude/').environ, Mock())
+        ok_(self.app.called)
+
+    def test_passed_on_post(self):
+        redirector = LocaleRedirector(self.app)
+        redirector(self.rf.post('/the/dude/').environ, Mock())
+        ok_(self.app.called)
+
+    @override_settings(SSLIFY_DISABLE=False,
+                       SECURE_PROXY_SSL_HEADER=('HTTP_X_FORWARDED_PROTO', 'https'))
+    def test_passed_on_insecure(self):
+        """Requests SSLify will redirect should go to Django."""
+        eq_(self.call('/the/dude/'), None)
+        status, headers, body = self.call('/the/dude/', HTTP_X_FORWARDED_PROTO='https')
+        ok_(headers['Location'].startswith('https://'))
+        ok_(headers['Location'].endswith('/en-US/the/dude/'))
+
+    @override_settings(ALLOWED_HOSTS=['www.mozilla.org'], DEBUG=False)
+    def test_passed_on_unknown_host(self):
+        """Requests Django will refuse should go to Django."""
+        eq_(self.call('/the/dude/', HTTP_HOST='example.com'), None)
+        status, headers, body = self.call('/the/dude/', HTTP_HOST='www.mozilla.org')
+        eq_(headers['Location'], 'http://www.mozilla.org/en-US/the/dude/')
+
+    def test_disabled_with_other_middleware(self):
+        middleware = list(settings.MIDDLEWARE_CLASSES) + ['other.Middleware']
+        with override_settings(MIDDLEWARE_CLASSES=middleware):
+            eq_(self.call('/the/dude/'), None)
+
+        with override_settings(BASIC_AUTH_CREDS='thedude:thewalrus'):
+            eq_(self.call('/the/dude/'), None)
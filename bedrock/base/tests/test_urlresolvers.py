@@ -5,6 +5,7 @@ from django.test import TestCase
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
 
+from bedrock.base import urlresolvers
 from bedrock.base.urlresolvers import reverse, split_path, Prefixer
 from mock import patch, Mock
 from nose.tools import eq_, ok_
@@ -22,6 +23,10 @@ def test_split_path():
         ('En-uS/some/action', ('en-US', 'some/action')),
         # Unsupported languages return a blank language
         ('unsupported/some/action', ('', 'unsupported/some/action')),
+        # Short locales return their canonical locale
+        ('es/some/action', ('es-ES', 'some/action')),
+        # Unsupported regions return a locale of the language
+        ('pt-XX/some/action', (split_path('pt')[0], 'some/action')),
     ]
 
     for tc in testcases:
@@ -171,3 +176,72 @@ class TestPrefixer(TestCase):
         request = self.factory.get('/')
         prefixer = Prefixer(request)
         eq_(prefixer.get_best_language('en; q=1,'), None)
+
+
+# Accept-Language headers in the proportions they were sent to the site
+ACCEPT_LANGUAGES = (
+    ['en-US,en;q=0.5'] * 40 +
+    ['en-US,en;q=0.8'] * 15 +
+    ['de-DE,de;q=0.8,en-US;q=0.6,en;q=0.4'] * 8 +
+    ['fr-FR,fr;q=0.8,en-US;q=0.6,en;q=0.4'] * 6 +
+    ['es-ES,es;q=0.8,en;q=0.6'] * 5 +
+    ['ru-RU,ru;q=0.8,en-US;q=0.5,en;q=0.3'] * 5 +
+    ['pt-BR,pt;q=0.8,en-US;q=0.6,en;q=0.4'] * 4 +
+    ['ja,en-US;q=0.7,en;q=0.3'] * 3 +
+    ['zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3'] * 3 +
+    ['pl,en-US;q=0.7,en;q=0.3'] * 2 +
+    ['it-IT,it;q=0.8,en-US;q=0.6,en;q=0.4'] * 2 +
+    ['en-GB,en;q=0.5', 'tr-TR,tr;q=0.8,en-US;q=0.5,en;q=0.3', 'nl,en-US;q=0.7,en;q=0.3',
+     'es-MX,es;q=0.8,en-US;q=0.5,en;q=0.3', 'sv-SE,sv;q=0.8,en-US;q=0.5,en;q=0.3',
+     'ko-KR,ko;q=0.8,en-US;q=0.6,en;q=0.4', 'id,en-US;q=0.7,en;q=0.3', 'xx-YY',
+     '*', 'en-US,en;q=0.9,de;q=0.8,fr;q=0.7,es;q=0.6,it;q=0.5,ja;q=0.4,ru;q=0.3']
+)
+
+
+class TestLocaleTable(TestCase):
+    def setUp(self):
+        urlresolvers._locale_table = None
+
+    @override_settings(LANGUAGE_URL_MAP={'en-us': 'en-US', 'de': 'de'})
+    def test_rebuilt_when_settings_change(self):
+        table = urlresolvers.get_locale_table()
+        eq_(table.find('de'), 'de')
+        self.assertIs(urlresolvers.get_locale_table(), table)
+
+        with override_settings(LANGUAGE_URL_MAP={'en-us': 'en-US'}):
+            eq_(urlresolvers.get_locale_table().find('de'), '')
+
+        eq_(urlresolvers.get_locale_table().find('de'), 'de')
+
+    @patch('bedrock.base.urlresolvers.parse_accept_lang_header',
+           wraps=urlresolvers.parse_accept_lang_header)
+    def test_best_language_cached(self, parse_mock):
+        table = urlresolvers.get_locale_table()
+        eq_(table.best_language('de-DE,de;q=0.8'), 'de')
+        eq_(table.best_language('de-DE,de;q=0.8'), 'de')
+        eq_(table.best_language('xx-YY'), None)
+        eq_(table.best_language('xx-YY'), None)
+        eq_(parse_mock.call_count, 2)
+
+    @patch.object(urlresolvers.LocaleTable, 'max_accept_languages', 2)
+    def test_best_language_least_recently_used(self):
+        table = urlresolvers.get_locale_table()
+        table.best_language('de')
+        table.best_language('fr')
+        table.best_language('de')
+        table.best_language('es')
+        eq_(table.accept_languages.keys(), ['de', 'es'])
+
+    def test_best_language_recorded(self):
+        """Recorded headers should be looked up instead of matched to every locale again."""
+        prefixer = Prefixer(RequestFactory().get('/'))
+        best = [prefixer.get_best_language(accept_lang) for accept_lang in ACCEPT_LANGUAGES]
+        table = urlresolvers.get_locale_table()
+        for accept_lang, lang in zip(ACCEPT_LANGUAGES, best):
+            eq_(table.accept_languages[accept_lang], lang)
+
+        with patch('bedrock.base.urlresolvers.parse_accept_lang_header') as parse_mock:
+            eq_([prefixer.get_best_language(accept_lang) for accept_lang in ACCEPT_LANGUAGES],
+                best)
+
+        ok_(not parse_mock.called)
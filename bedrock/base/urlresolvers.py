@@ -1,4 +1,5 @@
-from threading import local
+from collections import OrderedDict
+from threading import Lock, local
 
 from django.conf import settings
 from django.core.urlresolvers import reverse as django_reverse
@@ -65,6 +66,85 @@ def find_supported(test):
             x.split('-', 1)[0] == test.lower().split('-', 1)[0]]
 
 
+def _get_locale_settings():
+    return (settings.LANGUAGE_URL_MAP, settings.CANONICAL_LOCALES, settings.DEV,
+            settings.DEV_LANGUAGES, settings.PROD_LANGUAGES)
+
+
+class LocaleTable(object):
+    """
+    The locales of the site, resolved from the settings once.
+
+    `locales` is `FULL_LANGUAGE_MAP` and `by_prefix` maps the primary subtag
+    of every locale to the first locale `find_supported` would return for it.
+    The best locale for the most recent Accept-Language headers is kept too.
+    """
+    max_accept_languages = 1000
+
+    def __init__(self):
+        self.settings = _get_locale_settings()
+        self.locales = _get_language_map()
+        self.by_prefix = {}
+        for code, locale in settings.LANGUAGE_URL_MAP.items():
+            self.by_prefix.setdefault(code.split('-', 1)[0], locale)
+
+        self.accept_languages = OrderedDict()
+        self.accept_languages_lock = Lock()
+
+    def is_current(self):
+        """Return whether the locale settings are still the ones in the table."""
+        return all(old is new for old, new in
+                   zip(self.settings, _get_locale_settings()))
+
+    def find(self, lang):
+        """Return the locale for a locale code from a URL, or ''."""
+        lang = lang.lower()
+        return (self.locales.get(lang) or
+                self.by_prefix.get(lang.split('-', 1)[0], ''))
+
+    def best_language(self, accept_lang):
+        """Return the best locale for an Accept-Language header, or None."""
+        with self.accept_languages_lock:
+            try:
+                best = self.accept_languages.pop(accept_lang)
+            except KeyError:
+                pass
+            else:
+                self.accept_languages[accept_lang] = best
+                return best
+
+        best = None
+        for lang, _ in parse_accept_lang_header(accept_lang):
+            lang = lang.lower()
+            if lang in self.locales:
+                best = self.locales[lang]
+                break
+            pre = lang.split('-')[0]
+            if pre in self.locales:
+                best = self.locales[pre]
+                break
+
+        with self.accept_languages_lock:
+            self.accept_languages[accept_lang] = best
+            if len(self.accept_languages) > self.max_accept_languages:
+                self.accept_languages.popitem(last=False)
+
+        return best
+
+
+_locale_table = None
+
+
+def get_locale_table():
+    """Return the `LocaleTable`, building it again if the settings changed."""
+    global _locale_table
+    table = _locale_table
+    if table is None or not table.is_current():
+        table = _locale_table = LocaleTable()
+
+    return table
+
+
 def split_path(path_):
     """
     Split the requested path into (locale, path).
@@ -76,15 +156,11 @@ def split_path(path_):
     # Use partition instead of split since it always returns 3 parts
     first, _, rest = path.partition('/')
 
-    lang = first.lower()
-    if lang in FULL_LANGUAGE_MAP:
-        return FULL_LANGUAGE_MAP[lang], rest
+    locale = get_locale_table().find(first)
+    if locale:
+        return locale, rest
     else:
-        supported = find_supported(first)
-        if len(supported):
-            return supported[0], rest
-        else:
-            return '', path
+        return '', path
 
 
 class Prefixer(object):
@@ -101,8 +177,9 @@ class Prefixer(object):
         """
         if 'lang' in self.request.GET:
             lang = self.request.GET['lang'].lower()
-            if lang in FULL_LANGUAGE_MAP:
-                return FULL_LANGUAGE_MAP[lang]
+            locales = get_locale_table().locales
+            if lang in locales:
+                return locales[lang]
 
         if self.request.META.get('HTTP_ACCEPT_LANGUAGE'):
             best = self.get_best_language(
@@ -113,14 +190,7 @@ class Prefixer(object):
 
     def get_best_language(self, accept_lang):
         """Given an Accept-Language header, return the best-matching language."""
-        ranked = parse_accept_lang_header(accept_lang)
-        for lang, _ in ranked:
-            lang = lang.lower()
-            if lang in FULL_LANGUAGE_MAP:
-                return FULL_LANGUAGE_MAP[lang]
-            pre = lang.split('-')[0]
-            if pre in FULL_LANGUAGE_MAP:
-                return FULL_LANGUAGE_MAP[pre]
+        return get_locale_table().best_language(accept_lang)
 
     def fix(self, path):
         path = path.lstrip('/')
@@ -5,18 +5,41 @@
 from __future__ import unicode_literals, print_function
 
 import logging
+import time
 
 from django.conf import settings
 
 import cronjobs
 import requests
+from concurrent.futures import ThreadPoolExecutor
 
 from bedrock.events.models import Event
+from bedrock.events.utils import bump_cache_version
+from bedrock.mozorg.models import FeedValidators
 
 
 logger = logging.getLogger(__name__)
 
 
+def fetch_ical_feed(feed_url, validators=None):
+    """
+    Request the feed, if it changed since the last time it was synced.
+
+    :param validators: dict of the `etag` and `modified` of the last sync
+    :return: tuple of the response and the time the request took.
+    """
+    headers = {}
+    validators = validators or {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('modified'):
+        headers['If-Modified-Since'] = validators['modified']
+
+    start_time = time.time()
+    resp = requests.get(feed_url, headers=headers, verify=False)
+    return resp, time.time() - start_time
+
+
 @cronjobs.register
 def update_ical_feeds():
     # TODO get dependencies for TLS SNI installed on servers
@@ -25,18 +48,41 @@ def update_ical_feeds():
     # if the ical feed is down catch the exception, log the error
     # and fail silently.
     # http://bugzil.la/1129961
-    for feed_url in settings.EVENTS_ICAL_FEEDS:
+    feed_urls = settings.EVENTS_ICAL_FEEDS
+    if feed_urls:
+        # the database is only used from this thread
+        validators = FeedValidators.objects.get_for(feed_urls)
+        with ThreadPoolExecutor(max_workers=len(feed_urls)) as executor:
+            fetches = [executor.submit(fetch_ical_feed, feed_url, validators.get(feed_url))
+                       for feed_url in feed_urls]
+    else:
+        fetches = []
+
+    changed = False
+    for feed_url, fetch in zip(feed_urls, fetches):
         logger.info('Syncing ical feed: %s' % feed_url)
         try:
-            resp = requests.get(feed_url, verify=False)
-            if resp.status_code == 200:
-                Event.objects.sync_with_ical(resp.text, feed_url)
+            resp, fetch_time = fetch.result()
+            if resp.status_code == 304:
+                logger.info('Feed not modified, fetched in %.2fs: %s' % (fetch_time, feed_url))
+            elif resp.status_code == 200:
+                start_time = time.time()
+                added, updated = Event.objects.sync_with_ical(resp.text, feed_url)
+                changed = changed or bool(added or updated)
+                logger.info('Added %d and updated %d events, fetched in %.2fs and synced '
+                            'in %.2fs: %s' % (added, updated, fetch_time,
+                                               time.time() - start_time, feed_url))
+                FeedValidators.objects.set_for(feed_url, resp.headers.get('etag'),
+                                               resp.headers.get('last-modified'))
             else:
                 logger.error("Request returned error code: %d and error body: %s" %
                              (resp.status_code, resp.text))
         except Exception:
             logger.exception('Error parsing ical feed: ' + feed_url)
 
+    if changed:
+        bump_cache_version()
+
     # delete old events
     Event.objects.past().delete()
 
@@ -2,10 +2,11 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from collections import OrderedDict
 from datetime import datetime
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models.query import QuerySet
 
 from icalendar import Calendar
@@ -14,6 +15,10 @@ from pytz import timezone
 from bedrock.events.countries import country_to_continent
 
 
+# rows read or written per query
+BATCH_SIZE = 500
+
+
 def calendar_id_from_google_url(feed_url):
     return feed_url.split('/')[5]
 
@@ -64,21 +69,32 @@ class EventManager(models.Manager):
         """
         Parse an icalendar feed and sync the events in the database with it.
 
+        Only new events and events with a new sequence number are saved, all
+        in one transaction with a few queries.
+
         :param ical_feed: ical formatted string.
-        :return: None
+        :return: tuple of the number of events added and updated.
         """
         today = utcnow().date()
         cal = Calendar.from_ical(ical_feed)
-        for event in cal.walk('vevent'):
-            uid = event.decoded('uid')
-            sequence = event.decoded('sequence')
-            try:
-                event_obj = self.get(id=uid)
-                if event_obj and event_obj.sequence == sequence:
-                    continue
-            except Event.DoesNotExist:
-                event_obj = Event()
+        ical_events = [(event.decoded('uid'), event) for event in cal.walk('vevent')]
+        uids = list(set(uid for uid, event in ical_events))
+        sequences = {}
+        for start in range(0, len(uids), BATCH_SIZE):
+            batch = uids[start:start + BATCH_SIZE]
+            sequences.update(self.filter(id__in=batch).order_by().values_list('id', 'sequence'))
+
+        changed = [(uid, event) for uid, event in ical_events
+                   if sequences.get(uid) != event.decoded('sequence')]
+        updated_ids = list(set(uid for uid, event in changed if uid in sequences))
+        existing = self.in_bulk(updated_ids) if updated_ids else {}
+
+        events = OrderedDict()
+        for uid, event in changed:
+            if uid in events:
+                continue
 
+            event_obj = existing.get(uid) or Event()
             event_obj.update_from_ical(event)
             end_date = event_obj.end_time
             if isinstance(end_date, datetime):
@@ -92,7 +108,20 @@ class EventManager(models.Manager):
                 event_obj.url = calendar_url_for_event(event_obj,
                                                        calendar_id_from_google_url(feed_url))
 
-            event_obj.save()
+            event_obj.update_continent()
+            events[uid] = event_obj
+
+        if not events:
+            return 0, 0
+
+        updated_ids = [uid for uid in events if uid in existing]
+        with transaction.atomic():
+            for start in range(0, len(updated_ids), BATCH_SIZE):
+                self.filter(id__in=updated_ids[start:start + BATCH_SIZE]).delete()
+
+            self.bulk_create(events.values(), batch_size=BATCH_SIZE)
+
+        return len(events) - len(updated_ids), len(updated_ids)
 
 
 class Event(models.Model):
@@ -152,7 +181,11 @@ class Event(models.Model):
                     value = value.strip()
                 setattr(self, field, value)
 
-    def save(self, *args, **kwargs):
+    def update_continent(self):
+        """Upper case the country code and set the continent for it."""
         self.country_code = self.country_code.upper()
         self.continent_code = country_to_continent.get(self.country_code, None)
+
+    def save(self, *args, **kwargs):
+        self.update_continent()
         super(Event, self).save(*args, **kwargs)
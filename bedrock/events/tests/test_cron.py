@@ -0,0 +1,70 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from mock import Mock, patch
+from nose.tools import eq_
+
+from bedrock.events import cron
+from bedrock.events.utils import get_cache_version
+from bedrock.mozorg.models import FeedValidators
+from bedrock.mozorg.tests import TestCase
+
+
+FEEDS = ('https://example.com/dude.ics', 'https://example.com/walter.ics')
+
+
+@override_settings(EVENTS_ICAL_FEEDS=FEEDS)
+@patch('bedrock.events.cron.Event')
+@patch('bedrock.events.cron.requests')
+class TestUpdateICalFeeds(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def response(self, status_code=200, headers=None):
+        return Mock(status_code=status_code, text='BEGIN:VCALENDAR', headers=headers or {})
+
+    def test_conditional_requests(self, requests_mock, event_mock):
+        """Feeds should be requested with the validators of the last sync."""
+        event_mock.objects.sync_with_ical.return_value = (1, 0)
+        requests_mock.get.return_value = self.response(headers={
+            'etag': '"abides"',
+            'last-modified': 'Sat, 01 Mar 2014 00:00:00 GMT',
+        })
+        cron.update_ical_feeds()
+        eq_(event_mock.objects.sync_with_ical.call_count, 2)
+        eq_(requests_mock.get.call_args[1]['headers'], {})
+
+        # validators outlive the cache of the process
+        cache.clear()
+        version = get_cache_version()
+        requests_mock.get.reset_mock()
+        requests_mock.get.return_value = self.response(status_code=304)
+        cron.update_ical_feeds()
+        eq_(event_mock.objects.sync_with_ical.call_count, 2)
+        eq_(sorted(call[0][0] for call in requests_mock.get.call_args_list), list(FEEDS))
+        eq_(requests_mock.get.call_args[1]['headers'], {
+            'If-None-Match': '"abides"',
+            'If-Modified-Since': 'Sat, 01 Mar 2014 00:00:00 GMT',
+        })
+        eq_(event_mock.objects.past.return_value.delete.call_count, 2)
+        # nothing changed
+        eq_(get_cache_version(), version)
+
+    def test_errors(self, requests_mock, event_mock):
+        """A failing feed should not stop the others being synced."""
+        event_mock.objects.sync_with_ical.return_value = (1, 0)
+
+        def get(url, **kwargs):
+            if url == FEEDS[0]:
+                raise IOError('The Dude is not in.')
+            return self.response()
+
+        requests_mock.get.side_effect = get
+        cron.update_ical_feeds()
+        event_mock.objects.sync_with_ical.assert_called_once_with('BEGIN:VCALENDAR', FEEDS[1])
+        eq_(FeedValidators.objects.get_for(FEEDS),
+            {FEEDS[1]: {'etag': None, 'modified': None}})
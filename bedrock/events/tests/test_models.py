@@ -8,7 +8,7 @@ from datetime import date, datetime
 from django.test.utils import override_settings
 
 from mock import patch
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 from pytz import utc
 
 from bedrock.events.models import Event, calendar_id_from_google_url, calendar_url_for_event
@@ -53,6 +53,29 @@ class TestICalSync(TestCase):
 
         self.assertEqual(Event.objects.count(), 12)
 
+    def test_sync_changes(self):
+        """Only new events and events with a new sequence should be saved."""
+        with open(os.path.join(TEST_DATA, 'reps.ical')) as fh:
+            feed = fh.read()
+
+        with patch('bedrock.events.models.utcnow',
+                   return_value=datetime(2013, 10, 1, tzinfo=utc)):
+            eq_(Event.objects.sync_with_ical(feed, 'https://example.com'), (117, 0))
+            with self.assertNumQueries(1):
+                eq_(Event.objects.sync_with_ical(feed, 'https://example.com'), (0, 0))
+
+            evnt = Event.objects.get(title='Ada Lovelace IT Day')
+            evnt.title = 'The Dude Abides'
+            evnt.sequence -= 1
+            evnt.save()
+            Event.objects.get(title='Security Days 2014').delete()
+            eq_(Event.objects.sync_with_ical(feed, 'https://example.com'), (1, 1))
+
+        eq_(Event.objects.count(), 117)
+        evnt = Event.objects.get(id=evnt.id)
+        eq_(evnt.title, 'Ada Lovelace IT Day')
+        ok_(Event.objects.filter(title='Security Days 2014').exists())
+
     def test_google_cal_no_url(self):
         """URL for event should be to the gcal if no url specified."""
         # Security Days 2014
@@ -0,0 +1,70 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from django.core.cache import cache
+
+from mock import Mock, patch
+from nose.tools import eq_
+
+from bedrock.events import utils
+from bedrock.mozorg.tests import TestCase
+
+
+class TestCacheMemoized(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.func = Mock(__name__='dude', side_effect=lambda *args, **kwargs: [args, kwargs])
+        self.memoized = utils.cache_memoized(self.func)
+
+    def test_cached(self):
+        """Results should be cached by args and kwargs."""
+        eq_(self.memoized(1, abides=True), [(1,), {'abides': True}])
+        eq_(self.memoized(1, abides=True), [(1,), {'abides': True}])
+        eq_(self.func.call_count, 1)
+        eq_(self.memoized(1, abides=False), [(1,), {'abides': False}])
+        eq_(self.memoized(2, abides=True), [(2,), {'abides': True}])
+        eq_(self.func.call_count, 3)
+        self.memoized(1, abides=True, force_cache_refresh=True)
+        eq_(self.func.call_count, 4)
+
+    def test_bump_cache_version(self):
+        """Results should be recomputed once the version is bumped."""
+        self.memoized(1)
+        utils.bump_cache_version()
+        self.memoized(1)
+        eq_(self.func.call_count, 2)
+        self.memoized(1)
+        eq_(self.func.call_count, 2)
+
+    def test_expired(self):
+        """Expired results should be returned while another caller recomputes."""
+        self.memoized(1)
+        with patch.object(utils.time, 'time', return_value=utils.time.time() + utils.CACHE_TIMEOUT + 60):
+            cache.add('events-cache:dude:1:lock', True)
+            eq_(self.memoized(1), [(1,), {}])
+            eq_(self.func.call_count, 1)
+
+            cache.delete('events-cache:dude:1:lock')
+            self.memoized(1)
+            eq_(self.func.call_count, 2)
+            self.memoized(1)
+            eq_(self.func.call_count, 2)
+
+
+@patch.object(utils, 'Event')
+class TestEventUtils(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_derived_from_future_events(self, event_mock):
+        """Counts and the next events should not query the database again."""
+        event_mock.objects.future.return_value = ['walter', 'donny', 'maude']
+        eq_(utils.future_event_count(), 3)
+        eq_(utils.next_few_events(2), ['walter', 'donny'])
+        eq_(utils.next_event(), 'walter')
+        eq_(event_mock.objects.future.call_count, 1)
+
+    def test_next_event_none(self, event_mock):
+        event_mock.objects.future.return_value = []
+        eq_(utils.next_event(), None)
@@ -1,3 +1,4 @@
+import time
 from functools import wraps
 
 from django.conf import settings
@@ -7,6 +8,22 @@ from bedrock.events.models import Event
 
 
 CACHE_TIMEOUT = getattr(settings, 'EVENTS_CACHE_TIMEOUT', 15 * 60)
+CACHE_VERSION_KEY = 'events:cache-version'
+LOCK_TIMEOUT = 60
+
+
+def get_cache_version():
+    version = cache.get(CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(CACHE_VERSION_KEY, time.time(), None)
+        version = cache.get(CACHE_VERSION_KEY)
+
+    return version
+
+
+def bump_cache_version():
+    """Invalidate every result cached by `cache_memoized`, e.g. when events change."""
+    cache.set(CACHE_VERSION_KEY, time.time(), None)
 
 
 def cache_memoized(obj):
@@ -14,26 +31,43 @@ def cache_memoized(obj):
     Uses the django default cache backend to memoize results from function,
     method, or class calls. Decorated function will accept a 'force_cache_refresh'
     kwarg which will do exactly that if True. Results must be pickleable.
-    Caches results unique to args, but *not* to kwargs.
+
+    Results are fresh for `CACHE_TIMEOUT` seconds, or until
+    `bump_cache_version` is called. Stale results are kept as long again and
+    returned while a single caller computes a fresh one.
     """
     @wraps(obj)
     def wrapped(*args, **kwargs):
-        # NOTE: this ignores kwargs for caching purposes
-        cache_key = ':'.join([__name__, obj.__name__] + [str(a) for a in args])
         force_cache_refresh = kwargs.pop('force_cache_refresh', False)
-        if not force_cache_refresh:
-            cached = cache.get(cache_key)
+        key_parts = [str(a) for a in args]
+        key_parts += ['{0}={1}'.format(k, v) for k, v in sorted(kwargs.items())]
+        cache_key = ':'.join(['events-cache', obj.__name__] + key_parts)
+        lock_key = cache_key + ':lock'
+        version = get_cache_version()
+        now = time.time()
+        cached = None if force_cache_refresh else cache.get(cache_key)
+        if cached is not None:
+            cached_version, expires, result = cached
+            if cached_version == version and now < expires:
+                return result
+
+            if not cache.add(lock_key, True, LOCK_TIMEOUT):
+                # another caller is already computing a fresh result
+                return result
+
+        try:
+            result = obj(*args, **kwargs)
+            cache.set(cache_key, (version, now + CACHE_TIMEOUT, result), CACHE_TIMEOUT * 2)
+        finally:
             if cached is not None:
-                return cached
-        result = obj(*args, **kwargs)
-        cache.set(cache_key, result, timeout=CACHE_TIMEOUT)
+                cache.delete(lock_key)
+
         return result
     return wrapped
 
 
-@cache_memoized
 def current_and_future_event_count():
-    return Event.objects.current_and_future().count()
+    return len(current_and_future_events())
 
 
 @cache_memoized
@@ -41,9 +75,8 @@ def current_and_future_events():
     return list(Event.objects.current_and_future())
 
 
-@cache_memoized
 def future_event_count():
-    return Event.objects.future().count()
+    return len(future_events())
 
 
 @cache_memoized
@@ -51,14 +84,10 @@ def future_events():
     return list(Event.objects.future())
 
 
-@cache_memoized
 def next_few_events(count):
-    return list(Event.objects.future()[:count])
+    return future_events()[:count]
 
 
 def next_event():
-    # If there is no next event we want to return None, which
-    # is not cacheable, but next_few_events will cache an empty list
-    # for us in that case.
-    events = next_few_events(1)
+    events = future_events()
     return events[0] if events else None
@@ -3,6 +3,7 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import logging
+import time
 from os.path import basename
 from time import mktime
 try:
@@ -14,6 +15,7 @@ from django.conf import settings
 from django.core.cache import get_cache
 from django.utils.http import http_date
 
+from django_statsd.clients import statsd
 import requests
 
 from bedrock.externalfiles.models import ExternalFile as EFModel
@@ -23,6 +25,22 @@ log = logging.getLogger(__name__)
 
 
 class ExternalFile(object):
+    """
+    A file fetched from a URL and stored in the database.
+
+    Subclasses can define `parse(lines)` to turn the content into the
+    structure their pages use. `parsed` returns it. It is computed when the
+    file is updated or first read, and cached with the last-modified date of
+    the content. The externalfiles cache is kept in each process, so every
+    process parses the file once per change of content. Its copy is checked
+    against the date of the cached file object at most every
+    `parsed_check_interval` seconds. That object is itself cached for an hour,
+    so web processes see new content within an hour of `update`.
+    """
+    parsed_check_interval = 60
+    # seconds to wait for the server, unless the file's settings have a `timeout`
+    default_timeout = 30
+
     def __init__(self, file_id):
         try:
             fileinfo = settings.EXTERNAL_FILES[file_id]
@@ -33,7 +51,11 @@ class ExternalFile(object):
         self.file_id = file_id
         self.url = fileinfo['url']
         self.name = fileinfo.get('name', basename(self.url))
+        self.timeout = fileinfo.get('timeout', self.default_timeout)
         self.cache_key = 'externalfile:{}'.format(self.file_id)
+        self.parsed_cache_key = self.cache_key + ':parsed'
+        self._parsed = None
+        self._parsed_checked = 0
 
     @property
     def file_object(self):
@@ -101,35 +123,106 @@ class ExternalFile(object):
                                                                                  resp.status_code,
                                                                                  resp.text))
 
+    @property
+    def parsed(self):
+        """Return `parse` of the file, parsing it only when the content changed."""
+        now = time.time()
+        if self._parsed is not None and now - self._parsed_checked < self.parsed_check_interval:
+            return self._parsed[1]
+
+        last_modified = self.last_modified
+        if last_modified is None:
+            return self.parse(self.readlines())
+
+        self._parsed_checked = now
+        if self._parsed is None or self._parsed[0] != last_modified:
+            parsed = self._cache.get(self.parsed_cache_key)
+            if parsed is None or parsed[0] != last_modified:
+                parsed = self.cache_parsed(self.file_object)
+            self._parsed = parsed
+
+        return self._parsed[1]
+
+    def cache_parsed(self, file_object):
+        """Parse the content of the file and cache it with its last-modified date."""
+        content = file_object.content.encode('utf-8')
+        parsed = (file_object.last_modified, self.parse(StringIO(content).readlines()))
+        self._cache.set(self.parsed_cache_key, parsed, 3600)  # 1 hour
+        return parsed
+
     def read(self):
         return self.file_object.content.encode('utf-8')
 
     def readlines(self):
         return StringIO(self.read()).readlines()
 
-    def update(self, force=False):
-        log.info('Updating {0}.'.format(self.name))
+    def request_headers(self, force=False):
+        """Return the headers making the request conditional on the stored file."""
         headers = {}
         if not force:
             if self.last_modified:
                 headers['if-modified-since'] = self.last_modified_http
+                # copies cached before the etag field was added don't have it
+                etag = getattr(self.file_object, 'etag', '')
+                if etag:
+                    headers['if-none-match'] = etag
+
+        return headers
+
+    def fetch(self, headers, session=None):
+        """
+        Request the file. Only does network I/O, so it can run in threads.
+
+        :param headers: dict of request headers
+        :param session: requests.Session to reuse connections from, or None
+        :return: requests.Response
+        """
+        return (session or requests).get(self.url, headers=headers, verify=True,
+                                         timeout=self.timeout)
 
-        resp = requests.get(self.url, headers=headers, verify=True)
+    def process_response(self, resp):
+        """
+        Store the content of the response if the file changed.
+
+        :param resp: requests.Response
+        :return: True if the file was updated, None if it is up-to-date
+        :raises: ValueError
+        """
+        metric = 'externalfiles.{0}.'.format(self.file_id)
+        statsd.timing(metric + 'fetch', int(resp.elapsed.total_seconds() * 1000))
         content = self.validate_resp(resp)
 
         if content is None:
             # up-to-date
+            statsd.incr(metric + 'not_modified')
             return None
 
+        statsd.incr(metric + 'updated')
+        statsd.gauge(metric + 'size', len(content))
         fo = self.file_object
         if fo:
             fo.content = content
+            fo.etag = resp.headers.get('etag') or ''
             fo.save()
         else:
-            EFModel.objects.create(name=self.file_id, content=content)
+            fo = EFModel.objects.create(name=self.file_id, content=content,
+                                        etag=resp.headers.get('etag') or '')
+
+        # only the caches of this process, usually the cron job, are updated
+        self._cache.set(self.cache_key, fo, 3600)  # 1 hour
+        if hasattr(self, 'parse'):
+            self._parsed = self.cache_parsed(fo)
+            self._parsed_checked = time.time()
 
         log.info('Successfully updated {0}.'.format(self.name))
         return True
 
+    def update(self, force=False, session=None):
+        log.info('Updating {0}.'.format(self.name))
+        resp = self.fetch(self.request_headers(force), session)
+        return self.process_response(resp)
+
     def clear_cache(self):
         self._cache.delete(self.cache_key)
+        self._cache.delete(self.parsed_cache_key)
+        self._parsed = None
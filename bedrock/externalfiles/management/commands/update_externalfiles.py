@@ -4,6 +4,9 @@ from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django.utils.module_loading import import_by_path
 
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
 
 DEFAULT_CLASS = 'bedrock.externalfiles.ExternalFile'
 
@@ -37,22 +40,44 @@ class Command(BaseCommand):
             if not (options['quiet'] or options['status']):
                 self.stdout.write(msg, ending=ending)
 
+        files = []
         for fid in file_ids:
             try:
                 finfo = settings.EXTERNAL_FILES[fid]
             except KeyError:
                 raise CommandError('No external file configuration for ' + fid)
             klass = import_by_path(finfo.get('type', DEFAULT_CLASS))
-            printout('updating {0}... '.format(fid), ending='')
-            result = klass(fid).update(options['force'])
+            files.append(klass(fid))
+
+        # the requests run concurrently, the files are stored one at a time
+        session = requests.Session()
+        headers = [ef.request_headers(options['force']) for ef in files]
+        with ThreadPoolExecutor(max_workers=max(len(files), 1)) as executor:
+            fetches = [executor.submit(ef.fetch, h, session) for ef, h in zip(files, headers)]
+
+        errors = []
+        for ef, fetch in zip(files, fetches):
+            printout('updating {0}... '.format(ef.file_id), ending='')
+            try:
+                resp = fetch.result()
+                result = ef.process_response(resp)
+            except (requests.RequestException, ValueError) as e:
+                printout('error')
+                errors.append('{0}: {1}'.format(ef.file_id, e))
+                continue
+
+            duration = resp.elapsed.total_seconds()
             if result is None:
-                printout('already up-to-date')
+                printout('already up-to-date ({0:.2f}s)'.format(duration))
             else:
                 updated = True
-                printout('done')
+                printout('done ({0:.2f}s, {1} bytes)'.format(duration, len(resp.content)))
 
         if options['status']:
             if updated:
                 self.stdout.write('updated')
             else:
                 self.stdout.write('up-to-date')
+
+        if errors:
+            raise CommandError('Error updating files:\n' + '\n'.join(errors))
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('externalfiles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='externalfile',
+            name='etag',
+            field=models.CharField(max_length=200, blank=True),
+            preserve_default=True,
+        ),
+    ]
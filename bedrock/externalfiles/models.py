@@ -5,3 +5,4 @@ class ExternalFile(models.Model):
     name = models.CharField(max_length=50, primary_key=True)
     content = models.TextField()
     last_modified = models.DateTimeField(auto_now=True)
+    etag = models.CharField(max_length=200, blank=True)
@@ -2,9 +2,14 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
-from datetime import datetime
+import threading
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
 from django.utils import timezone
 
 from mock import Mock, patch, PropertyMock
@@ -117,3 +122,130 @@ class TestExternalFile(TestCase):
             ef.validate_resp(response)
 
         self.assertTrue(str(e.exception).startswith('Unknown error'))
+
+
+class ParsedFile(externalfiles.ExternalFile):
+    def parse(self, lines):
+        return [line.strip().upper() for line in lines]
+
+
+class TestParsedExternalFile(TestCase):
+    def setUp(self):
+        settings.EXTERNAL_FILES['test'] = {
+            'url': 'http://www.mozilla.org/keymaster/gatekeeper/there.is.only.xul',
+        }
+        self.ef = ParsedFile('test')
+        self.ef.clear_cache()
+
+    def tearDown(self):
+        self.ef.clear_cache()
+        del settings.EXTERNAL_FILES['test']
+
+    @patch.object(externalfiles, 'requests')
+    def test_parsed_on_update(self, requests_mock):
+        """Content should be parsed once when updated and shared by instances."""
+        requests_mock.get.return_value = Mock(status_code=200, text='the dude\nabides',
+                                              elapsed=timedelta(seconds=1), headers={})
+        with patch.object(ParsedFile, 'parse', wraps=self.ef.parse) as parse_mock:
+            self.ef.update()
+            self.assertEqual(self.ef.parsed, ['THE DUDE', 'ABIDES'])
+            self.assertEqual(ParsedFile('test').parsed, ['THE DUDE', 'ABIDES'])
+            self.assertEqual(parse_mock.call_count, 1)
+
+    def test_parsed_content_changed(self):
+        """Content should be parsed again when its last-modified date changes."""
+        efo = EFModel.objects.create(name='test', content='the dude')
+        self.assertEqual(self.ef.parsed, ['THE DUDE'])
+
+        efo.content = 'walter'
+        efo.last_modified = datetime(2015, 1, 1, tzinfo=utc)
+        self.ef._cache.set(self.ef.cache_key, efo)
+        # checked at most every parsed_check_interval seconds
+        self.assertEqual(self.ef.parsed, ['THE DUDE'])
+        self.ef._parsed_checked = 0
+        self.assertEqual(self.ef.parsed, ['WALTER'])
+        self.assertEqual(ParsedFile('test').parsed, ['WALTER'])
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves `files` by path with ETags, answering 304 for a matching If-None-Match."""
+    files = {
+        '/dude.txt': 'The Dude abides.',
+        '/walter.txt': 'Shomer shabbos!',
+    }
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, dict(self.headers)))
+        content = self.files.get(self.path)
+        if content is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        etag = '"{0}"'.format(len(content))
+        if self.headers.get('if-none-match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestUpdateCommand(TestCase):
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), StandInHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        StandInHandler.requests = []
+        url = 'http://127.0.0.1:{0}/'.format(self.server.server_port)
+        self.files = {
+            'dude': {'url': url + 'dude.txt'},
+            'walter': {'url': url + 'walter.txt', 'timeout': 5},
+        }
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        with override_settings(EXTERNAL_FILES=self.files):
+            for fid in self.files:
+                externalfiles.ExternalFile(fid).clear_cache()
+
+    def update(self):
+        with override_settings(EXTERNAL_FILES=self.files):
+            call_command('update_externalfiles', quiet=True)
+
+    def test_update_conditional(self):
+        """Files should be fetched again with the ETag and date of the stored file."""
+        self.update()
+        self.assertEqual(EFModel.objects.get(name='dude').content, 'The Dude abides.')
+        self.assertEqual(EFModel.objects.get(name='dude').etag, '"16"')
+        self.assertEqual(EFModel.objects.get(name='walter').content, 'Shomer shabbos!')
+
+        StandInHandler.requests = []
+        with patch.object(externalfiles.ExternalFile, 'process_response',
+                          wraps=lambda resp: None) as process_mock:
+            self.update()
+        self.assertEqual([resp.status_code for (resp,), kwargs in process_mock.call_args_list],
+                         [304, 304])
+        for path, headers in StandInHandler.requests:
+            self.assertEqual(headers['if-none-match'], '"{0}"'.format(
+                len(StandInHandler.files[path])))
+            self.assertIn('if-modified-since', headers)
+
+    def test_update_errors(self):
+        """A failing file should not stop the others being updated."""
+        self.files['donny'] = {'url': self.files['dude']['url'].replace('dude', 'donny')}
+        with self.assertRaises(CommandError) as e:
+            self.update()
+        self.assertIn('donny', str(e.exception))
+        self.assertEqual(EFModel.objects.filter(name__in=['dude', 'walter']).count(), 2)
+        self.assertFalse(EFModel.objects.filter(name='donny').exists())
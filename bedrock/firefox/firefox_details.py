@@ -1,5 +1,8 @@
 import re
-from collections import OrderedDict
+import time
+import unicodedata
+from collections import defaultdict, OrderedDict
+from itertools import product
 from operator import itemgetter
 from urllib import urlencode
 
@@ -8,6 +11,54 @@ from product_details import ProductDetails
 from lib.l10n_utils.dotlang import _lazy as _
 
 
+def fold_accents(text):
+    """Return `text` lowercased and with the accents removed from its letters."""
+    folded = []
+    for char in unicode(text).lower():
+        decomposed = unicodedata.normalize('NFKD', char)
+        if decomposed != char:
+            char = u''.join(c for c in decomposed if not unicodedata.combining(c))
+        folded.append(char)
+
+    return u''.join(folded)
+
+
+class BuildsSnapshot(object):
+    """
+    The latest builds of every locale for every channel in one version of the
+    product details, with the 64-bit platforms added.
+
+    Snapshots are never changed once built so they can be shared by threads;
+    `FirefoxDesktop` replaces its snapshot when product details are updated.
+    """
+
+    def __init__(self, last_update, channel_versions, all_builds):
+        """
+        :param last_update: the product-details update time
+        :param channel_versions: dict of the latest version of each channel
+        :param all_builds: build dicts from the JSON, in order of preference
+        """
+        self.last_update = last_update
+        self._builds = {}
+        for channel, version in channel_versions.iteritems():
+            for builds in all_builds:
+                for locale, locale_builds in builds.iteritems():
+                    if (locale, channel) in self._builds or version not in locale_builds:
+                        continue
+
+                    platforms = dict(locale_builds[version])
+                    # Append 64-bit builds
+                    if 'Windows' in platforms:
+                        platforms['Windows 64-bit'] = platforms['Windows']
+                    if 'Linux' in platforms:
+                        platforms['Linux 64-bit'] = platforms['Linux']
+                    self._builds[(locale, channel)] = (version, platforms)
+
+    def get(self, locale, channel):
+        """Return the (version, platforms) of the latest build or None."""
+        return self._builds.get((locale, channel))
+
+
 # TODO: port this to django-mozilla-product-details
 class _ProductDetails(ProductDetails):
     bouncer_url = 'https://download.mozilla.org/'
@@ -47,8 +98,24 @@ class FirefoxDesktop(_ProductDetails):
         'release': 'LATEST_FIREFOX_VERSION',
     }
 
+    # Number of (channel, version) download URL tables to keep
+    max_download_url_tables = 20
+
+    # Number of (builds, channel, version) build listings to keep
+    max_build_listings = 20
+
+    # Seconds between checks for product-details updates
+    update_check_interval = 60
+
     def __init__(self, **kwargs):
         super(FirefoxDesktop, self).__init__(**kwargs)
+        self.download_url_tables = {}
+        self.download_url_stub_locales = None
+        self.build_listings = {}
+        self.build_listings_version = None
+        self.builds_snapshot = None
+        self.update_checked = 0
+        self.checked_last_update = None
 
     def platforms(self, channel='release'):
         platforms = self.platform_labels.copy()
@@ -94,6 +161,42 @@ class FirefoxDesktop(_ProductDetails):
 
         return versions
 
+    def get_last_update(self):
+        """
+        Return the time product details were last updated, checked at most
+        every `update_check_interval` seconds. The cached product-details JSON
+        is dropped when the time changes, so that snapshots and listings
+        keyed by it are built from the updated data.
+        """
+        now = time.time()
+        if now - self.update_checked > self.update_check_interval:
+            last_update = self.last_update
+            if last_update != self.checked_last_update:
+                # the JSON in the product-details cache can predate the
+                # update, drop it so the new data is read from storage
+                self._storage.delete_cache('versions')
+            self.checked_last_update = last_update
+            self.update_checked = now
+
+        return self.checked_last_update
+
+    def get_builds_snapshot(self):
+        """
+        Return the `BuildsSnapshot` of the current product details, replacing
+        it with a new one when they've been updated.
+        """
+        last_update = self.get_last_update()
+        snapshot = self.builds_snapshot
+        if snapshot is None or snapshot.last_update != last_update:
+            channel_versions = dict((channel, self.latest_version(channel))
+                                    for channel in self.version_map)
+            snapshot = BuildsSnapshot(last_update, channel_versions,
+                                      (self.firefox_primary_builds,
+                                       self.firefox_beta_builds))
+            self.builds_snapshot = snapshot
+
+        return snapshot
+
     def latest_builds(self, locale, channel='release'):
         """Return build info for a locale and channel.
 
@@ -101,32 +204,76 @@ class FirefoxDesktop(_ProductDetails):
         :param channel: channel of the build: release, beta, or aurora
         :return: dict or None
         """
-        all_builds = (self.firefox_primary_builds,
-                      self.firefox_beta_builds)
-        version = self.latest_version(channel)
-
-        for builds in all_builds:
-            if locale in builds and version in builds[locale]:
-                _builds = builds[locale][version]
-                # Append 64-bit builds
-                if 'Windows' in _builds:
-                    _builds['Windows 64-bit'] = _builds['Windows']
-                if 'Linux' in _builds:
-                    _builds['Linux 64-bit'] = _builds['Linux']
-                return version, _builds
+        if channel not in self.version_map:
+            channel = 'release'
 
-    def _get_filtered_builds(self, builds, channel, version=None, query=None):
+        return self.get_builds_snapshot().get(locale, channel)
+
+    def _get_filtered_builds(self, builds_name, channel, version=None, query=None):
         """
         Get a list of builds, sorted by english locale name, for a specific
         Firefox version.
-        :param builds: a build dict from the JSON
+
+        The list of every build is built once per product-details update, see
+        `get_build_listing`, and searches are looked up in its name index.
+
+        :param builds_name: name of a build dict from the JSON
         :param channel: one of self.version_map.keys().
         :param version: a firefox version. one of self.latest_versions.
         :param query: a string to match against native or english locale name
         :return: list
         """
         version = version or self.latest_version(channel)
+        f_builds, index = self.get_build_listing(builds_name, channel, version)
+        if query is None:
+            return list(f_builds)
+
+        locales = None
+        for word in re.split(r',|,?\s+', query.strip().lower()):
+            if not word:
+                continue
+
+            matches = index.get(fold_accents(word), frozenset())
+            locales = matches if locales is None else locales & matches
+
+        if locales is None:
+            return list(f_builds)
+
+        return [build for build in f_builds if build['locale'] in locales]
+
+    def get_build_listing(self, builds_name, channel, version):
+        """
+        Return the sorted builds of a version and their name index from
+        `build_listing`, building them the first time they're asked for since
+        product details were last updated.
+        """
+        last_update = self.get_last_update()
+        if last_update != self.build_listings_version:
+            self.build_listings = {}
+            self.build_listings_version = last_update
+
+        key = (builds_name, channel, version)
+        listing = self.build_listings.get(key)
+        if listing is None:
+            if len(self.build_listings) >= self.max_build_listings:
+                self.build_listings = {}
+            listing = self.build_listing(getattr(self, builds_name), channel, version)
+            self.build_listings[key] = listing
+
+        return listing
+
+    def build_listing(self, builds, channel, version):
+        """
+        Return the builds of a version, sorted by english locale name, and an
+        index of their locales by every part of a word of their english and
+        native locale names, lowercased and without accents.
+        :param builds: a build dict from the JSON
+        :param channel: one of self.version_map.keys().
+        :param version: a firefox version. one of self.latest_versions.
+        :return: tuple of a list and a dict
+        """
         f_builds = []
+        index = defaultdict(set)
         for locale, build in builds.iteritems():
             if locale not in self.languages or not build.get(version):
                 continue
@@ -138,10 +285,6 @@ class FirefoxDesktop(_ProductDetails):
                 'platforms': {},
             }
 
-            # only include builds that match a search query
-            if query is not None and not self._matches_query(build_info, query):
-                continue
-
             for platform, label in self.platform_labels.iteritems():
                 build_info['platforms'][platform] = {
                     'download_url': self.get_download_url(channel, version,
@@ -151,7 +294,15 @@ class FirefoxDesktop(_ProductDetails):
 
             f_builds.append(build_info)
 
-        return sorted(f_builds, key=itemgetter('name_en'))
+            # a query word matches any part of a word of the names
+            names = u' '.join([build_info['name_en'], build_info['name_native']])
+            for word in re.split(r'\s+', fold_accents(names)):
+                for start in range(len(word)):
+                    for end in range(start + 1, len(word) + 1):
+                        index[word[start:end]].add(locale)
+
+        index = dict((part, frozenset(locales)) for part, locales in index.iteritems())
+        return sorted(f_builds, key=itemgetter('name_en')), index
 
     def get_filtered_full_builds(self, channel, version=None, query=None):
         """
@@ -161,7 +312,7 @@ class FirefoxDesktop(_ProductDetails):
         :param query: a string to match against native or english locale name
         :return: list
         """
-        return self._get_filtered_builds(self.firefox_primary_builds,
+        return self._get_filtered_builds('firefox_primary_builds',
                                          channel, version, query)
 
     def get_filtered_test_builds(self, channel, version=None, query=None):
@@ -172,14 +323,38 @@ class FirefoxDesktop(_ProductDetails):
         :param query: a string to match against native or english locale name
         :return: list
         """
-        return self._get_filtered_builds(self.firefox_beta_builds,
+        return self._get_filtered_builds('firefox_beta_builds',
                                          channel, version, query)
 
+    def build_download_url_table(self, channel, version):
+        """
+        Return the download URLs of a version for every locale with a build,
+        platform and combination of flags, keyed by
+        (platform, locale, force_direct, force_full_installer, force_funnelcake).
+        """
+        locales = set(['en-US'])
+        locales.update(self.firefox_primary_builds)
+        locales.update(self.firefox_beta_builds)
+        table = {}
+        for platform in self.platform_labels:
+            for locale in locales:
+                for flags in product((False, True), repeat=3):
+                    table[(platform, locale) + flags] = self._get_download_url(
+                        channel, version, platform, locale, *flags)
+
+        return table
+
     def get_download_url(self, channel, version, platform, locale,
                          force_direct=False, force_full_installer=False,
                          force_funnelcake=False, funnelcake_id=None):
         """
         Get direct download url for the product.
+
+        URLs without a funnelcake are looked up in a table built for every
+        locale the first time a channel and version is asked for, see
+        `build_download_url_table`. Since product-details updates change the
+        versions, they get new tables.
+
         :param channel: one of self.version_map.keys().
         :param version: a firefox version. one of self.latest_version.
         :param platform: OS. one of self.platform_labels.keys().
@@ -192,6 +367,37 @@ class FirefoxDesktop(_ProductDetails):
         :param funnelcake_id: ID for the the funnelcake build.
         :return: string url
         """
+        if funnelcake_id:
+            return self._get_download_url(channel, version, platform, locale,
+                                          force_direct, force_full_installer,
+                                          force_funnelcake, funnelcake_id)
+
+        # the tables depend on the stub installer settings
+        stub_locales = settings.STUB_INSTALLER_LOCALES
+        if stub_locales is not self.download_url_stub_locales:
+            self.download_url_tables = {}
+            self.download_url_stub_locales = stub_locales
+
+        table = self.download_url_tables.get((channel, version))
+        if table is None:
+            if len(self.download_url_tables) >= self.max_download_url_tables:
+                self.download_url_tables = {}
+            table = self.build_download_url_table(channel, version)
+            self.download_url_tables[(channel, version)] = table
+
+        url = table.get((platform, locale, bool(force_direct),
+                         bool(force_full_installer), bool(force_funnelcake)))
+        if url is None:
+            url = self._get_download_url(channel, version, platform, locale,
+                                         force_direct, force_full_installer,
+                                         force_funnelcake)
+
+        return url
+
+    def _get_download_url(self, channel, version, platform, locale,
+                          force_direct=False, force_full_installer=False,
+                          force_funnelcake=False, funnelcake_id=None):
+        """Build the download url for the product, see `get_download_url`."""
         _version = version
         _locale = 'ja-JP-mac' if platform == 'osx' and locale == 'ja' else locale
 
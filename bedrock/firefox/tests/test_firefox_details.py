@@ -51,11 +51,33 @@ GOOD_VERSIONS = {
 @patch.object(firefox_desktop, 'firefox_beta_builds', {})
 @patch.object(firefox_desktop, 'firefox_versions', GOOD_VERSIONS)
 class TestLatestBuilds(TestCase):
+    def setUp(self):
+        firefox_desktop.builds_snapshot = None
+
     def test_latest_builds(self):
         """Should return platforms if localized build does exist."""
         result = firefox_desktop.latest_builds('de', 'release')
         self.assertEqual(result[0], '25.0')
-        self.assertIs(result[1], GOOD_PLATS)
+        self.assertEqual(result[1], dict(GOOD_PLATS, **{'Windows 64-bit': {},
+                                                        'Linux 64-bit': {}}))
+
+    def test_latest_builds_does_not_change_details(self):
+        """The 64-bit platforms should not be added to the product details."""
+        firefox_desktop.latest_builds('de', 'release')
+        ok_('Windows 64-bit' not in GOOD_PLATS)
+        ok_('Linux 64-bit' not in GOOD_PLATS)
+
+    def test_latest_builds_snapshot(self):
+        """The builds should be looked up again once product details are updated."""
+        snapshot = firefox_desktop.get_builds_snapshot()
+        firefox_desktop.latest_builds('de', 'release')
+        self.assertIs(firefox_desktop.get_builds_snapshot(), snapshot)
+
+        firefox_desktop.update_checked = 0
+        with patch.object(FirefoxDesktop, 'last_update', object()):
+            with patch.object(firefox_desktop, 'firefox_primary_builds', {}):
+                self.assertIsNone(firefox_desktop.latest_builds('de', 'release'))
+        self.assertIsNot(firefox_desktop.get_builds_snapshot(), snapshot)
 
     def test_latest_builds_is_none_if_no_build(self):
         """Should return None if the localized build for the channel doesn't exist."""
@@ -66,11 +88,11 @@ class TestLatestBuilds(TestCase):
         """Should work with all channels."""
         result = firefox_desktop.latest_builds('en-US', 'beta')
         self.assertEqual(result[0], '26.0b2')
-        self.assertIs(result[1], GOOD_PLATS)
+        ok_('Windows' in result[1])
 
         result = firefox_desktop.latest_builds('en-US', 'alpha')
         self.assertEqual(result[0], '27.0a1')
-        self.assertIs(result[1], GOOD_PLATS)
+        ok_('Windows' in result[1])
 
 
 class TestFirefoxDesktop(TestCase):
@@ -98,6 +120,59 @@ class TestFirefoxDesktop(TestCase):
                               ('os', 'linux64'),
                               ('lang', 'en-US')])
 
+    def test_download_url_table(self):
+        """URLs should come from the table built for the channel and version."""
+        firefox_desktop.download_url_tables = {}
+        with patch.object(firefox_desktop, 'build_download_url_table',
+                          wraps=firefox_desktop.build_download_url_table) as build_mock:
+            for locale in ['en-US', 'de', 'fr', 'pt-BR']:
+                for platform in firefox_desktop.platform_labels:
+                    for force_direct in [True, False]:
+                        for force_full_installer in [True, False]:
+                            url = firefox_desktop.get_download_url(
+                                'release', '38.0', platform, locale, force_direct,
+                                force_full_installer)
+                            eq_(url, firefox_desktop._get_download_url(
+                                'release', '38.0', platform, locale, force_direct,
+                                force_full_installer))
+
+        build_mock.assert_called_once_with('release', '38.0')
+
+    def test_download_url_table_funnelcake(self):
+        """Funnelcake URLs should not be added to the table."""
+        firefox_desktop.download_url_tables = {}
+        url = firefox_desktop.get_download_url('release', '38.0', 'win', 'en-US',
+                                               True, funnelcake_id='64')
+        ok_('product=firefox-stub-f64&' in url)
+        eq_(firefox_desktop.download_url_tables, {})
+
+    def test_download_url_table_stub_locales(self):
+        """The tables should be rebuilt when the stub installer settings change."""
+        url = firefox_desktop.get_download_url('release', '38.0', 'win', 'de', True)
+        ok_('product=firefox-stub&' in url)
+        with override_settings(STUB_INSTALLER_LOCALES={'win': ['en-us']}):
+            url = firefox_desktop.get_download_url('release', '38.0', 'win', 'de', True)
+            ok_('product=firefox-38.0-SSL&' in url)
+
+    def test_download_url_table_lookups(self):
+        """URLs for all locales should be looked up, not built again, once the table is built."""
+        locales = firefox_desktop.firefox_primary_builds.keys()
+        version = firefox_desktop.latest_version('release')
+
+        def download_urls():
+            return [firefox_desktop.get_download_url('release', version, platform, locale,
+                                                     force_direct)
+                    for locale in locales
+                    for platform in firefox_desktop.platform_labels
+                    for force_direct in [False, True]]
+
+        firefox_desktop.download_url_tables = {}
+        urls = download_urls()
+        with patch.object(firefox_desktop, '_get_download_url') as build_mock:
+            eq_(download_urls(), urls)
+
+        ok_(not build_mock.called)
+
     def test_get_download_url_aurora(self):
         """
         The Aurora version should give us a bouncer url. For Windows, a stub url
@@ -217,6 +292,67 @@ class TestFirefoxDesktop(TestCase):
         eq_(len(builds), 1)
         eq_(builds[0]['name_en'], 'French')
 
+    def test_filter_builds_without_accents(self):
+        builds = firefox_desktop.get_filtered_full_builds('release', None,
+                                                          'francais')
+        eq_([build['name_en'] for build in builds], ['French'])
+
+    def test_filter_builds_matches_scan(self):
+        """Index lookups should find the builds a search of every name finds."""
+        all_builds = firefox_desktop.get_filtered_full_builds('release')
+        for query in ['', ' ', 'an', 'english', 'ENGLISH (', 'english,british',
+                      'ujara', u'\u0a9c\u0ab0\u0abe', 'xyz', 'a b c', u'Fran\xe7ais']:
+            expected = [build for build in all_builds
+                        if firefox_desktop._matches_query(build, query)]
+            eq_(firefox_desktop.get_filtered_full_builds('release', None, query),
+                expected)
+
+    def test_build_listing_cached(self):
+        """The listing should be built once per product-details update."""
+        firefox_desktop.build_listings = {}
+        with patch.object(firefox_desktop, 'build_listing',
+                          wraps=firefox_desktop.build_listing) as build_mock:
+            builds = firefox_desktop.get_filtered_full_builds('release')
+            eq_(builds, firefox_desktop.get_filtered_full_builds('release', None, ''))
+            firefox_desktop.get_filtered_full_builds('release', None, 'french')
+            eq_(build_mock.call_count, 1)
+            firefox_desktop.get_filtered_test_builds('release')
+            eq_(build_mock.call_count, 2)
+
+            # changing the results doesn't change the listing
+            builds.pop()
+            ok_(len(firefox_desktop.get_filtered_full_builds('release')) > len(builds))
+
+            firefox_desktop.update_checked = 0
+            with patch.object(FirefoxDesktop, 'last_update', object()):
+                firefox_desktop.get_filtered_full_builds('release')
+            eq_(build_mock.call_count, 3)
+
+    def test_stale_product_details_cache(self):
+        """
+        Product details cached before an update should not be used to build
+        the snapshot and listings of the update.
+        """
+        data = firefox_desktop._storage.dir_data('versions')
+        stale = dict(data, **{'firefox_primary_builds.json': {},
+                              'firefox_beta_builds.json': {}})
+        self.pd_cache.set('prod-details:versions', stale)
+        firefox_desktop.builds_snapshot = None
+        firefox_desktop.build_listings = {}
+        firefox_desktop.update_checked = 0
+        firefox_desktop.checked_last_update = 'before'
+        with patch.object(FirefoxDesktop, 'last_update', 'before'):
+            eq_(firefox_desktop.latest_builds('en-US', 'release'), None)
+            eq_(firefox_desktop.get_filtered_full_builds('release'), [])
+
+        # the data is updated but this process still has the old data cached
+        self.pd_cache.set('prod-details:versions', stale)
+        firefox_desktop.update_checked = 0
+        with patch.object(FirefoxDesktop, 'last_update', 'after'):
+            version, platforms = firefox_desktop.latest_builds('en-US', 'release')
+            eq_(version, firefox_desktop.latest_version('release'))
+            ok_(firefox_desktop.get_filtered_full_builds('release'))
+
     def test_windows64_build(self):
         # Aurora
         builds = firefox_desktop.get_filtered_full_builds('alpha')
@@ -0,0 +1,117 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import tempfile
+from optparse import make_option
+from os import path
+from subprocess import CalledProcessError, check_output
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bedrock.legal_docs.views import LEGAL_DOCS_PATH, get_translations, render_legal_doc
+
+
+GIT = getattr(settings, 'GIT_BIN', 'git')
+FNULL = open(os.devnull, 'w')
+
+
+def get_revision():
+    """Return the git revision of the legal-docs checkout, or None if it isn't one."""
+    try:
+        return check_output((GIT, 'rev-parse', 'HEAD'), cwd=LEGAL_DOCS_PATH,
+                            stderr=FNULL).strip()
+    except (OSError, CalledProcessError):
+        return None
+
+
+def read_index(index_path):
+    try:
+        with open(index_path) as index_file:
+            return json.load(index_file)
+    except (IOError, ValueError):
+        return None
+
+
+def render_docs(output_dir):
+    """
+    Write every legal doc in every locale as HTML to `output_dir`.
+
+    :return: dict of the locales and translations of each doc, by name
+    """
+    docs = {}
+    for doc_name in sorted(os.listdir(LEGAL_DOCS_PATH)):
+        source_dir = path.join(LEGAL_DOCS_PATH, doc_name)
+        if doc_name.startswith('.') or not path.isdir(source_dir):
+            continue
+
+        locales = sorted(f[:-3] for f in os.listdir(source_dir) if f.endswith('.md'))
+        if not locales:
+            continue
+
+        os.mkdir(path.join(output_dir, doc_name))
+        for locale in locales:
+            content = render_legal_doc(path.join(source_dir, locale + '.md'))
+            with open(path.join(output_dir, doc_name, locale + '.html'), 'w') as html_file:
+                html_file.write(content.encode('utf8'))
+
+        docs[doc_name] = {
+            'locales': locales,
+            'translations': get_translations(locales),
+        }
+
+    return docs
+
+
+class Command(BaseCommand):
+    args = ''
+    help = 'Renders the legal docs in every locale to LEGAL_DOCS_RENDERED_PATH'
+    option_list = BaseCommand.option_list + (
+        make_option('--force',
+                    action='store_true',
+                    dest='force',
+                    default=False,
+                    help='Render the docs even if the legal-docs revision is unchanged.'),
+    )
+
+    def handle(self, *args, **options):
+        verbose = int(options.get('verbosity', 1)) > 0
+        store_path = settings.LEGAL_DOCS_RENDERED_PATH
+        index_path = path.join(store_path, 'index.json')
+        old_index = read_index(index_path)
+        revision = get_revision()
+        if (revision and old_index and old_index.get('revision') == revision and
+                not options['force']):
+            if verbose:
+                print('Legal docs already rendered for revision {}'.format(revision))
+            return
+
+        if not path.isdir(store_path):
+            os.makedirs(store_path)
+
+        # each run writes a new directory so processes reading the old index
+        # can still read the files it lists
+        output_dir = tempfile.mkdtemp(prefix='docs-', dir=store_path)
+        os.chmod(output_dir, 0o755)
+        docs = render_docs(output_dir)
+        index = {
+            'revision': revision,
+            'version': path.basename(output_dir),
+            'docs': docs,
+        }
+        with open(index_path + '.tmp', 'w') as index_file:
+            json.dump(index, index_file, indent=0, sort_keys=True)
+        os.rename(index_path + '.tmp', index_path)
+
+        keep = set([index['version'], old_index and old_index.get('version')])
+        for name in os.listdir(store_path):
+            if name not in keep and path.isdir(path.join(store_path, name)):
+                shutil.rmtree(path.join(store_path, name))
+
+        if verbose:
+            print('Rendered {} legal docs'.format(len(docs)))
@@ -2,8 +2,12 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import os
+import shutil
+import tempfile
 from os.path import join
 
+from django.core.management import call_command
 from django.http import Http404, HttpResponse
 from django.test import RequestFactory
 
@@ -13,6 +17,7 @@ from nose.tools import eq_
 from bedrock.mozorg.tests import TestCase
 
 from . import views
+from .management.commands import render_legal_docs
 
 
 class TestLoadLegalDoc(TestCase):
@@ -136,3 +141,96 @@ class TestLegalDocView(TestCase):
         resp = view(req)
         eq_(resp['cache-control'], 'max-age=20')
         lld_mock.assert_called_with('the_dude_abides', 'es-ES')
+
+
+class TestRenderLegalDocs(TestCase):
+    def setUp(self):
+        self.docs_path = tempfile.mkdtemp()
+        self.store_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.docs_path)
+        self.addCleanup(shutil.rmtree, self.store_path)
+        for doc_name, locale, text in [
+            ('the_dude_abides', 'en-US', '# The Dude abides'),
+            ('the_dude_abides', 'de', '# Der Dude bleibt'),
+            ('walter', 'en-US', 'Shomer shabbos'),
+        ]:
+            if not os.path.isdir(join(self.docs_path, doc_name)):
+                os.mkdir(join(self.docs_path, doc_name))
+            with open(join(self.docs_path, doc_name, locale + '.md'), 'w') as md_file:
+                md_file.write(text)
+
+        os.mkdir(join(self.docs_path, '.git'))
+        for patcher in [
+            patch.object(render_legal_docs, 'LEGAL_DOCS_PATH', self.docs_path),
+            patch.object(render_legal_docs, 'get_revision', return_value='abide'),
+            patch.object(render_legal_docs, 'render_legal_doc', side_effect=self.render_md),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.store = views.LegalDocsStore(self.store_path)
+
+    def render_md(self, source_file):
+        with open(source_file) as md_file:
+            return u'<p>{0}</p>'.format(md_file.read().decode('utf8'))
+
+    def render(self, **options):
+        with self.settings(LEGAL_DOCS_RENDERED_PATH=self.store_path):
+            call_command('render_legal_docs', verbosity=0, **options)
+
+    def test_store(self):
+        """Rendered docs should be read from the store."""
+        self.render()
+        doc = self.store.get('the_dude_abides', 'de')
+        eq_(doc['content'], u'<p># Der Dude bleibt</p>')
+        self.assertTrue(doc['localized'])
+        self.assertDictEqual(doc['translations'], {'de': 'Deutsch', 'en-US': 'English (US)'})
+
+        doc = self.store.get('walter', 'de')
+        eq_(doc['content'], u'<p>Shomer shabbos</p>')
+        self.assertFalse(doc['localized'])
+        self.assertDictEqual(doc['translations'], {'en-US': 'English (US)'})
+
+        eq_(self.store.get('donny', 'de'), None)
+        eq_(views.LegalDocsStore(join(self.store_path, 'nope')).get('walter', 'de'), None)
+
+    def test_same_revision_skipped(self):
+        """Docs should only be rendered again for a new revision or if forced."""
+        self.render()
+        eq_(len(os.listdir(self.store_path)), 2)
+        with patch.object(render_legal_docs, 'render_docs') as render_mock:
+            self.render()
+        self.assertFalse(render_mock.called)
+
+        self.render(force=True)
+        self.render(force=True)
+        # the previous version is kept for processes with the old index
+        eq_(len(os.listdir(self.store_path)), 3)
+
+    def test_index_reloaded(self):
+        """The store should read the index again when it is replaced."""
+        self.render()
+        eq_(self.store.get('walter', 'en-US')['content'], u'<p>Shomer shabbos</p>')
+        with open(join(self.docs_path, 'walter', 'en-US.md'), 'w') as md_file:
+            md_file.write('Smokey, this is not Nam')
+        self.render(force=True)
+        os.utime(join(self.store_path, 'index.json'), (0, 0))
+
+        eq_(self.store.get('walter', 'en-US')['content'], u'<p>Shomer shabbos</p>')
+        self.store.checked = 0
+        eq_(self.store.get('walter', 'en-US')['content'], u'<p>Smokey, this is not Nam</p>')
+
+    @patch.object(views, 'load_legal_doc')
+    def test_view_uses_store(self, lld_mock):
+        self.render()
+        req = RequestFactory().get('/dude/abides/')
+        req.locale = 'de'
+        view = views.LegalDocView(legal_doc_name='the_dude_abides', request=req)
+        with patch.object(views, 'legal_docs_store', self.store):
+            doc = view.get_legal_doc()
+            self.assertTrue(doc['localized'])
+            self.assertFalse(lld_mock.called)
+
+            view.legal_doc_name = 'donny'
+            eq_(view.get_legal_doc(), lld_mock.return_value)
+            lld_mock.assert_called_with('donny', 'de')
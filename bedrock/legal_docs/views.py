@@ -2,6 +2,8 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import json
+import time
 from os import path, listdir
 import StringIO
 
@@ -20,6 +22,27 @@ LEGAL_DOCS_PATH = base_path('vendor-local', 'src', 'legal-docs')
 CACHE_TIMEOUT = getattr(settings, 'LEGAL_DOCS_CACHE_TIMEOUT', 60 * 60)
 
 
+def render_legal_doc(source_file):
+    """Return the HTML of the Markdown file at `source_file`. Raises IOError."""
+    output = StringIO.StringIO()
+    try:
+        md.markdownFromFile(input=source_file, output=output,
+                            extensions=['attr_list', 'headerid', 'outline(wrapper_cls=)'])
+        return output.getvalue().decode('utf8')
+    finally:
+        output.close()
+
+
+def get_translations(locales):
+    """Return the native name of each locale with one, by locale."""
+    translations = {}
+    for lang in locales:
+        if lang in product_details.languages:
+            translations[lang] = product_details.languages[lang]['native']
+
+    return translations
+
+
 def load_legal_doc(doc_name, locale):
     """
     Return the HTML content of a legal doc in the requested locale.
@@ -32,10 +55,8 @@ def load_legal_doc(doc_name, locale):
     """
     source_dir = path.join(LEGAL_DOCS_PATH, doc_name)
     source_file = path.join(source_dir, locale + '.md')
-    output = StringIO.StringIO()
     locales = [f.replace('.md', '') for f in listdir(source_dir) if f.endswith('.md')]
     localized = locale != settings.LANGUAGE_CODE
-    translations = {}
 
     if not path.exists(source_file):
         source_file = path.join(LEGAL_DOCS_PATH, doc_name, 'en-US.md')
@@ -43,26 +64,91 @@ def load_legal_doc(doc_name, locale):
 
     try:
         # Parse the Markdown file
-        md.markdownFromFile(input=source_file, output=output,
-                            extensions=['attr_list', 'headerid', 'outline(wrapper_cls=)'])
-        content = output.getvalue().decode('utf8')
+        content = render_legal_doc(source_file)
     except IOError:
         content = None
         localized = False
-    finally:
-        output.close()
-
-    for lang in locales:
-        if lang in product_details.languages:
-            translations[lang] = product_details.languages[lang]['native']
 
     return {
         'content': content,
         'localized': localized,
-        'translations': translations,
+        'translations': get_translations(locales),
     }
 
 
+class LegalDocsStore(object):
+    """
+    Legal docs rendered by `./manage.py render_legal_docs`.
+
+    The index of the store lists the locales and translations of each doc
+    and the directory of the current version of the rendered files. The
+    command replaces the index when the legal-docs revision changes. The
+    index is read again when it has been replaced, which is checked at most
+    every `check_interval` seconds.
+    """
+    check_interval = 60
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+        self.index = None
+        self.index_mtime = None
+        self.checked = 0
+
+    @property
+    def index_path(self):
+        return path.join(self.store_path, 'index.json')
+
+    def get_index(self):
+        now = time.time()
+        if now - self.checked > self.check_interval:
+            self.checked = now
+            try:
+                mtime = path.getmtime(self.index_path)
+            except OSError:
+                mtime = None
+
+            if mtime != self.index_mtime:
+                self.index = None
+                if mtime is not None:
+                    with open(self.index_path) as index_file:
+                        self.index = json.load(index_file)
+                self.index_mtime = mtime
+
+        return self.index
+
+    def get(self, doc_name, locale):
+        """
+        Return the rendered doc like `load_legal_doc`, or None if the doc
+        isn't in the store.
+        """
+        index = self.get_index()
+        doc = index and index['docs'].get(doc_name)
+        if doc is None:
+            return None
+
+        localized = locale != settings.LANGUAGE_CODE
+        if locale not in doc['locales']:
+            locale = 'en-US'
+            localized = False
+
+        try:
+            with open(path.join(self.store_path, index['version'], doc_name,
+                                locale + '.html')) as html_file:
+                content = html_file.read().decode('utf8')
+        except IOError:
+            content = None
+            localized = False
+
+        return {
+            'content': content,
+            'localized': localized,
+            'translations': doc['translations'],
+        }
+
+
+legal_docs_store = LegalDocsStore(settings.LEGAL_DOCS_RENDERED_PATH)
+
+
 class LegalDocView(TemplateView):
     """
     Generic view for loading a legal doc and displaying it with a template.
@@ -72,6 +158,9 @@ class LegalDocView(TemplateView):
     * legal_doc_name: The name of the folder in the legal_docs repo.
     * legal_doc_context_name: (default 'doc') template variable name for legal doc.
 
+    Docs are read from the store written by `./manage.py render_legal_docs`,
+    or rendered from the Markdown files if they aren't in the store.
+
     This view automatically adds the `cache_page` decorator. The default timeout
     is 1 hour, configurable by setting the `LEGAL_DOCS_CACHE_TIMEOUT` setting to change
     the default for all views, or the `cache_timeout` property for an single instance.
@@ -84,7 +173,11 @@ class LegalDocView(TemplateView):
 
     def get_legal_doc(self):
         locale = l10n_utils.get_locale(self.request)
-        return load_legal_doc(self.legal_doc_name, locale)
+        legal_doc = legal_docs_store.get(self.legal_doc_name, locale)
+        if legal_doc is None:
+            legal_doc = load_legal_doc(self.legal_doc_name, locale)
+
+        return legal_doc
 
     def render_to_response(self, context, **response_kwargs):
         response_kwargs.setdefault('content_type', self.content_type)
@@ -21,16 +21,34 @@ class CreditsFile(ExternalFile):
 
         return content
 
+    def parse(self, lines):
+        rows = self.parse_rows(lines)
+        return {
+            'rows': rows,
+            'ordered': self.order_rows(rows),
+        }
+
     @property
     def ordered(self):
         """
         Returns an OrderedDict of sorted lists of names by first letter of sortkey.
 
-        :param credits_data: any iterable of CSV formatted strings.
         :return: OrderedDict
         """
+        return self.parsed['ordered']
+
+    @property
+    def rows(self):
+        """
+        Returns a list of lists sorted by the sortkey column.
+
+        :return: list of lists
+        """
+        return self.parsed['rows']
+
+    def order_rows(self, rows):
         ordered_names = OrderedDict()
-        for name, sortkey in self.rows:
+        for name, sortkey in rows:
             letter = sortkey[0]
             if letter not in ordered_names:
                 ordered_names[letter] = []
@@ -39,16 +57,15 @@ class CreditsFile(ExternalFile):
 
         return ordered_names
 
-    @property
-    def rows(self):
+    def parse_rows(self, lines):
         """
         Returns a list of lists sorted by the sortkey column.
 
-        :param credits_data: any iterable of CSV formatted strings.
+        :param lines: any iterable of CSV formatted strings.
         :return: list of lists
         """
         names = []
-        for row in csv.reader(self.readlines()):
+        for row in csv.reader(lines):
             if len(row) == 1:
                 name = sortkey = row[0]
             elif len(row) == 2:
@@ -6,29 +6,38 @@ from django.conf import settings
 from django.core.cache import cache
 
 import cronjobs
-import feedparser
 
+from bedrock.mozorg.feed_ingest import fetch_all, forget_validators, parse_feeds
 from bedrock.mozorg.models import TwitterCache
-from bedrock.mozorg.util import get_tweets
+from bedrock.mozorg.util import compact_tweets, get_tweets
+
+
+def feed_cache_key(name):
+    return 'feeds-%s' % name
 
 
 @cronjobs.register
 def update_feeds():
     for name, url in settings.FEEDS.items():
-        feed_info = feedparser.parse(url)
-        # Cache for a year (it will be set by the cron job no matter
-        # what on a set interval)
-        cache.set('feeds-%s' % name, feed_info, 60 * 60 * 24 * 365)
+        if cache.get(feed_cache_key(name)) is None:
+            forget_validators(url)
+
+    parsed_feeds = parse_feeds(settings.FEEDS.values())
+    for name, url in settings.FEEDS.items():
+        feed_info = parsed_feeds.get(url)
+        if feed_info is not None:
+            # Cache for a year (it will be set by the cron job no matter
+            # what on a set interval)
+            cache.set(feed_cache_key(name), feed_info, 60 * 60 * 24 * 365)
+
+
+def fetch_tweets(account):
+    tweets = get_tweets(account)
+    return tweets and compact_tweets(tweets)
 
 
 @cronjobs.register
 def update_tweets():
-    for account in settings.TWITTER_ACCOUNTS:
-        tweets = get_tweets(account)
-
-        if tweets:
-            account_cache, created = TwitterCache.objects.get_or_create(
-                account=account, defaults={'tweets': tweets})
-            if not created:
-                account_cache.tweets = tweets
-                account_cache.save()
+    fetched = fetch_all(fetch_tweets, settings.TWITTER_ACCOUNTS)
+    TwitterCache.objects.update_tweets(
+        dict((account, tweets) for account, tweets in fetched.items() if tweets))
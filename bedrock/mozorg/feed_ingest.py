@@ -0,0 +1,89 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+Fetching of the feeds and tweets stored by the cron jobs.
+
+Every source is fetched in its own thread, so a run takes about as long as
+the slowest source instead of the sum of all of them. Feeds are requested
+with the validators of their last response, kept in `FeedValidators`, and
+aren't downloaded or parsed again until they change.
+"""
+import logging
+
+import feedparser
+from concurrent.futures import ThreadPoolExecutor
+
+from bedrock.mozorg.models import FeedValidators
+
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 10
+
+
+def fetch_all(fetch, sources):
+    """
+    Call `fetch(source)` concurrently for every source.
+
+    :return: dict of the result for each source. Sources `fetch` raised an
+             exception for are logged and left out.
+    """
+    sources = list(sources)
+    if not sources:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(sources))) as executor:
+        futures = [executor.submit(fetch, source) for source in sources]
+
+    results = {}
+    for source, future in zip(sources, futures):
+        try:
+            results[source] = future.result()
+        except Exception:
+            logger.exception('Unable to fetch %s', source)
+
+    return results
+
+
+def forget_validators(url):
+    """Fetch the feed in full the next time, e.g. when its stored copy is gone."""
+    FeedValidators.objects.forget(url)
+
+
+def parse_feed(url, validators=None):
+    """
+    Fetch and parse the feed, if it changed since the response `validators`
+    are from.
+
+    :param validators: dict of the `etag` and `modified` of the last response
+    """
+    validators = validators or {}
+    return feedparser.parse(url, etag=validators.get('etag'),
+                            modified=validators.get('modified'))
+
+
+def parse_feeds(urls):
+    """
+    Fetch and parse the feeds concurrently.
+
+    :return: dict of the parsed feed for each URL, None for feeds that
+             aren't modified. Feeds that couldn't be fetched are left out.
+    """
+    urls = list(urls)
+    # the database is only used from this thread
+    validators = FeedValidators.objects.get_for(urls)
+    fetched = fetch_all(lambda url: parse_feed(url, validators.get(url)), urls)
+
+    parsed_feeds = {}
+    for url, parsed in fetched.items():
+        status = parsed.get('status')
+        if status == 304:
+            parsed_feeds[url] = None
+            continue
+
+        if status == 200:
+            FeedValidators.objects.set_for(url, parsed.get('etag'), parsed.get('modified'))
+        parsed_feeds[url] = parsed
+
+    return parsed_feeds
@@ -17,16 +17,17 @@ from localflavor.us.us_states import STATE_CHOICES
 
 import basket
 
-from lib.l10n_utils.dotlang import _
-from lib.l10n_utils.dotlang import _lazy
+from lib.l10n_utils.dotlang import bind
 from product_details import product_details
 
 
+LANG_FILES = ['firefox/partners/index', 'mozorg/contribute',
+              'mozorg/contribute/index', 'mozorg/newsletters']
+_, _lazy = bind(__name__)
+
 FORMATS = (('H', _lazy('HTML')), ('T', _lazy('Text')))
 LANGS_TO_STRIP = ['en-US', 'es']
 PARENTHETIC_RE = re.compile(r' \([^)]+\)$')
-LANG_FILES = ['firefox/partners/index', 'mozorg/contribute',
-              'mozorg/contribute/index', 'mozorg/newsletters']
 
 
 def strip_parenthetical(lang_name):
@@ -27,7 +27,10 @@ class ForumsFile(ExternalFile):
 
     @property
     def ordered(self):
-        return self._parse(self.readlines())
+        return self.parsed
+
+    def parse(self, lines):
+        return self._parse(lines)
 
     def _parse(self, lines):
         forums = OrderedDict()
@@ -10,6 +10,9 @@ import jingo
 from lib.l10n_utils.dotlang import _
 
 
+TWEET_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
 @jingo.register.function
 def format_tweet_body(tweet):
     """
@@ -60,7 +63,7 @@ def format_tweet_timestamp(tweet):
     """
     Return an HTML time element filled with a tweet timestamp.
 
-    @param tweet: A Tweepy Status object retrieved with the Twitter REST API.
+    @param tweet: A tweet stored by `bedrock.mozorg.util.compact_tweet`.
 
     For a tweet posted within the last 24 hours, the timestamp label should be
     a relative format like "20s", "3m" or 5h", otherwise it will be a simple
@@ -68,7 +71,7 @@ def format_tweet_timestamp(tweet):
     https://dev.twitter.com/terms/display-requirements
     """
     now = datetime.utcnow()
-    created = tweet.created_at  # A datetime object
+    created = datetime.strptime(tweet['created_at'], TWEET_TIME_FORMAT)
     diff = now - created  # A timedelta Object
 
     if diff.days == 0:
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.cache import cache
+from django.db import migrations
+
+from bedrock.mozorg.models import twitter_cache_key
+from bedrock.mozorg.util import compact_tweets
+
+
+def compact_stored_tweets(apps, schema_editor):
+    TwitterCache = apps.get_model('mozorg', 'TwitterCache')
+    for twitter_cache in TwitterCache.objects.all():
+        tweets = twitter_cache.tweets
+        if tweets and not isinstance(tweets[0], dict):
+            twitter_cache.tweets = compact_tweets(tweets)
+            twitter_cache.save(update_fields=['tweets'])
+        cache.delete(twitter_cache_key(twitter_cache.account))
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mozorg', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_stored_tweets, noop),
+    ]
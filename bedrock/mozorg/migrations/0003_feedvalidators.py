@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mozorg', '0002_compact_tweets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedValidators',
+            fields=[
+                ('url_hash', models.CharField(max_length=32, serialize=False, primary_key=True)),
+                ('url', models.URLField(max_length=2000)),
+                ('etag', models.CharField(max_length=255, blank=True)),
+                ('modified', models.CharField(max_length=100, blank=True)),
+                ('updated', models.DateTimeField()),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+    ]
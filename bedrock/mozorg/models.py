@@ -1,8 +1,12 @@
+import hashlib
+from datetime import timedelta
+
 from django.core.cache import cache
-from django.db import models
+from django.db import models, transaction
 from django.db.models.signals import post_save
 from django.db.utils import DatabaseError
 from django.dispatch import receiver
+from django.utils import timezone
 
 from picklefield import PickledObjectField
 from django_extensions.db.fields import ModificationDateTimeField
@@ -43,9 +47,47 @@ class TwitterCacheManager(models.Manager):
                 cache_tweets(account, tweets)
         return tweets
 
+    def update_tweets(self, tweets_by_account):
+        """
+        Store the fetched tweets of every account in a single transaction,
+        writing and caching only the accounts whose tweets changed.
+
+        :param tweets_by_account: dict of the list of compact tweets of each
+                                  account, see `bedrock.mozorg.util.compact_tweet`.
+        :return: list of the accounts that changed.
+        """
+        if not tweets_by_account:
+            return []
+
+        existing = dict((cached.account, cached.tweets) for cached in
+                        self.filter(account__in=tweets_by_account.keys()))
+        changed = [account for account, tweets in tweets_by_account.items()
+                   if existing.get(account) != tweets]
+        if not changed:
+            return []
+
+        with transaction.atomic():
+            new_caches = []
+            for account in changed:
+                tweets = tweets_by_account[account]
+                if account in existing:
+                    self.filter(account=account).update(tweets=tweets,
+                                                        updated=timezone.now())
+                else:
+                    new_caches.append(TwitterCache(account=account, tweets=tweets))
+
+            self.bulk_create(new_caches)
+
+        # bulk writes don't send post_save
+        for account in changed:
+            cache_tweets(account, tweets_by_account[account])
+
+        return changed
+
 
 class TwitterCache(models.Model):
     account = models.CharField(max_length=100, db_index=True, unique=True)
+    # the tweets shown on the pages, see `bedrock.mozorg.util.compact_tweet`
     tweets = PickledObjectField(default=list)
     updated = ModificationDateTimeField()
     objects = TwitterCacheManager()
@@ -60,6 +102,58 @@ def twitter_cache_post_save(sender, **kwargs):
     cache_tweets(instance.account, instance.tweets)
 
 
+def feed_url_hash(url):
+    return hashlib.md5(url).hexdigest()
+
+
+class FeedValidatorsManager(models.Manager):
+    # validators are ignored after a day, so every feed is fetched in full at
+    # least daily.
+    max_age = timedelta(days=1)
+
+    def get_for(self, urls):
+        """
+        Return a dict of the validators of the last full response of each feed
+        fetched in the last `max_age`, as a dict with `etag` and `modified`.
+        """
+        hashes = dict((feed_url_hash(url), url) for url in urls)
+        recent = self.filter(url_hash__in=hashes.keys(),
+                             updated__gt=timezone.now() - self.max_age)
+        return dict((hashes[validators.url_hash], {
+            'etag': validators.etag or None,
+            'modified': validators.modified or None,
+        }) for validators in recent)
+
+    def set_for(self, url, etag, modified):
+        self.update_or_create(url_hash=feed_url_hash(url), defaults={
+            'url': url,
+            'etag': etag or '',
+            'modified': modified or '',
+            'updated': timezone.now(),
+        })
+
+    def forget(self, url):
+        """Fetch the feed in full the next time."""
+        self.filter(url_hash=feed_url_hash(url)).delete()
+
+
+class FeedValidators(models.Model):
+    """
+    The ETag and Last-Modified of the last full response of a feed, so cron
+    jobs can request it again only if it changed.
+    """
+    url_hash = models.CharField(max_length=32, primary_key=True)
+    url = models.URLField(max_length=2000)
+    etag = models.CharField(max_length=255, blank=True)
+    modified = models.CharField(max_length=100, blank=True)
+    updated = models.DateTimeField()
+
+    objects = FeedValidatorsManager()
+
+    def __unicode__(self):
+        return self.url
+
+
 class ContributorActivityManager(models.Manager):
     def group_by_date_and_source(self, source):
         try:
@@ -0,0 +1,102 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+from django_statsd.clients import statsd
+from product_details import product_details
+
+from lib.l10n_utils.dotlang import get_l10n_version
+
+
+def get_revision():
+    """Return the git revision written to static/revision.txt when building the site."""
+    try:
+        with open(os.path.join(settings.ROOT, 'static', 'revision.txt')) as revision:
+            return revision.read().strip()
+    except IOError:
+        return ''
+
+
+class PageCache(object):
+    """
+    Rendered responses of the views defined with `bedrock.mozorg.util.page`.
+
+    Responses are keyed by the path, locale and template of the page, the
+    funnelcake `f` query param and the request headers the page varies on.
+    A response is fresh for `timeout` seconds and is kept as long again, during
+    which it is still served while a single request renders a fresh copy.
+
+    Every response is dropped when the site is deployed, `l10n_update` pulls
+    new translations or product details are updated. Those are checked at most
+    every `version_check_interval` seconds.
+    """
+    version_check_interval = 60
+    lock_timeout = 60
+
+    def __init__(self):
+        self.version = None
+        self.version_checked = 0
+
+    def get_version(self):
+        now = time.time()
+        if now - self.version_checked > self.version_check_interval:
+            parts = [get_revision(), get_l10n_version(), product_details.last_update]
+            self.version = hashlib.md5(repr(parts)).hexdigest()
+            self.version_checked = now
+
+        return self.version
+
+    def key(self, request, template, vary):
+        parts = [self.get_version(), request.path, getattr(request, 'locale', ''),
+                 template, request.GET.get('f', '')]
+        for header in vary:
+            parts.append(request.META.get('HTTP_' + header.upper().replace('-', '_'), ''))
+
+        key = u'\n'.join(parts).encode('utf-8')
+        return 'page_cache:' + hashlib.md5(key).hexdigest()
+
+    def get_or_render(self, request, template, render, timeout, vary=()):
+        """
+        Return the cached response for the page if there is one, otherwise
+        return the response from `render()`, caching it if it can be shared.
+        """
+        key = self.key(request, template, vary)
+        lock_key = key + ':lock'
+        now = time.time()
+        cached = cache.get(key)
+        if cached is not None:
+            expires, response = cached
+            if now < expires:
+                statsd.incr('page_cache.hit')
+                return response
+
+            if not cache.add(lock_key, True, self.lock_timeout):
+                # another request is already rendering a fresh copy
+                statsd.incr('page_cache.stale')
+                return response
+
+        statsd.incr('page_cache.miss')
+        try:
+            response = render()
+            if vary:
+                patch_vary_headers(response, vary)
+
+            # don't share redirects to other locales or responses setting cookies
+            if response.status_code == 200 and not response.cookies:
+                cache.set(key, (now + timeout, response), timeout * 2)
+        finally:
+            if cached is not None:
+                cache.delete(lock_key)
+
+        return response
+
+
+page_cache = PageCache()
@@ -0,0 +1,49 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from mock import patch
+from nose.tools import eq_
+
+from bedrock.mozorg import cron
+from bedrock.mozorg.tests import TestCase
+
+
+FEEDS = {'dude': 'https://example.com/dude', 'walter': 'https://example.com/walter'}
+
+
+@override_settings(FEEDS=FEEDS)
+@patch.object(cron, 'parse_feeds')
+class TestUpdateFeeds(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_unmodified_feeds_kept(self, parse_feeds):
+        parse_feeds.return_value = {FEEDS['dude']: 'new dude', FEEDS['walter']: None}
+        cache.set('feeds-dude', 'old dude')
+        cache.set('feeds-walter', 'old walter')
+        cron.update_feeds()
+        eq_(cache.get('feeds-dude'), 'new dude')
+        eq_(cache.get('feeds-walter'), 'old walter')
+
+    @patch.object(cron, 'forget_validators')
+    def test_missing_feeds_fetched_in_full(self, forget_validators, parse_feeds):
+        parse_feeds.return_value = {}
+        cache.set('feeds-dude', 'old dude')
+        cron.update_feeds()
+        forget_validators.assert_called_once_with(FEEDS['walter'])
+
+
+@override_settings(TWITTER_ACCOUNTS=['dude', 'walter', 'donny'])
+class TestUpdateTweets(TestCase):
+    @patch.object(cron.TwitterCache.objects, 'update_tweets')
+    @patch.object(cron, 'get_tweets')
+    def test_update_tweets(self, get_tweets, update_tweets):
+        """Accounts the tweets couldn't be fetched for should be left alone."""
+        get_tweets.side_effect = lambda account: {'dude': ['abides'], 'walter': []}.get(account)
+        with patch.object(cron, 'compact_tweets', lambda tweets: [t.upper() for t in tweets]):
+            cron.update_tweets()
+        update_tweets.assert_called_once_with({'dude': ['ABIDES']})
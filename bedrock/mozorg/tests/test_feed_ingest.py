@@ -0,0 +1,67 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from django.core.cache import cache
+
+import feedparser
+from mock import patch
+from nose.tools import eq_
+
+from bedrock.mozorg import feed_ingest
+from bedrock.mozorg.tests import TestCase
+
+
+URL = 'https://example.com/feed'
+
+
+@patch.object(feed_ingest.feedparser, 'parse')
+class TestParseFeeds(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_validators(self, parse):
+        """The validators of the last response should be sent with the next request."""
+        parse.return_value = feedparser.FeedParserDict(
+            status=200, etag='"dude"', modified='Sat, 01 Jan 2000 00:00:00 GMT')
+        eq_(feed_ingest.parse_feeds([URL]), {URL: parse.return_value})
+        parse.assert_called_with(URL, etag=None, modified=None)
+
+        # validators outlive the cache of the process
+        cache.clear()
+        parse.return_value = feedparser.FeedParserDict(status=304)
+        eq_(feed_ingest.parse_feeds([URL]), {URL: None})
+        parse.assert_called_with(URL, etag='"dude"',
+                                 modified='Sat, 01 Jan 2000 00:00:00 GMT')
+
+    def test_forget_validators(self, parse):
+        parse.return_value = feedparser.FeedParserDict(status=200, etag='"dude"')
+        feed_ingest.parse_feeds([URL])
+        feed_ingest.forget_validators(URL)
+        feed_ingest.parse_feeds([URL])
+        parse.assert_called_with(URL, etag=None, modified=None)
+
+    def test_error_not_kept(self, parse):
+        """Validators of error responses should not be kept."""
+        parse.return_value = feedparser.FeedParserDict(status=500, etag='"dude"')
+        eq_(feed_ingest.parse_feeds([URL]), {URL: parse.return_value})
+        feed_ingest.parse_feeds([URL])
+        parse.assert_called_with(URL, etag=None, modified=None)
+
+    def test_fetch_error(self, parse):
+        """Feeds that couldn't be fetched should be left out."""
+        parse.side_effect = IOError
+        eq_(feed_ingest.parse_feeds([URL]), {})
+
+
+class TestFetchAll(TestCase):
+    def test_fetch_all(self):
+        """Results should be returned by source, leaving out the failed ones."""
+        def fetch(source):
+            if source == 'walter':
+                raise ValueError(source)
+            return source.upper()
+
+        eq_(feed_ingest.fetch_all(fetch, ['dude', 'walter', 'donny']),
+            {'dude': 'DUDE', 'donny': 'DONNY'})
+        eq_(feed_ingest.fetch_all(fetch, []), {})
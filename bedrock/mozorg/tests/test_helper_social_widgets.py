@@ -13,6 +13,7 @@ import tweepy
 
 from bedrock.mozorg.tests import TestCase
 from bedrock.mozorg.helpers.social_widgets import *  # noqa
+from bedrock.mozorg.util import compact_tweet
 
 
 TEST_FILES_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
@@ -49,4 +50,4 @@ class TestFormatTweet(TestCase):
             u'<time datetime="2014-01-16T19:28:24" title="2014-01-16 19:28" '
             u'itemprop="dateCreated">16 Jan <span class="full">(2014-01-16 '
             u'19:28)</span></time>')
-        self.assertEqual(format_tweet_timestamp(self.tweet), expected)
+        self.assertEqual(format_tweet_timestamp(compact_tweet(self.tweet)), expected)
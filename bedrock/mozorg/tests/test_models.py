@@ -3,16 +3,24 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from datetime import timedelta
+
 from django.core.cache import cache
 from django.db.utils import DatabaseError
 from django.db.models.signals import post_save
+from django.utils import timezone
 
 from mock import patch
+from nose.tools import eq_
 
-from bedrock.mozorg.models import TwitterCache
+from bedrock.mozorg.models import FeedValidators, TwitterCache, twitter_cache_key
 from bedrock.mozorg.tests import TestCase
 
 
+def make_tweet(id, text):
+    return {'id': id, 'text': text}
+
+
 @patch.object(TwitterCache.objects, 'get')
 class TestTwitterCacheManager(TestCase):
     def setUp(self):
@@ -62,3 +70,50 @@ class TestTwitterCacheManager(TestCase):
         post_save.send(TwitterCache,
                        instance=TwitterCache(account='me', tweets=['I twote']))
         mock_cache_tweets.assert_called_once_with('me', ['I twote'])
+
+
+class TestUpdateTweets(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_update_tweets(self):
+        """Only new accounts and accounts with new tweets should be written and cached."""
+        TwitterCache.objects.create(account='dude', tweets=[make_tweet(1, 'abides')])
+        TwitterCache.objects.create(account='walter', tweets=[make_tweet(2, 'rules')])
+        cache.clear()
+
+        changed = TwitterCache.objects.update_tweets({
+            'dude': [make_tweet(1, 'abides')],
+            'walter': [make_tweet(3, 'shomer shabbos'), make_tweet(2, 'rules')],
+            'donny': [make_tweet(4, 'phone')],
+        })
+        eq_(sorted(changed), ['donny', 'walter'])
+        eq_(cache.get(twitter_cache_key('dude')), None)
+        eq_(cache.get(twitter_cache_key('walter')),
+            [make_tweet(3, 'shomer shabbos'), make_tweet(2, 'rules')])
+        eq_(TwitterCache.objects.get(account='walter').tweets,
+            [make_tweet(3, 'shomer shabbos'), make_tweet(2, 'rules')])
+        eq_(TwitterCache.objects.get(account='donny').tweets, [make_tweet(4, 'phone')])
+
+    def test_update_tweets_unchanged(self):
+        TwitterCache.objects.create(account='dude', tweets=[make_tweet(1, 'abides')])
+        with self.assertNumQueries(1):
+            eq_(TwitterCache.objects.update_tweets({'dude': [make_tweet(1, 'abides')]}), [])
+
+
+class TestFeedValidators(TestCase):
+    def test_validators(self):
+        url = 'https://example.com/feed'
+        FeedValidators.objects.set_for(url, '"dude"', None)
+        eq_(FeedValidators.objects.get_for([url, 'https://example.com/other']),
+            {url: {'etag': '"dude"', 'modified': None}})
+
+        FeedValidators.objects.forget(url)
+        eq_(FeedValidators.objects.get_for([url]), {})
+
+    def test_old_validators_ignored(self):
+        """Feeds should be fetched in full at least daily."""
+        url = 'https://example.com/feed'
+        FeedValidators.objects.set_for(url, '"dude"', None)
+        FeedValidators.objects.update(updated=timezone.now() - timedelta(days=2))
+        eq_(FeedValidators.objects.get_for([url]), {})
@@ -0,0 +1,95 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseRedirect
+from django.test import RequestFactory
+
+from mock import Mock, patch
+from nose.tools import eq_, ok_
+
+from bedrock.mozorg.page_cache import PageCache
+from bedrock.mozorg.tests import TestCase
+
+
+@patch('bedrock.mozorg.page_cache.statsd')
+@patch('bedrock.mozorg.page_cache.get_revision', Mock(return_value='abcdef'))
+class TestPageCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.rf = RequestFactory()
+        self.page_cache = PageCache()
+        self.render = Mock(side_effect=lambda: HttpResponse('The Dude abides.'))
+
+    def get(self, path='/en-US/dude/', locale='en-US', **kwargs):
+        request = self.rf.get(path, **kwargs)
+        request.locale = locale
+        return self.page_cache.get_or_render(request, 'dude.html', self.render, 300,
+                                             ['User-Agent'])
+
+    def test_hit(self, statsd_mock):
+        eq_(self.get().content, 'The Dude abides.')
+        eq_(self.get().content, 'The Dude abides.')
+        eq_(self.render.call_count, 1)
+        statsd_mock.incr.assert_any_call('page_cache.miss')
+        statsd_mock.incr.assert_called_with('page_cache.hit')
+
+    def test_key(self, statsd_mock):
+        """Pages should be cached by locale, funnelcake and vary headers."""
+        self.get()
+        self.get('/de/dude/', locale='de')
+        self.get(data={'f': '42'})
+        self.get(HTTP_USER_AGENT='Firefox')
+        eq_(self.render.call_count, 4)
+
+        # other query params are not part of the key
+        self.get(data={'utm_source': 'the-bowling-alley'})
+        self.get('/de/dude/', locale='de', HTTP_ACCEPT_LANGUAGE='fr')
+        eq_(self.render.call_count, 4)
+
+    def test_vary_header(self, statsd_mock):
+        eq_(self.get()['Vary'], 'User-Agent')
+        eq_(self.get()['Vary'], 'User-Agent')
+
+    def test_not_cached(self, statsd_mock):
+        """Redirects and responses that set cookies should not be cached."""
+        self.render.side_effect = lambda: HttpResponseRedirect('/fr/dude/')
+        self.get()
+        self.get()
+        eq_(self.render.call_count, 2)
+
+        def set_cookie():
+            response = HttpResponse('The Dude abides.')
+            response.set_cookie('walter', 'sobchak')
+            return response
+
+        self.render.side_effect = set_cookie
+        self.get()
+        self.get()
+        eq_(self.render.call_count, 4)
+
+    @patch('bedrock.mozorg.page_cache.time')
+    def test_stale_while_revalidate(self, time_mock, statsd_mock):
+        time_mock.time.return_value = 1000
+        self.get()
+        # expired: a single request renders a new copy while the others get the stale one
+        time_mock.time.return_value = 1301
+        self.render.side_effect = lambda: HttpResponse('The Dude abides again.')
+        with patch.object(cache, 'add', return_value=False):
+            eq_(self.get().content, 'The Dude abides.')
+        statsd_mock.incr.assert_called_with('page_cache.stale')
+        eq_(self.render.call_count, 1)
+
+        eq_(self.get().content, 'The Dude abides again.')
+        eq_(self.get().content, 'The Dude abides again.')
+        eq_(self.render.call_count, 2)
+
+    def test_version(self, statsd_mock):
+        """A new deploy, l10n update or product details update should drop the cache."""
+        self.get()
+        with patch('bedrock.mozorg.page_cache.get_l10n_version', return_value=42):
+            self.page_cache.version_checked = 0
+            self.get()
+        eq_(self.render.call_count, 2)
+        ok_(self.page_cache.version)
@@ -4,6 +4,7 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import json
 import os
 
 from django.test import RequestFactory
@@ -11,9 +12,11 @@ from django.test.utils import override_settings
 
 from mock import ANY, patch
 from nose.tools import ok_, eq_
+import tweepy
 
 from bedrock.mozorg.tests import TestCase
-from bedrock.mozorg.util import get_fb_like_locale, get_tweets, page
+from bedrock.mozorg.util import (compact_tweet, compact_tweets, get_fb_like_locale,
+                                 get_tweets, page)
 
 
 ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_files')
@@ -41,6 +44,36 @@ class TestTwitterAPI(TestCase):
                                                                   count=100)
 
 
+class TestCompactTweet(TestCase):
+    with open(os.path.join(ROOT, 'data', 'tweets.json')) as tweets_file:
+        tweets = [tweepy.models.Status.parse(tweepy.api, tweet)
+                  for tweet in json.load(tweets_file)]
+
+    def test_compact_tweet(self):
+        tweet = compact_tweet(self.tweets[5])
+        eq_(tweet['id'], self.tweets[5].id)
+        eq_(tweet['created_at'], '2014-01-16T19:28:24')
+        eq_(tweet['user']['screen_name'], self.tweets[5].user.screen_name)
+        ok_(tweet['html'].startswith('Want more information about the <a href='))
+        eq_(tweet['media'], [])
+        eq_(tweet['retweeted_status'], None)
+        # stored compact tweets are plain values
+        eq_(json.loads(json.dumps(tweet)), tweet)
+
+    def test_compact_retweet(self):
+        """Retweets should keep the photos of the retweeted status."""
+        tweet = compact_tweet(self.tweets[11])
+        retweeted = tweet['retweeted_status']
+        eq_(retweeted['id'], self.tweets[11].retweeted_status.id)
+        eq_(len(retweeted['media']), 1)
+        ok_(retweeted['media'][0]['media_url_https'].startswith('https://'))
+
+    def test_compact_tweets(self):
+        """Only the tweets the pages show should be kept."""
+        eq_([tweet['id'] for tweet in compact_tweets(self.tweets)],
+            [tweet.id for tweet in self.tweets[:6]])
+
+
 class TestGetFacebookLikeLocale(TestCase):
 
     def test_supported_locale(self):
@@ -105,6 +138,32 @@ class TestPageUtil(TestCase):
         ok_(not djrender_mock.called)
         l10n_mock.render.assert_called_with(ANY, 'index.html', {'urlname': 'index'})
 
+    @patch('bedrock.mozorg.util.page_cache')
+    def test_cache_timeout(self, cache_mock, l10n_mock, djrender_mock):
+        """Pages with a cache_timeout should be rendered through the page cache."""
+        url = page('walter/abides', 'walter/abides.html', cache_timeout=300,
+                   cache_vary=['User-Agent'])
+        request = self.rf.get('/walter/abides/')
+        url.callback(request)
+        cache_mock.get_or_render.assert_called_with(request, 'walter/abides.html', ANY,
+                                                    300, ['User-Agent'])
+        ok_(not l10n_mock.render.called)
+
+        # the render function renders the page
+        cache_mock.get_or_render.call_args[0][2]()
+        l10n_mock.render.assert_called_with(ANY, 'walter/abides.html', {'urlname': 'walter.abides'})
+
+        cache_mock.reset_mock()
+        url.callback(self.rf.post('/walter/abides/'))
+        ok_(not cache_mock.get_or_render.called)
+
+    @patch('bedrock.mozorg.util.page_cache')
+    def test_no_cache_timeout(self, cache_mock, l10n_mock, djrender_mock):
+        url = page('walter/abides', 'walter/abides.html')
+        url.callback(self.rf.get('/walter/abides/'))
+        ok_(not cache_mock.get_or_render.called)
+        ok_(l10n_mock.render.called)
+
     def test_url_name_set_from_template(self, l10n_mock, djrender_mock):
         """If not provided the URL pattern name should be set from the template path."""
         url = page('lebowski/urban_achievers', 'lebowski/achievers.html')
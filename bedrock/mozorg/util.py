@@ -13,6 +13,8 @@ from django.views.decorators.csrf import csrf_exempt
 
 import tweepy
 import commonware.log
+from bedrock.mozorg.helpers.social_widgets import TWEET_TIME_FORMAT, format_tweet_body
+from bedrock.mozorg.page_cache import page_cache
 from lib import l10n_utils
 
 try:
@@ -23,6 +25,9 @@ except ImportError:
 
 log = commonware.log.getLogger('mozorg.util')
 
+# the most tweets of an account any page shows
+STORED_TWEETS = 6
+
 
 class HttpResponseJSON(HttpResponse):
     def __init__(self, data, status=None, cors=False):
@@ -34,7 +39,8 @@ class HttpResponseJSON(HttpResponse):
             self['Access-Control-Allow-Origin'] = '*'
 
 
-def page(name, tmpl, decorators=None, url_name=None, **kwargs):
+def page(name, tmpl, decorators=None, url_name=None, cache_timeout=None,
+         cache_vary=None, **kwargs):
     """
     Define a bedrock page.
 
@@ -51,6 +57,11 @@ def page(name, tmpl, decorators=None, url_name=None, **kwargs):
         be applied to the view.
     @param url_name: The value to use as the URL name, default is to coerce
         the template path into a name as described above.
+    @param cache_timeout: Number of seconds to cache the rendered page for.
+        Only use this for pages whose content depends on nothing but the
+        locale, the funnelcake `f` query param and the headers in `cache_vary`.
+    @param cache_vary: Names of the request headers the page content depends
+        on when `cache_timeout` is set.
     @param kwargs: Any additional arguments are passed to l10n_utils.render
         after the request and the template name.
     """
@@ -71,6 +82,13 @@ def page(name, tmpl, decorators=None, url_name=None, **kwargs):
                 'mozorg.util.page:' + url_name.replace('.', '_'))
         kwargs.setdefault('urlname', url_name)
 
+        if cache_timeout and request.method in ('GET', 'HEAD'):
+            return page_cache.get_or_render(request, tmpl, lambda: _render(request),
+                                            cache_timeout, cache_vary or ())
+
+        return _render(request)
+
+    def _render(request):
         # skip l10n if path exempt
         name_prefix = request.path_info.split('/', 2)[1]
         if name_prefix in settings.SUPPORTED_NONLOCALES:
@@ -161,3 +179,34 @@ def get_tweets(account):
         return TwitterAPI(account).user_timeline(**account_opts)
     except Exception:
         return None
+
+
+def compact_tweet(tweet):
+    """
+    Return the parts of a tweet the pages show, with its body already
+    formatted as HTML, as a dict of plain values.
+
+    :param tweet: a Status object retrieved with the Twitter REST API.
+    """
+    retweeted_status = getattr(tweet, 'retweeted_status', None)
+    return {
+        'id': tweet.id,
+        'text': tweet.text,
+        'html': format_tweet_body(tweet),
+        'created_at': tweet.created_at.strftime(TWEET_TIME_FORMAT),
+        'user': {
+            'name': tweet.user.name,
+            'screen_name': tweet.user.screen_name,
+            'profile_image_url_https': tweet.user.profile_image_url_https,
+        },
+        'media': [{
+            'expanded_url': medium['expanded_url'],
+            'media_url_https': medium['media_url_https'],
+        } for medium in tweet.entities.get('media', []) if medium['type'] == 'photo'],
+        'retweeted_status': retweeted_status and compact_tweet(retweeted_status),
+    }
+
+
+def compact_tweets(tweets):
+    """Return the compact form of the tweets the pages show."""
+    return [compact_tweet(tweet) for tweet in tweets[:STORED_TWEETS]]
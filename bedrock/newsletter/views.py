@@ -21,7 +21,7 @@ from jinja2 import Markup
 
 import lib.l10n_utils as l10n_utils
 import requests
-from lib.l10n_utils.dotlang import _, _lazy
+from lib.l10n_utils.dotlang import bind
 from commonware.decorators import xframe_allow
 from bedrock.base.urlresolvers import reverse
 
@@ -35,6 +35,8 @@ from bedrock.newsletter import utils
 log = commonware.log.getLogger('b.newsletter')
 
 LANG_FILES = ['mozorg/newsletters']
+_, _lazy = bind(__name__)
+
 general_error = _lazy(u'We are sorry, but there was a problem '
                       u'with our system. Please try again later!')
 thank_you = _lazy(u'Thanks for updating your email preferences.')
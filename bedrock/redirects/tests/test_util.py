@@ -4,6 +4,7 @@
 from urlparse import parse_qs, urlparse
 
 from django.conf.urls import RegexURLPattern
+from django.core.urlresolvers import RegexURLResolver, Resolver404
 from django.test import TestCase
 from django.test.client import RequestFactory
 
@@ -11,8 +12,9 @@ from mock import patch
 from nose.tools import eq_, ok_
 
 from bedrock.redirects.middleware import RedirectsMiddleware
-from bedrock.redirects.util import (get_resolver, header_redirector, is_firefox_redirector,
-                                    no_redirect, redirect, ua_redirector)
+from bedrock.redirects.util import (PrefixTrie, get_resolver, gone, header_redirector,
+                                    is_firefox_redirector, literal_prefix, no_redirect,
+                                    redirect, redirectpatterns, ua_redirector)
 
 
 class TestHeaderRedirector(TestCase):
@@ -338,3 +340,104 @@ class TestRedirectUrlPattern(TestCase):
         resp = middleware.process_request(self.rf.get('/iam/the/walrus/'))
         eq_(resp.status_code, 301)
         eq_(resp['Location'], '/coo/coo/cachoo/')
+
+
+def resolve_or_none(resolver, path):
+    try:
+        match = resolver.resolve(path)
+    except Resolver404:
+        return None
+
+    return match.func, match.args, match.kwargs
+
+
+class TestLiteralPrefix(TestCase):
+    def test_plain(self):
+        eq_(literal_prefix(r'iam/the/walrus/$'), 'iam/the/walrus/')
+
+    def test_escapes(self):
+        eq_(literal_prefix(r'help-wanted\.html$'), 'help-wanted.html')
+        eq_(literal_prefix(r'firefox/\d+/notes'), 'firefox/')
+
+    def test_optional_last_char(self):
+        eq_(literal_prefix(r'mwc/?$'), 'mwc')
+        eq_(literal_prefix(r'firefox/notes?/'), 'firefox/note')
+        eq_(literal_prefix(r'abides{1,2}'), 'abide')
+        eq_(literal_prefix(r'dude\.?html'), 'dude')
+
+    def test_required_repeat(self):
+        eq_(literal_prefix(r'bowling+/'), 'bowling')
+
+    def test_groups(self):
+        eq_(literal_prefix(r'iam/the(/.+)?/$'), 'iam/the')
+        eq_(literal_prefix(r'(?P<page>dude)/'), '')
+
+    def test_top_level_alternation(self):
+        eq_(literal_prefix(r'iam/the/walrus|eggman'), '')
+        eq_(literal_prefix(r'iam/the/(walrus|eggman)'), 'iam/the/')
+        eq_(literal_prefix(r'iam/the/[|]'), 'iam/the/')
+
+
+class TestPrefixTrie(TestCase):
+    def test_search(self):
+        trie = PrefixTrie()
+        trie.insert('', 0)
+        trie.insert('iam/', 1)
+        trie.insert('iam/the/walrus', 2)
+        trie.insert('iam/the/eggman', 3)
+        eq_(trie.search('iam/the/walrus/'), [0, 1, 2])
+        eq_(trie.search('iam/a/walrus/'), [0, 1])
+        eq_(trie.search('dude/'), [0])
+
+
+class TestPrefixTrieResolver(TestCase):
+    def setUp(self):
+        self.rf = RequestFactory()
+
+    def test_first_match_wins(self):
+        resolver = get_resolver([
+            redirect(r'^iam/.*/$', '/coo/coo/cachoo/'),
+            redirect(r'^iam/the/walrus/$', '/dammit/donnie/'),
+        ])
+        middleware = RedirectsMiddleware(resolver)
+        resp = middleware.process_request(self.rf.get('/iam/the/walrus/'))
+        eq_(resp['Location'], '/coo/coo/cachoo/')
+
+    def test_unanchored_pattern(self):
+        resolver = get_resolver([
+            redirect(r'^iam/the/walrus/$', '/dammit/donnie/'),
+            gone(r'walrus/$'),
+        ])
+        middleware = RedirectsMiddleware(resolver)
+        resp = middleware.process_request(self.rf.get('/the/dude/is/not/a/walrus/'))
+        eq_(resp.status_code, 410)
+
+    def test_top_level_alternation(self):
+        resolver = get_resolver([redirect(r'^iam/the/walrus/$|^eggman/$', '/dammit/donnie/',
+                                          locale_prefix=False)])
+        middleware = RedirectsMiddleware(resolver)
+        resp = middleware.process_request(self.rf.get('/eggman/'))
+        eq_(resp['Location'], '/dammit/donnie/')
+
+    def test_parity_with_regex_url_resolver(self):
+        """Should resolve every path exactly like the plain RegexURLResolver."""
+        plain = RegexURLResolver(r'^/', redirectpatterns)
+        trie = get_resolver()
+        ok_(redirectpatterns)
+        prefixes = sorted(set(trie._pattern_key(pattern)[2] for pattern in redirectpatterns))
+        # the plain resolver is slow, so only try one variation per prefix
+        templates = ['/{}', '/de/{}', '/{}walrus/', '/en-US/{}.html', '/ES-es/{}']
+        for i, prefix in enumerate(prefixes[::2]):
+            path = templates[i % len(templates)].format(prefix)
+            if i % 3 == 0:
+                path = path.upper()
+            eq_(resolve_or_none(trie, path), resolve_or_none(plain, path))
+
+    def test_few_candidates(self):
+        """Paths that are not redirected should be rejected after trying few patterns."""
+        trie = get_resolver()
+        num_patterns = len(trie.url_patterns)
+        for path in ['/en-US/firefox/new/', '/de/about/', '/en-US/', '/fr/privacy/']:
+            num_candidates = len(trie.candidates(path))
+            ok_(num_candidates * 20 < num_patterns,
+                '{}: {} of {} patterns tried'.format(path, num_candidates, num_patterns))
@@ -6,9 +6,11 @@ import re
 from urllib import urlencode
 from urlparse import parse_qs
 
-from django.core.urlresolvers import NoReverseMatch, RegexURLResolver, reverse
+from django.core.urlresolvers import (NoReverseMatch, RegexURLPattern, RegexURLResolver,
+                                      Resolver404, ResolverMatch, reverse)
 from django.conf.urls import url
 from django.http import HttpResponsePermanentRedirect, HttpResponseRedirect, HttpResponseGone
+from django.utils.encoding import force_text
 from django.views.decorators.vary import vary_on_headers
 
 import commonware.log
@@ -18,6 +20,10 @@ from bedrock.mozorg.decorators import cache_control_expires
 
 log = commonware.log.getLogger('redirects.util')
 LOCALE_RE = r'^(?P<locale>\w{2,3}(?:-\w{2})?/)?'
+locale_re = re.compile(LOCALE_RE, re.UNICODE)
+# inline flags as added by `re_flags`, e.g. "(?i)"
+FLAGS_RE = re.compile(r'\(\?([iLmsux]+)\)')
+REGEX_SPECIAL_CHARS = frozenset('.^$*+?{}[]()|\\')
 # redirects registry
 redirectpatterns = []
 
@@ -27,7 +33,201 @@ def register(patterns):
 
 
 def get_resolver(patterns=None):
-    return RegexURLResolver(r'^/', patterns or redirectpatterns)
+    return PrefixTrieResolver(r'^/', patterns or redirectpatterns)
+
+
+def has_top_level_alternation(pattern):
+    """Return True if `pattern` contains a `|` outside of any group or character set."""
+    depth = 0
+    in_set = False
+    chars = iter(pattern)
+    for char in chars:
+        if char == '\\':
+            next(chars, None)
+        elif in_set:
+            if char == ']':
+                in_set = False
+        elif char == '[':
+            in_set = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+
+    return False
+
+
+def literal_prefix(pattern):
+    """
+    Return the literal text that any path matched by the (already anchored and
+    de-prefixed) `pattern` must start with. May be empty.
+    """
+    if has_top_level_alternation(pattern):
+        return ''
+
+    prefix = []
+    i = 0
+    length = len(pattern)
+    while i < length:
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 == length or pattern[i + 1].isalnum():
+                # character class (\d, \w, ...), anchor or back-reference
+                break
+            char = pattern[i + 1]
+            i += 2
+        elif char in REGEX_SPECIAL_CHARS:
+            break
+        else:
+            i += 1
+
+        if i < length:
+            if pattern[i] in '?*{':
+                # the last literal is optional
+                break
+            if pattern[i] == '+':
+                prefix.append(char)
+                break
+
+        prefix.append(char)
+
+    return ''.join(prefix)
+
+
+class PrefixTrie(object):
+    """Character trie mapping literal prefixes to the values stored under them."""
+    def __init__(self):
+        self.root = ({}, [])
+
+    def insert(self, prefix, value):
+        node = self.root
+        for char in prefix:
+            node = node[0].setdefault(char, ({}, []))
+        node[1].append(value)
+
+    def search(self, path):
+        """Return all values stored under any prefix of `path`."""
+        node = self.root
+        found = list(node[1])
+        for char in path:
+            node = node[0].get(char)
+            if node is None:
+                break
+            found.extend(node[1])
+
+        return found
+
+
+class PrefixTrieResolver(RegexURLResolver):
+    """
+    RegexURLResolver that only tries the patterns that could possibly match a path.
+
+    Patterns are indexed by the literal text they must start with (after the
+    optional locale) so that a path that matches nothing is rejected after a few
+    dictionary lookups instead of running every regex. Candidates are still tried
+    in registration order so the first matching pattern wins, exactly as with
+    the plain RegexURLResolver.
+    """
+    def __init__(self, *args, **kwargs):
+        super(PrefixTrieResolver, self).__init__(*args, **kwargs)
+        self._tries = None
+        self._indexed_patterns = None
+
+    def _build_tries(self):
+        patterns = list(self.url_patterns)
+        # keyed by (locale_prefix, ignore_case)
+        tries = {key: PrefixTrie() for key in [(False, False), (False, True),
+                                               (True, False), (True, True)]}
+        for index, pattern in enumerate(patterns):
+            locale_prefix, ignore_case, prefix = self._pattern_key(pattern)
+            tries[locale_prefix, ignore_case].insert(prefix, index)
+
+        self._tries = tries
+        self._indexed_patterns = patterns
+
+    def _pattern_key(self, pattern):
+        """Return (locale_prefix, ignore_case, literal_prefix) for `pattern`."""
+        if not isinstance(pattern, RegexURLPattern):
+            return False, False, ''
+
+        regex = pattern.regex.pattern
+        # inline flags apply to the whole pattern wherever they appear
+        flags = ''.join(FLAGS_RE.findall(regex))
+        if set(flags) - set('iu'):
+            # flags that change how the pattern reads: always try it
+            return False, False, ''
+
+        match = FLAGS_RE.match(regex)
+        while match:
+            regex = regex[match.end():]
+            match = FLAGS_RE.match(regex)
+
+        ignore_case = 'i' in flags
+        if regex.startswith(LOCALE_RE):
+            locale_prefix = True
+            regex = regex[len(LOCALE_RE):]
+        elif regex.startswith('^'):
+            locale_prefix = False
+            regex = regex[1:]
+        else:
+            # unanchored
+            return False, False, ''
+
+        prefix = literal_prefix(regex)
+        if ignore_case:
+            if not all(ord(char) < 128 for char in prefix):
+                prefix = ''
+            prefix = prefix.lower()
+
+        return locale_prefix, ignore_case, prefix
+
+    def candidates(self, path):
+        """Return the patterns that could match `path` in registration order."""
+        if self._tries is None:
+            self._build_tries()
+
+        tries = self._tries
+        paths = [path]
+        locale_match = locale_re.match(path)
+        if locale_match.group('locale'):
+            paths.append(path[locale_match.end():])
+
+        indexes = set(tries[False, False].search(path))
+        indexes.update(tries[False, True].search(path.lower()))
+        for locale_path in paths:
+            indexes.update(tries[True, False].search(locale_path))
+            indexes.update(tries[True, True].search(locale_path.lower()))
+
+        return [self._indexed_patterns[i] for i in sorted(indexes)]
+
+    def resolve(self, path):
+        path = force_text(path)
+        tried = []
+        match = self.regex.search(path)
+        if match:
+            new_path = path[match.end():]
+            for pattern in self.candidates(new_path):
+                try:
+                    sub_match = pattern.resolve(new_path)
+                except Resolver404 as e:
+                    sub_tried = e.args[0].get('tried')
+                    if sub_tried is not None:
+                        tried.extend([pattern] + t for t in sub_tried)
+                    else:
+                        tried.append([pattern])
+                else:
+                    if sub_match:
+                        sub_match_dict = dict(match.groupdict(), **self.default_kwargs)
+                        sub_match_dict.update(sub_match.kwargs)
+                        return ResolverMatch(sub_match.func, sub_match.args, sub_match_dict,
+                                             sub_match.url_name,
+                                             self.app_name or sub_match.app_name,
+                                             [self.namespace] + sub_match.namespaces)
+                    tried.append([pattern])
+            raise Resolver404({'tried': tried, 'path': new_path})
+        raise Resolver404({'path': path})
 
 
 def header_redirector(header_name, regex, match_dest, nomatch_dest, case_sensitive=False):
@@ -4,20 +4,24 @@
 
 import errno
 import glob
+import hashlib
 import os
 import re
 import sys
+import time
+from multiprocessing import Pool
 from optparse import make_option
 from subprocess import check_call, Popen, PIPE, STDOUT
 
 from django.conf import settings
 from django.core.cache import cache
 from django.core.management.base import NoArgsCommand, BaseCommand
+from django.db import transaction
 from django.db.models import Count
 
 from dateutil.parser import parse as parsedate
 
-from bedrock.security.models import Product, SecurityAdvisory
+from bedrock.security.models import ChangeStamp, Product, SecurityAdvisory
 from bedrock.security.utils import FILENAME_RE, chdir, mfsa_id_from_filename, parse_md_file
 
 
@@ -32,6 +36,11 @@ GIT_GET_HASH = (GIT, 'rev-parse', 'HEAD')
 SM_RE = re.compile('seamonkey', flags=re.IGNORECASE)
 FNULL = open(os.devnull, 'w')
 
+# fewer files than this are parsed without starting worker processes
+MIN_FILES_FOR_POOL = 20
+# rows written per query
+BATCH_SIZE = 500
+
 
 def fix_product_name(name):
     if 'seamonkey' in name.lower():
@@ -97,18 +106,42 @@ def get_current_git_hash():
     return p.communicate()[0].strip()
 
 
+def get_product_slugs(ids):
+    """Return the slugs of the products the advisories with the IDs were fixed in."""
+    return Product.objects.filter(advisories__id__in=ids).values_list('product_slug', flat=True)
+
+
 def delete_files(filenames):
     ids = get_ids_from_files(filenames)
-    SecurityAdvisory.objects.filter(id__in=ids).delete()
+    with transaction.atomic():
+        ChangeStamp.touch(get_product_slugs(ids))
+        SecurityAdvisory.objects.filter(id__in=ids).delete()
 
 
-def add_or_update_advisory(data, html):
+def get_product(name, products):
     """
-    Add or update an advisory in the database.
+    Return the Product named `name`, creating it if needed.
+
+    :param name: product name with the version
+    :param products: dict of the products already fetched, by name
+    :return: Product
+    """
+    product = products.get(name)
+    if product is None:
+        product, created = Product.objects.get_or_create(name=name)
+        products[name] = product
+
+    return product
+
+
+def advisory_from_data(data, html, products):
+    """
+    Return an unsaved advisory and the products it was fixed in.
 
     :param data: dict of metadata about the advisory
     :param html: HTML content of the advisory
-    :return: SecurityAdvisory
+    :param products: dict of the products already fetched, by name
+    :return: SecurityAdvisory, list of Product
     """
     mfsa_id = data.pop('mfsa_id')
     year, order = [int(x) for x in mfsa_id.split('-')]
@@ -132,9 +165,9 @@ def add_or_update_advisory(data, html):
         fixed_in = [fixed_in]
 
     for productname in fixed_in:
-        productname = fix_product_name(productname)
-        productobj, created = Product.objects.get_or_create(name=productname)
-        prodver_objs.append(productobj)
+        productobj = get_product(fix_product_name(productname), products)
+        if productobj not in prodver_objs:
+            prodver_objs.append(productobj)
 
     # discard products. we rely on fixed_in.
     data.pop('products', None)
@@ -142,13 +175,56 @@ def add_or_update_advisory(data, html):
     if data:
         kwargs['extra_data'] = data
 
-    advisory = SecurityAdvisory(**kwargs)
-    advisory.save()
-    advisory.fixed_in.clear()
-    advisory.fixed_in.add(*prodver_objs)
+    return SecurityAdvisory(**kwargs), prodver_objs
+
+
+def add_or_update_advisory(data, html):
+    """
+    Add or update an advisory in the database.
+
+    :param data: dict of metadata about the advisory
+    :param html: HTML content of the advisory
+    :return: SecurityAdvisory
+    """
+    advisory, prodver_objs = advisory_from_data(data, html, {})
+    with transaction.atomic():
+        product_slugs = set(get_product_slugs([advisory.id]))
+        product_slugs.update(p.product_slug for p in prodver_objs)
+        ChangeStamp.touch(product_slugs)
+        advisory.save()
+        advisory.fixed_in.clear()
+        advisory.fixed_in.add(*prodver_objs)
     return advisory
 
 
+def save_advisories(advisories):
+    """
+    Replace advisories in the database with a few queries.
+
+    :param advisories: list of (SecurityAdvisory, list of Product)
+    """
+    through = SecurityAdvisory.fixed_in.through
+    ids = [advisory.id for advisory, products in advisories]
+    # products the advisories are fixed in, before and after the update
+    product_slugs = set(product.product_slug
+                        for advisory, products in advisories for product in products)
+    with transaction.atomic():
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start:start + BATCH_SIZE]
+            product_slugs.update(get_product_slugs(batch))
+            through.objects.filter(securityadvisory_id__in=batch).delete()
+            SecurityAdvisory.objects.filter(id__in=batch).delete()
+
+        SecurityAdvisory.objects.bulk_create(
+            [advisory for advisory, products in advisories], batch_size=BATCH_SIZE)
+        through.objects.bulk_create(
+            [through(securityadvisory_id=advisory.id, product_id=product.id)
+             for advisory, products in advisories for product in products],
+            batch_size=BATCH_SIZE)
+        if advisories:
+            ChangeStamp.touch(product_slugs)
+
+
 def update_db_from_file(filename):
     """
     Parse file for YAML and Markdown and update database.
@@ -160,6 +236,44 @@ def update_db_from_file(filename):
     return add_or_update_advisory(*parse_md_file(filename))
 
 
+def get_file_hash(filename):
+    """Return the sha1 of the content of a file."""
+    with open(filename, 'rb') as fh:
+        return hashlib.sha1(fh.read()).hexdigest()
+
+
+def parse_file(filename):
+    """
+    Parse file for YAML and Markdown. Run in worker processes by `parse_files`.
+
+    :param filename: path to markdown file.
+    :return: tuple of the (data, html) of the file or None, and the error
+             message or None
+    """
+    try:
+        return parse_md_file(filename), None
+    except Exception as e:
+        return None, 'ERROR parsing %s: %s' % (filename, e)
+
+
+def parse_files(filenames, processes=None):
+    """
+    Parse files for YAML and Markdown, in `processes` worker processes if
+    there are enough files, or as many as there are CPUs if None.
+
+    :return: list of the `parse_file` result of each file
+    """
+    if processes == 1 or len(filenames) < MIN_FILES_FOR_POOL:
+        return map(parse_file, filenames)
+
+    pool = Pool(processes)
+    try:
+        return pool.map(parse_file, filenames, chunksize=10)
+    finally:
+        pool.close()
+        pool.join()
+
+
 def clone_repo():
     mkdir_p(ADVISORIES_PATH)
     check_call(GIT_CLONE, stdout=FNULL, stderr=STDOUT)
@@ -216,6 +330,11 @@ class Command(NoArgsCommand):
                     dest='clear_db',
                     default=False,
                     help='Clear all security advisory data before update (implies --force)'),
+        make_option('--processes',
+                    type='int',
+                    dest='processes',
+                    default=None,
+                    help='Number of processes parsing files. Defaults to the number of CPUs.'),
     )
 
     def get_lock(self):
@@ -249,8 +368,10 @@ class Command(NoArgsCommand):
 
         if clear_db:
             printout('Clearing all security advisories.')
-            SecurityAdvisory.objects.all().delete()
-            Product.objects.all().delete()
+            with transaction.atomic():
+                ChangeStamp.touch(Product.objects.values_list('product_slug', flat=True))
+                SecurityAdvisory.objects.all().delete()
+                Product.objects.all().delete()
 
         if not no_git:
             if not os.path.exists(ADVISORIES_PATH):
@@ -275,20 +396,51 @@ class Command(NoArgsCommand):
         errors = []
         updates = 0
         if modified_files:
+            start_time = time.time()
+            # files that haven't changed since they were imported are skipped
+            hashes = dict(SecurityAdvisory.objects.values_list('id', 'content_hash'))
+            changed_files = []
             for mf in modified_files:
-                try:
-                    update_db_from_file(mf)
-                except Exception as e:
-                    errors.append('ERROR parsing %s: %s' % (mf, e))
+                content_hash = get_file_hash(mf)
+                if hashes.get(mfsa_id_from_filename(mf)) != content_hash:
+                    changed_files.append((mf, content_hash))
+
+            parsed = parse_files([mf for mf, _ in changed_files],
+                                 options['processes'])
+            parse_time = time.time()
+
+            advisories = {}
+            products = dict((p.name, p) for p in Product.objects.all())
+            with transaction.atomic():
+                for (mf, content_hash), (result, error) in zip(changed_files, parsed):
+                    if result is not None:
+                        try:
+                            advisory, prodver_objs = advisory_from_data(result[0], result[1],
+                                                                        products)
+                        except Exception as e:
+                            error = 'ERROR parsing %s: %s' % (mf, e)
+
+                    if error:
+                        errors.append(error)
+                        if not quiet:
+                            sys.stdout.write('E')
+                            sys.stdout.flush()
+                        continue
                     if not quiet:
-                        sys.stdout.write('E')
+                        sys.stdout.write('.')
                         sys.stdout.flush()
-                    continue
-                if not quiet:
-                    sys.stdout.write('.')
-                    sys.stdout.flush()
-                updates += 1
+                    advisory.content_hash = content_hash
+                    advisories[advisory.id] = (advisory, prodver_objs)
+                    updates += 1
+
+                save_advisories(advisories.values())
+
             printout('\nUpdated {0} files.'.format(updates))
+            skipped = len(modified_files) - len(changed_files)
+            if skipped:
+                printout('Skipped {0} unchanged files.'.format(skipped))
+            printout('Parsed files in {0:.2f}s and saved advisories in {1:.2f}s.'.format(
+                parse_time - start_time, time.time() - parse_time))
 
         if deleted_files:
             delete_files(deleted_files)
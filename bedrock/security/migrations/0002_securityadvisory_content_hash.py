@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='securityadvisory',
+            name='content_hash',
+            field=models.CharField(default='', max_length=40, blank=True),
+            preserve_default=False,
+        ),
+    ]
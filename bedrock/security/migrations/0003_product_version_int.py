@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from product_details.version_compare import version_int
+
+
+def set_version_int(apps, schema_editor):
+    Product = apps.get_model('security', 'Product')
+    for product in Product.objects.all():
+        vers = product.name.rsplit(None, 1)[1]
+        if '.' not in vers:
+            vers += '.0'
+        product.version_int = version_int(vers)
+        product.save(update_fields=['version_int'])
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0002_securityadvisory_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='version_int',
+            field=models.BigIntegerField(default=0, db_index=True),
+            preserve_default=True,
+        ),
+        migrations.RunPython(set_version_int, noop),
+    ]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.db.models import Max
+
+
+def create_stamps(apps, schema_editor):
+    ChangeStamp = apps.get_model('security', 'ChangeStamp')
+    SecurityAdvisory = apps.get_model('security', 'SecurityAdvisory')
+    latest = SecurityAdvisory.objects.aggregate(latest=Max('last_modified'))['latest']
+    if latest is None:
+        return
+
+    ChangeStamp.objects.create(key='*', last_modified=latest)
+    stamps = (SecurityAdvisory.objects.order_by().values_list('fixed_in__product_slug')
+                                      .annotate(latest=Max('last_modified')))
+    for product_slug, latest in stamps:
+        if product_slug:
+            ChangeStamp.objects.create(key=product_slug, last_modified=latest)
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0003_product_version_int'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeStamp',
+            fields=[
+                ('key', models.CharField(max_length=50, serialize=False, primary_key=True)),
+                ('last_modified', models.DateTimeField()),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.RunPython(create_stamps, noop),
+    ]
@@ -4,12 +4,13 @@
 
 from django.db import models
 from django.template.defaultfilters import slugify
+from django.utils import timezone
 from django.utils.functional import total_ordering
 
 from django_extensions.db.fields import ModificationDateTimeField
 from django_extensions.db.fields.json import JSONField
 from bedrock.base.urlresolvers import reverse
-from product_details.version_compare import Version
+from product_details.version_compare import Version, version_int
 
 
 @total_ordering
@@ -18,6 +19,8 @@ class Product(models.Model):
     slug = models.CharField(max_length=50, db_index=True)
     product = models.CharField(max_length=50)
     product_slug = models.SlugField()
+    # sorts like `version`, so versions can be ordered by the database
+    version_int = models.BigIntegerField(default=0, db_index=True)
 
     class Meta:
         ordering = ('slug',)
@@ -60,6 +63,7 @@ class Product(models.Model):
         self.product = product
         self.product_slug = slugify(product)
         self.slug = '{0}-{1}'.format(self.product_slug, vers)
+        self.version_int = version_int(self.version)
         super(Product, self).save(force_insert, force_update,
                                   using, update_fields)
 
@@ -76,6 +80,8 @@ class SecurityAdvisory(models.Model):
     extra_data = JSONField()
     html = models.TextField()
     last_modified = ModificationDateTimeField()
+    # sha1 of the markdown file the advisory was imported from
+    content_hash = models.CharField(max_length=40, blank=True)
 
     class Meta:
         ordering = ('-year', '-order')
@@ -95,3 +101,32 @@ class SecurityAdvisory(models.Model):
     def products(self):
         prods_set = set(v.product for v in self.fixed_in.all())
         return sorted(prods_set)
+
+
+class ChangeStamp(models.Model):
+    """
+    When the advisories fixed in a product, keyed by the `product_slug`, or
+    any advisory, keyed by `ALL`, last changed. Kept up to date by the
+    importer so views find their Last-Modified date by primary key.
+    """
+    ALL = '*'
+
+    key = models.CharField(max_length=50, primary_key=True)
+    last_modified = models.DateTimeField()
+
+    def __unicode__(self):
+        return u'{0}: {1}'.format(self.key, self.last_modified)
+
+    @classmethod
+    def touch(cls, product_slugs):
+        """Record that advisories of the products, and so all advisories, changed now."""
+        now = timezone.now()
+        for key in set(product_slugs) | set([cls.ALL]):
+            cls.objects.update_or_create(key=key, defaults={'last_modified': now})
+
+    @classmethod
+    def get_last_modified(cls, key):
+        try:
+            return cls.objects.get(pk=key).last_modified
+        except cls.DoesNotExist:
+            return None
@@ -2,13 +2,19 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import os
+import shutil
+import tempfile
+
 from django.conf import settings
+from django.core.management import call_command
 
-from nose.tools import eq_
+from mock import patch
+from nose.tools import eq_, ok_
 
 from bedrock.mozorg.tests import TestCase
 from bedrock.security.management.commands import update_security_advisories
-from bedrock.security.models import Product
+from bedrock.security.models import ChangeStamp, Product, SecurityAdvisory
 
 
 def test_fix_product_name():
@@ -78,3 +84,91 @@ class TestDBActions(TestCase):
         Product.objects.create(name='Firefox 43.0.3')
         eq_(update_security_advisories.delete_orphaned_products(), 2)
         eq_(Product.objects.get().name, 'Firefox 43.0.1')
+
+
+MFSA_FILE = u"""---
+announced: December 25, 2015
+impact: {impact}
+title: The Dude is insecure
+fixed_in:
+- Firefox 43.0.1
+- Firefox ESR 38.5.1
+---
+The Dude minds, man!
+"""
+
+
+class TestUpdateCommand(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.files = [self.write_mfsa('2015-100'), self.write_mfsa('2015-101')]
+        patcher = patch.object(update_security_advisories, 'get_all_md_files',
+                               return_value=self.files)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write_mfsa(self, mfsa_id, impact='High'):
+        filename = os.path.join(self.path, 'mfsa{0}.md'.format(mfsa_id))
+        with open(filename, 'w') as fh:
+            fh.write(MFSA_FILE.format(impact=impact))
+
+        return filename
+
+    def update(self):
+        call_command('update_security_advisories', no_git=True, quiet=True)
+
+    def test_import(self):
+        self.update()
+        eq_(list(SecurityAdvisory.objects.values_list('id', flat=True)),
+            ['2015-101', '2015-100'])
+        advisory = SecurityAdvisory.objects.get(id='2015-100')
+        eq_(advisory.html, '<p>The Dude minds, man!</p>')
+        eq_(sorted(p.name for p in advisory.fixed_in.all()),
+            ['Firefox 43.0.1', 'Firefox ESR 38.5.1'])
+        eq_(Product.objects.count(), 2)
+        ok_(advisory.last_modified)
+        ok_(advisory.content_hash)
+
+    def test_unchanged_files_skipped(self):
+        self.update()
+        self.write_mfsa('2015-101', impact='Critical')
+        with patch.object(update_security_advisories, 'parse_files',
+                          wraps=update_security_advisories.parse_files) as parse_mock:
+            self.update()
+        eq_(parse_mock.call_args[0][0], [self.files[1]])
+        eq_(SecurityAdvisory.objects.get(id='2015-101').impact, 'Critical')
+        eq_(SecurityAdvisory.objects.get(id='2015-101').fixed_in.count(), 2)
+        eq_(SecurityAdvisory.objects.get(id='2015-100').impact, 'High')
+
+    def test_change_stamps(self):
+        """Stamps of all advisories and changed products should be updated."""
+        self.update()
+        stamps = dict(ChangeStamp.objects.values_list('key', 'last_modified'))
+        eq_(sorted(stamps), ['*', 'firefox', 'firefox-esr'])
+
+        ChangeStamp.objects.update(last_modified=stamps['*'].replace(year=2000))
+        self.write_mfsa('2015-101', impact='Critical')
+        self.update()
+        eq_(ChangeStamp.objects.filter(last_modified__year=2000).count(), 0)
+
+        ChangeStamp.objects.update(last_modified=stamps['*'].replace(year=2000))
+        update_security_advisories.delete_files(['mfsa2015-100.md'])
+        eq_(ChangeStamp.objects.filter(last_modified__year=2000).count(), 0)
+
+    def test_errors(self):
+        with open(self.files[0], 'w') as fh:
+            fh.write('no front matter')
+
+        with patch('sys.stderr') as stderr:
+            self.update()
+        eq_(list(SecurityAdvisory.objects.values_list('id', flat=True)), ['2015-101'])
+        ok_('mfsa2015-100.md' in stderr.write.call_args[0][0])
+
+    @patch.object(update_security_advisories, 'MIN_FILES_FOR_POOL', 1)
+    def test_parse_files_pool(self):
+        """Files parsed in worker processes should be the same."""
+        eq_(update_security_advisories.parse_files(self.files, 2),
+            update_security_advisories.parse_files(self.files, 1))
@@ -16,6 +16,8 @@ class TestModels(TestCase):
         pv5 = Product.objects.create(name='Firefox 22')
         pvs = [pv2, pv0, pv3, pv1, pv4, pv5]
         self.assertListEqual([pv0, pv5, pv1, pv2, pv3, pv4], sorted(pvs))
+        self.assertListEqual([pv0, pv5, pv1, pv2, pv3, pv4],
+                             list(Product.objects.order_by('product', 'version_int')))
 
     def test_product_version_slug(self):
         """Slug should include the version."""
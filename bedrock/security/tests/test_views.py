@@ -1,6 +1,7 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
+from django.http import HttpResponse
 from django.test import RequestFactory
 
 from mock import patch, Mock
@@ -10,9 +11,9 @@ from product_details.version_compare import Version
 
 from bedrock.mozorg.tests import TestCase
 from bedrock.security.management.commands.update_security_advisories import add_or_update_advisory
-from bedrock.security.models import Product
-from bedrock.security.views import (ProductView, ProductVersionView, latest_queryset,
-                                    product_is_obsolete)
+from bedrock.security.models import ChangeStamp, Product
+from bedrock.security.views import (ProductView, ProductVersionView, advisory_conditions,
+                                    latest_advisory, latest_queryset, product_is_obsolete)
 
 
 @patch.object(product_details, 'firefox_versions', {'LATEST_FIREFOX_VERSION': '33.0',
@@ -51,24 +52,41 @@ class TestViews(TestCase):
         pview = ProductView()
         pview.kwargs = {'slug': 'firefox'}
         with patch.dict(pview.minimum_versions, {'firefox': Version('4.2')}):
-            self.assertListEqual(pview.get_queryset(),
+            self.assertListEqual(list(pview.get_queryset()),
                                  [self.pvs[5], self.pvs[4], self.pvs[3]])
 
         with patch.dict(pview.minimum_versions, {'firefox': Version('22.0')}):
-            self.assertListEqual(pview.get_queryset(), [self.pvs[5]])
+            self.assertListEqual(list(pview.get_queryset()), [self.pvs[5]])
 
     def test_product_version_view_filter_major(self):
         """Given a major version should return all minor versions."""
         pview = ProductVersionView()
         pview.kwargs = {'product': 'firefox', 'version': '4'}
-        self.assertListEqual(pview.get_queryset(),
+        self.assertListEqual(list(pview.get_queryset()),
                              [self.pvs[4], self.pvs[3], self.pvs[2], self.pvs[1]])
 
     def test_product_version_view_filter_minor(self):
         """Given a minor version should return all point versions."""
         pview = ProductVersionView()
         pview.kwargs = {'product': 'firefox', 'version': '4.2'}
-        self.assertListEqual(pview.get_queryset(), [self.pvs[4], self.pvs[3]])
+        self.assertListEqual(list(pview.get_queryset()), [self.pvs[4], self.pvs[3]])
+
+    def test_product_view_queries(self):
+        """The advisories of every version should be fetched in one query."""
+        for i, pv in enumerate(self.pvs):
+            advisory = add_or_update_advisory({
+                'mfsa_id': '2014-{0:0>2}'.format(i),
+                'title': 'WILMAAAA!',
+                'impact': 'Critical',
+                'fixed_in': [],
+            }, 'Wilma finally leaves Fred for a brontosaurus.')
+            advisory.fixed_in.add(pv)
+
+        pview = ProductView()
+        pview.kwargs = {'slug': 'firefox'}
+        with self.assertNumQueries(2):
+            advisories = [[a.id for a in pv.advisories.all()] for pv in pview.get_queryset()]
+        eq_(advisories, [['2014-05'], ['2014-04'], ['2014-03'], ['2014-02'], ['2014-01']])
 
 
 class TestLastModified(TestCase):
@@ -143,6 +161,56 @@ class TestLastModified(TestCase):
         qs = latest_queryset(req, {'product': 'firefox', 'version': '29.0'})
         self.assertListEqual(advisories_29, list(qs.order_by('year', 'order')))
 
+    def test_latest_advisory_stamps(self):
+        """Should use the change stamp of the product or of all advisories."""
+        self.new_advisory(fixed_in=['Firefox 30.0'])
+        self.new_advisory(fixed_in=['Thunderbird 30.0'])
+        stamps = dict(ChangeStamp.objects.values_list('key', 'last_modified'))
+        ChangeStamp.objects.filter(key='firefox').update(
+            last_modified=stamps['firefox'].replace(year=2000))
+        for url_name, kwargs, year in [
+            ('security.advisories', {}, stamps['*'].year),
+            ('security.product-advisories', {'slug': 'firefox'}, 2000),
+            ('security.product-version-advisories', {'product': 'firefox', 'version': '30'},
+             2000),
+        ]:
+            req = self.rf.get('/')
+            req.resolver_match = Mock()
+            req.resolver_match.url_name = url_name
+            with self.assertNumQueries(1):
+                eq_(latest_advisory(req, **kwargs).year, year)
+                # the result is kept for the request
+                latest_advisory(req, **kwargs)
+
+        req = self.rf.get('/')
+        req.resolver_match = Mock()
+        req.resolver_match.url_name = 'security.product-advisories'
+        eq_(latest_advisory(req, slug='seamonkey'), None)
+
+    def test_conditional_get(self):
+        """Responses should have an ETag and Last-Modified date and be 304 if unchanged."""
+        self.new_advisory(fixed_in=['Firefox 30.0'])
+        view = advisory_conditions(lambda request, **kwargs: HttpResponse('Abide'))
+
+        def get(**headers):
+            req = self.rf.get('/en-US/security/known-vulnerabilities/firefox/', **headers)
+            req.resolver_match = Mock()
+            req.resolver_match.url_name = 'security.product-advisories'
+            return view(req, slug='firefox')
+
+        resp = get()
+        eq_(resp.status_code, 200)
+        etag = resp['ETag']
+        last_modified = resp['Last-Modified']
+        eq_(get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        eq_(get(HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        ChangeStamp.objects.filter(key='firefox').update(
+            last_modified=ChangeStamp.get_last_modified('firefox').replace(year=2100))
+        resp = get(HTTP_IF_NONE_MATCH=etag)
+        eq_(resp.status_code, 200)
+        ok_(resp['ETag'] != etag)
+
 
 class TestKVRedirects(TestCase):
     def _test_names(self, url_component, expected):
@@ -1,21 +1,23 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import hashlib
 import re
 
 from django.core.urlresolvers import NoReverseMatch
 from django.db.models import Q
 from django.utils.decorators import method_decorator
-from django.views.decorators.http import last_modified
+from django.views.decorators.http import condition
 from django.views.generic import DetailView, ListView, RedirectView
 
 from bedrock.base.urlresolvers import reverse
 from product_details import product_details
-from product_details.version_compare import Version
+from product_details.version_compare import Version, version_int
 from lib.l10n_utils import LangFilesMixin
 
 from bedrock.mozorg.decorators import cache_control_expires
-from bedrock.security.models import Product, SecurityAdvisory
+from bedrock.mozorg.page_cache import page_cache
+from bedrock.security.models import ChangeStamp, Product, SecurityAdvisory
 
 
 def product_is_obsolete(prod_name, version):
@@ -88,19 +90,63 @@ def latest_queryset(request, kwargs):
         return SecurityAdvisory.objects.filter(qfilter)
 
 
+def change_stamp_key(request, kwargs):
+    """
+    Return the key of the `ChangeStamp` for the advisories of the page, or
+    None for pages of a single advisory.
+    """
+    urlname = request.resolver_match.url_name.split('.')[1]
+    if urlname == 'advisories':
+        return ChangeStamp.ALL
+
+    if urlname == 'product-advisories':
+        return kwargs.get('slug')
+
+    if urlname == 'product-version-advisories':
+        # changes to other versions of the product also count.
+        return kwargs.get('product')
+
+    return None
+
+
 def latest_advisory(request, *args, **kwargs):
     """
-    Callback function for use with last_modified decorator.
+    Callback function for use with condition decorator.
     :params: request, *args, **kwargs same as sent to view
     :return: function
     """
-    queryset = latest_queryset(request, kwargs)
-    try:
-        latest = queryset.only('last_modified').latest()
-    except SecurityAdvisory.DoesNotExist:
+    # called for both the ETag and Last-Modified of the response
+    if hasattr(request, '_security_last_modified'):
+        return request._security_last_modified
+
+    key = change_stamp_key(request, kwargs)
+    if key is not None:
+        latest = ChangeStamp.get_last_modified(key)
+    else:
+        queryset = latest_queryset(request, kwargs)
+        try:
+            latest = queryset.only('last_modified').latest().last_modified
+        except SecurityAdvisory.DoesNotExist:
+            latest = None
+
+    request._security_last_modified = latest
+    return latest
+
+
+def advisory_etag(request, *args, **kwargs):
+    """
+    Callback function for use with condition decorator. The ETag changes with the
+    last-modified date, and when the site or its translations are updated.
+    """
+    latest = latest_advisory(request, *args, **kwargs)
+    if latest is None:
         return None
 
-    return latest.last_modified
+    parts = [page_cache.get_version(), request.path, latest.isoformat()]
+    return hashlib.md5(repr(parts)).hexdigest()
+
+
+advisory_conditions = condition(etag_func=advisory_etag, last_modified_func=latest_advisory)
 
 
 class AdvisoriesView(LangFilesMixin, ListView):
@@ -109,7 +155,7 @@ class AdvisoriesView(LangFilesMixin, ListView):
     context_object_name = 'advisories'
 
     @method_decorator(cache_control_expires(0.5))
-    @method_decorator(last_modified(latest_advisory))
+    @method_decorator(advisory_conditions)
     def dispatch(self, request, *args, **kwargs):
         return super(AdvisoriesView, self).dispatch(request, *args, **kwargs)
 
@@ -120,7 +166,7 @@ class AdvisoryView(LangFilesMixin, DetailView):
     context_object_name = 'advisory'
 
     @method_decorator(cache_control_expires(0.5))
-    @method_decorator(last_modified(latest_advisory))
+    @method_decorator(advisory_conditions)
     def dispatch(self, request, *args, **kwargs):
         return super(AdvisoryView, self).dispatch(request, *args, **kwargs)
 
@@ -136,7 +182,7 @@ class ProductView(LangFilesMixin, ListView):
     }
 
     @method_decorator(cache_control_expires(0.5))
-    @method_decorator(last_modified(latest_advisory))
+    @method_decorator(advisory_conditions)
     def dispatch(self, request, *args, **kwargs):
         return super(ProductView, self).dispatch(request, *args, **kwargs)
 
@@ -145,8 +191,8 @@ class ProductView(LangFilesMixin, ListView):
         versions = Product.objects.filter(product_slug=product_slug)
         min_version = self.minimum_versions.get(product_slug)
         if min_version:
-            versions = [vers for vers in versions if vers.version >= min_version]
-        return sorted(versions, reverse=True)
+            versions = versions.filter(version_int__gte=version_int(min_version))
+        return versions.order_by('-product', '-version_int').prefetch_related('advisories')
 
     def get_context_data(self, **kwargs):
         cxt = super(ProductView, self).get_context_data(**kwargs)
@@ -160,7 +206,7 @@ class ProductVersionView(LangFilesMixin, ListView):
     allow_empty = False
 
     @method_decorator(cache_control_expires(0.5))
-    @method_decorator(last_modified(latest_advisory))
+    @method_decorator(advisory_conditions)
     def dispatch(self, request, *args, **kwargs):
         return super(ProductVersionView, self).dispatch(request, *args, **kwargs)
 
@@ -175,7 +221,7 @@ class ProductVersionView(LangFilesMixin, ListView):
                 slug = slug[:-2]
             qfilter |= Q(slug__exact=slug)
         versions = Product.objects.filter(qfilter)
-        return sorted(versions, reverse=True)
+        return versions.order_by('-product', '-version_int').prefetch_related('advisories')
 
     def get_context_data(self, **kwargs):
         cxt = super(ProductVersionView, self).get_context_data(**kwargs)
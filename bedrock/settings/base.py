@@ -195,6 +195,12 @@ DOTLANG_CACHE = 600
 
 DOTLANG_FILES = ['main', 'download_button']
 
+# Lang files set in each template, written by `./manage.py l10n_templates`
+TEMPLATE_LANG_FILES_MANIFEST = path('template_lang_files.json')
+
+# Legal docs rendered to HTML by `./manage.py render_legal_docs`
+LEGAL_DOCS_RENDERED_PATH = path('legal_docs_rendered')
+
 # Paths that don't require a locale code in the URL.
 # matches the first url component (e.g. mozilla.org/gameon/)
 SUPPORTED_NONLOCALES = [
@@ -380,6 +386,7 @@ INSTALLED_APPS = (
     'bedrock.grants',
     'bedrock.infobar',
     'bedrock.legal',
+    'bedrock.legal_docs',
     'bedrock.mozorg',
     'bedrock.newsletter',
     'bedrock.persona',
@@ -17,13 +17,15 @@ from nose.tools import eq_, ok_
 
 from bedrock.mozorg.tests import TestCase
 from bedrock.tabzilla.middleware import TabzillaLocaleURLMiddleware
-from bedrock.tabzilla.views import template_last_modified
+from bedrock.tabzilla import views
+from bedrock.tabzilla.views import TemplateLastModified, template_last_modified
 
 
 @patch('bedrock.tabzilla.views.os.path.getmtime')
 @patch('bedrock.tabzilla.views.loader.get_template')
 class LastModifiedTests(TestCase):
-    def test_youngest_file_wins(self, template_mock, mtime_mock):
+    @patch('bedrock.tabzilla.views.page_cache')
+    def test_youngest_file_wins(self, page_cache_mock, template_mock, mtime_mock):
         tmpl_name = 'the_dude_is_a_template.html'
         template_mock.return_value.filename = tmpl_name
         mtimes = [1378762234.0, 1378762235.0]
@@ -35,6 +37,30 @@ class LastModifiedTests(TestCase):
         langfile = '{0}/locale/en-US/tabzilla/tabzilla.lang'.format(settings.ROOT)
         mtime_mock.assert_any_call(langfile)
 
+    @override_settings(TEMPLATE_DEBUG=False)
+    @patch('bedrock.tabzilla.views.page_cache')
+    def test_dates_kept(self, page_cache_mock, template_mock, mtime_mock):
+        """Dates should only be found again when the site version changes."""
+        page_cache_mock.get_version.return_value = 'abide'
+        mtime_mock.return_value = 1378762234.0
+        dates = TemplateLastModified('the_dude_is_a_template.html')
+        eq_(dates.get('de'), datetime.fromtimestamp(1378762234.0))
+        req = RequestFactory().get('/')
+        req.locale = 'de'
+        etag = dates.etag(req)
+        mtime_mock.return_value = 1378762235.0
+        eq_(dates.get('de'), datetime.fromtimestamp(1378762234.0))
+        eq_(dates.get('fr'), datetime.fromtimestamp(1378762235.0))
+        eq_(mtime_mock.call_count, 4)
+
+        page_cache_mock.get_version.return_value = 'abides'
+        eq_(dates.get('de'), datetime.fromtimestamp(1378762235.0))
+        ok_(dates.etag(req) != etag)
+
+        with override_settings(TEMPLATE_DEBUG=True):
+            mtime_mock.return_value = 1378762236.0
+            eq_(dates.get('de'), datetime.fromtimestamp(1378762236.0))
+
 
 class TabzillaViewTests(TestCase):
     def test_tabzilla_content_type(self):
@@ -55,6 +81,15 @@ class TabzillaViewTests(TestCase):
         exp_date = parse_http_date(resp['expires'])
         self.assertAlmostEqual(now_date + 43200, exp_date, delta=2)
 
+    def test_conditional_get(self):
+        """Should answer 304 if the ETag is unchanged."""
+        req = RequestFactory().get('/en-US/tabzilla/tabzilla.js')
+        req.locale = 'en-US'
+        etag = views.tabzilla_js(req)['etag']
+        req = RequestFactory().get('/en-US/tabzilla/tabzilla.js', HTTP_IF_NONE_MATCH=etag)
+        req.locale = 'en-US'
+        eq_(views.tabzilla_js(req).status_code, 304)
+
 
 @patch.object(settings, 'DEV_LANGUAGES', ['en-US', 'de'])
 @patch.object(settings, 'PROD_LANGUAGES', ['en-US', 'de'])
@@ -2,24 +2,36 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import hashlib
 import os.path
 from datetime import datetime
 
 from django.conf import settings
 from django.http import HttpResponseRedirect
 from django.template import loader
-from django.views.decorators.http import last_modified
+from django.views.decorators.http import condition
 
 from lib import l10n_utils
 
 from bedrock.mozorg.decorators import cache_control_expires
+from bedrock.mozorg.page_cache import page_cache
 
 
-def template_last_modified(template):
-    def inner_last_modified(request):
-        locale = l10n_utils.get_locale(request)
+class TemplateLastModified(object):
+    """
+    Last-modified dates of a template and the tabzilla lang file, by locale.
 
-        tmpl_file = loader.get_template(template).filename
+    A date is found once per locale and kept until the site is deployed or
+    translations are updated, which `page_cache.get_version` checks at most
+    every minute. With TEMPLATE_DEBUG dates are found on every request.
+    """
+    def __init__(self, template):
+        self.template = template
+        self.version = None
+        self.dates = {}
+
+    def find(self, locale):
+        tmpl_file = loader.get_template(self.template).filename
         template_time = os.path.getmtime(tmpl_file)
 
         try:
@@ -32,7 +44,39 @@ def template_last_modified(template):
 
         return datetime.fromtimestamp(max(template_time, lang_time))
 
-    return inner_last_modified
+    def get(self, locale):
+        if settings.TEMPLATE_DEBUG:
+            return self.find(locale)
+
+        version = page_cache.get_version()
+        if version != self.version:
+            self.dates = {}
+            self.version = version
+
+        date = self.dates.get(locale)
+        if date is None:
+            date = self.dates[locale] = self.find(locale)
+
+        return date
+
+    def last_modified(self, request):
+        return self.get(l10n_utils.get_locale(request))
+
+    def etag(self, request):
+        locale = l10n_utils.get_locale(request)
+        parts = [page_cache.get_version(), self.template, locale,
+                 self.get(locale).isoformat()]
+        return hashlib.md5(repr(parts)).hexdigest()
+
+
+def template_last_modified(template):
+    return TemplateLastModified(template).last_modified
+
+
+def template_conditions(template):
+    """Return a decorator adding an ETag and Last-Modified date for the template."""
+    dates = TemplateLastModified(template)
+    return condition(etag_func=dates.etag, last_modified_func=dates.last_modified)
 
 
 def _resp(request, path, ctype, context=None):
@@ -49,13 +93,13 @@ def _resp(request, path, ctype, context=None):
 
 
 @cache_control_expires(12)
-@last_modified(template_last_modified('tabzilla/tabzilla.js'))
+@template_conditions('tabzilla/tabzilla.js')
 def tabzilla_js(request):
     return _resp(request, 'tabzilla/tabzilla.js', 'text/javascript')
 
 
 @cache_control_expires(12)
-@last_modified(template_last_modified('tabzilla/transbar.jsonp'))
+@template_conditions('tabzilla/transbar.jsonp')
 def transbar_jsonp(request):
     resp = _resp(request, 'tabzilla/transbar.jsonp', 'application/javascript')
     resp['Access-Control-Allow-Origin'] = '*'
@@ -3,8 +3,13 @@
 from __future__ import print_function, unicode_literals
 
 import datetime
+import multiprocessing
 import os
+import shlex
 import sys
+import threading
+import time
+import traceback
 from subprocess import check_call
 
 import requests
@@ -16,6 +21,11 @@ from pathlib import Path
 schedule = BlockingScheduler()
 DEAD_MANS_SNITCH_URL = config('DEAD_MANS_SNITCH_URL', default='')
 DEV = config('DEV', cast=bool, default=False)
+# run commands in processes forked after setting up Django once, instead of
+# starting `manage.py` for every job
+IN_PROCESS = config('CRON_IN_PROCESS', cast=bool, default=False)
+# seconds a job may run in its process before it is terminated
+JOB_TIMEOUT = config('CRON_JOB_TIMEOUT', cast=int, default=30 * 60)
 
 # ROOT path of the project. A pathlib.Path object.
 ROOT_PATH = Path(__file__).resolve().parents[1]
@@ -23,8 +33,96 @@ ROOT = str(ROOT_PATH)
 MANAGE = str(ROOT_PATH / 'manage.py')
 
 
-def call_command(command):
-    check_call('python {0} {1}'.format(MANAGE, command), shell=True)
+def setup_django():
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bedrock.settings')
+
+    import django
+    django.setup()
+
+
+def close_db_connections():
+    from django.db import connections
+    for conn in connections.all():
+        conn.close()
+
+
+def run_command(command, conn):
+    """
+    Run a management command in the process forked for it, sending the
+    traceback of the error or None through `conn`.
+    """
+    from django.core import management
+
+    try:
+        management.call_command(*shlex.split(command))
+        error = None
+    except (Exception, SystemExit):
+        error = traceback.format_exc()
+    finally:
+        close_db_connections()
+
+    conn.send(error)
+    conn.close()
+
+
+class CommandRunner(object):
+    """
+    Runs management commands with `call_command` in a process forked for
+    every job once Django is set up in the clock process.
+
+    The processes aren't daemonic, so jobs can start processes of their
+    own, e.g. `update_security_advisories` parsing files in a pool. A job
+    taking longer than `timeout` seconds is terminated.
+    """
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.django_ready = False
+        self.lock = threading.Lock()
+
+    def setup(self):
+        with self.lock:
+            if not self.django_ready:
+                setup_django()
+                self.django_ready = True
+
+        # the jobs must not share the clock's database connections
+        close_db_connections()
+
+    def run(self, command):
+        self.setup()
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=run_command, args=(command, child_conn))
+        process.start()
+        child_conn.close()
+        try:
+            if not parent_conn.poll(self.timeout):
+                process.terminate()
+                process.join()
+                raise RuntimeError('{} timed out after {}s'.format(command, self.timeout))
+
+            try:
+                error = parent_conn.recv()
+            except EOFError:
+                process.join()
+                error = 'exited with code {}'.format(process.exitcode)
+        finally:
+            parent_conn.close()
+
+        process.join()
+        if error:
+            raise RuntimeError('{} failed:\n{}'.format(command, error))
+
+
+runner = CommandRunner(JOB_TIMEOUT)
+
+
+def call_command(command, in_process=IN_PROCESS):
+    if in_process:
+        runner.run(command)
+    else:
+        check_call('python {0} {1}'.format(MANAGE, command), shell=True)
 
 
 class scheduled_job(object):
@@ -43,13 +141,37 @@ class scheduled_job(object):
 
     def run(self):
         self.log('starting')
+        start_time = time.time()
+        result = 'failure'
         try:
             self.callback()
         except Exception as e:
-            self.log('CRASHED: {}'.format(e))
+            self.log('CRASHED after {:.2f}s: {}'.format(time.time() - start_time, e))
             raise
         else:
-            self.log('finished successfully')
+            self.log('finished successfully in {:.2f}s'.format(time.time() - start_time))
+            result = 'success'
+        finally:
+            self.record(start_time, result)
+
+    def record(self, start_time, result):
+        """
+        Send the duration and result of the job to statsd in in-process mode,
+        setting Django up first if no job has yet. Failing to send them
+        doesn't fail the job.
+        """
+        if not IN_PROCESS:
+            return
+
+        try:
+            runner.setup()
+            from django_statsd.clients import statsd
+
+            metric = 'cron.{}'.format(self.name)
+            statsd.timing(metric, int((time.time() - start_time) * 1000))
+            statsd.incr('{}.{}'.format(metric, result))
+        except Exception as e:
+            self.log('unable to send metrics: {}'.format(e))
 
     def log(self, message):
         msg = '[{}] Clock job {}@{}: {}'.format(
@@ -91,7 +213,7 @@ def update_security_advisories():
 @scheduled_job('interval', minutes=5)
 def rnasync():
     # running in a subprocess as rnasync was not designed for long-running process
-    call_command('rnasync')
+    call_command('rnasync', in_process=False)
 
 
 @scheduled_job('interval', hours=6)
@@ -116,7 +238,33 @@ if DEV:
         call_command('l10n_update')
 
 
+def benchmark(runs=5, command='check'):
+    """Print how long running a command takes in a subprocess and in a forked process."""
+    with open(os.devnull, 'w') as devnull:
+        start_time = time.time()
+        for i in range(runs):
+            check_call('python {0} {1}'.format(MANAGE, command), shell=True, stdout=devnull)
+        subprocess_time = (time.time() - start_time) / runs
+
+    start_time = time.time()
+    runner.run(command)
+    setup_time = time.time() - start_time
+    start_time = time.time()
+    for i in range(runs):
+        runner.run(command)
+    in_process_time = (time.time() - start_time) / runs
+
+    print('{} runs of "{}"'.format(runs, command))
+    print('subprocess: {:.3f}s per run'.format(subprocess_time))
+    print('in process: {:.3f}s for the first run setting up Django, '
+          '{:.3f}s per run after'.format(setup_time, in_process_time))
+
+
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['benchmark']:
+        benchmark(*[int(arg) for arg in sys.argv[2:3]])
+        sys.exit()
+
     try:
         schedule.start()
     except (KeyboardInterrupt, SystemExit):
@@ -8,13 +8,16 @@ from os.path import splitext
 from django.conf import settings
 from django.http import HttpResponseRedirect
 from django.shortcuts import render as django_render
-from django.template import TemplateDoesNotExist
 from django.utils.translation.trans_real import parse_accept_lang_header
 
+from jingo import get_env
+from jinja2 import TemplateNotFound
+
 from bedrock.base.urlresolvers import split_path
 
-from .dotlang import get_lang_path
-from .gettext import template_is_active, translations_for_template
+from .dotlang import catalogs, get_lang_path
+from .gettext import (is_template, list_templates, template_is_active,
+                      translations_for_template)
 
 
 def render(request, template, context=None, **kwargs):
@@ -92,24 +95,48 @@ def render(request, template, context=None, **kwargs):
 
             return response
 
-        # Render try #1: Look for l10n template in locale/{{ LANG }}/templates/
-        l10n_tmpl = '%s/templates/%s' % (request.locale, template)
-        try:
-            return django_render(request, l10n_tmpl, context, **kwargs)
-        except TemplateDoesNotExist:
-            pass
-
-        # Render try #2: Look for locale-specific template in app/templates/
-        locale_tmpl = '.{}'.format(request.locale).join(splitext(template))
-        try:
-            return django_render(request, locale_tmpl, context, **kwargs)
-        except TemplateDoesNotExist:
-            pass
-
-    # Render try #3: Render originally requested/default template
+        template = localized_template(template, request.locale)
+
     return django_render(request, template, context, **kwargs)
 
 
+def get_template_names():
+    """
+    Return the set of names of all templates.
+
+    The set is kept in process and rebuilt when the version stamp written by
+    `l10n_update` changes.
+    """
+    return catalogs.get_index('template_names', list_templates)
+
+
+def localized_template(template, locale):
+    """
+    Return the name of the template to render for `template` in `locale`:
+    the l10n template in locale/{{ LANG }}/templates/ if there is one, else
+    the locale-specific template in app/templates/ if there is one, else
+    `template` itself.
+    """
+    candidates = ['%s/templates/%s' % (locale, template),
+                  '.{}'.format(locale).join(splitext(template))]
+    if is_template(template):
+        template_names = get_template_names()
+        for name in candidates:
+            if name in template_names:
+                return name
+    else:
+        # only .html templates are listed, ask the loaders for the others
+        env = get_env()
+        for name in candidates:
+            try:
+                env.loader.get_source(env, name)
+            except TemplateNotFound:
+                continue
+            return name
+
+    return template
+
+
 def get_locale(request):
     return getattr(request, 'locale', settings.LANGUAGE_CODE)
 
@@ -7,13 +7,16 @@
 """This library parses dotlang files migrated over from the old PHP
 system.
 
-It caches them using the django caching library, but it could
-potentially just use thread-local variables. Caching seems safer at
-the expense of another caching layer."""
+Translations are kept in per-process catalogs that are only reloaded when
+`l10n_update` pulls new locale files (see `TranslationCatalogs`). Tags are
+cached using the django caching library."""
 import codecs
 import inspect
+import marshal
 import os
 import re
+import sys
+import time
 from functools import partial
 
 from django.conf import settings
@@ -30,6 +33,8 @@ FORMAT_IDENTIFIER_RE = re.compile(r"""(%
                                       (?:\((\w+)\))? # Mapping key
                                       s)""", re.VERBOSE)
 TAG_REGEX = re.compile(r"^## ([\w-]+) ##")
+# bump when the layout of compiled lang files changes
+COMPILED_LANG_VERSION = 1
 cache = get_cache('l10n')
 
 
@@ -81,6 +86,76 @@ def parse(path, skip_untranslated=True, extract_comments=False):
     return trans
 
 
+def parse_tags(path):
+    """
+    Return the set of tags ("## tag ##" lines) at the top of a dotlang file.
+    :param path: Absolute path to a lang file.
+    :return: set
+    """
+    tag_set = set()
+    try:
+        with codecs.open(path, 'r', 'utf-8', errors='replace') as lines:
+            for line in lines:
+                # Filter out Byte order Mark
+                line = line.replace(u'\ufeff', '')
+                m = TAG_REGEX.match(line)
+                if m:
+                    tag_set.add(m.group(1))
+                else:
+                    # Stop at the first non-tag line.
+                    break
+    except IOError:
+        pass
+
+    return tag_set
+
+
+def compiled_path(path):
+    """Return the path of the compiled version of the lang file at `path`."""
+    return path + 'c'
+
+
+def compile_lang_file(path):
+    """
+    Write the tags and translations of the lang file at `path` to a compiled
+    file next to it that `load_compiled` can read without parsing.
+
+    The tags are written as a separate header so they can be read without
+    loading the translations.
+    """
+    header = {
+        'version': COMPILED_LANG_VERSION,
+        'mtime': os.path.getmtime(path),
+        'tags': list(parse_tags(path)),
+    }
+    with open(compiled_path(path), 'wb') as compiled:
+        marshal.dump(header, compiled)
+        marshal.dump(parse(path), compiled)
+
+
+def load_compiled(path, tags_only=False):
+    """
+    Return `(tags, translations)` for the lang file at `path` from its compiled
+    version, or None if it hasn't been compiled or was modified since.
+    `translations` is None if `tags_only` is True.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+        with open(compiled_path(path), 'rb') as compiled:
+            header = marshal.load(compiled)
+            if (header['version'] != COMPILED_LANG_VERSION or
+                    header['mtime'] != mtime):
+                return None
+
+            tags = set(header['tags'])
+            if tags_only:
+                return tags, None
+
+            return tags, marshal.load(compiled)
+    except (IOError, OSError, EOFError, ValueError, TypeError, KeyError):
+        return None
+
+
 def mail_error(path, message):
     """Email managers when an error is detected"""
     from django.core import mail
@@ -97,6 +172,136 @@ def fix_case(locale):
         return '%s-%s' % (parts[0], parts[1].upper())
 
 
+def l10n_version_path():
+    """Return the path of the file `l10n_update` touches when locale files change."""
+    return os.path.join(settings.ROOT, 'locale', '.l10n_version')
+
+
+def get_l10n_version():
+    """Return the current version stamp of the locale files, or None if unknown."""
+    try:
+        return os.path.getmtime(l10n_version_path())
+    except OSError:
+        return None
+
+
+def update_l10n_version():
+    """Mark the locale files as changed so that every process reloads its catalogs."""
+    with open(l10n_version_path(), 'w') as stamp:
+        stamp.write(str(time.time()))
+
+
+class TranslationCatalogs(object):
+    """
+    In-process store of the translations for each locale and list of lang files,
+    and of the indexes built from the l10n files.
+
+    Each catalog maps a string to `(translation, rel_path, valid)` for the first
+    lang file in the list that translates it, so a lookup is a single dict hit.
+    Catalogs don't expire: they are dropped when the version stamp written by
+    `l10n_update` changes, which is checked at most every `DOTLANG_CACHE` seconds.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.catalogs = {}
+        self.lang_files = {}
+        self.indexes = {}
+        self.version = get_l10n_version()
+        self.version_checked = time.time()
+
+    def check_version(self):
+        now = time.time()
+        if now - self.version_checked < settings.DOTLANG_CACHE:
+            return
+
+        self.version_checked = now
+        version = get_l10n_version()
+        if version != self.version:
+            self.catalogs = {}
+            self.lang_files = {}
+            self.indexes = {}
+            self.version = version
+
+    def get_lang_file(self, lang, file_):
+        key = (settings.ROOT, lang, file_)
+        trans = self.lang_files.get(key)
+        if trans is None:
+            rel_path = os.path.join('locale', lang, '%s.lang' % file_)
+            path = os.path.join(settings.ROOT, rel_path)
+            compiled = load_compiled(path)
+            parsed = compiled[1] if compiled else parse(path)
+            trans = {}
+            for source, translated in parsed.items():
+                valid = (set(FORMAT_IDENTIFIER_RE.findall(source)) ==
+                         set(FORMAT_IDENTIFIER_RE.findall(translated)))
+                trans[source] = (translated, rel_path, valid)
+
+            self.lang_files[key] = trans
+
+        return trans
+
+    def get(self, lang, files):
+        """Return the merged catalog for `lang` with `files` in order of precedence."""
+        self.check_version()
+        key = (settings.ROOT, lang, tuple(files))
+        catalog = self.catalogs.get(key)
+        if catalog is None:
+            catalog = {}
+            for file_ in reversed(key[2]):
+                catalog.update(self.get_lang_file(lang, file_))
+
+            self.catalogs[key] = catalog
+
+        return catalog
+
+    def get_index(self, name, build):
+        """Return the index `name`, calling `build()` if the version changed."""
+        self.check_version()
+        key = (settings.ROOT, name)
+        cached = self.indexes.get(key)
+        if cached is None or cached[0] != self.version:
+            cached = self.indexes[key] = (self.version, build())
+
+        return cached[1]
+
+
+catalogs = TranslationCatalogs()
+
+
+def build_lang_file_index():
+    """
+    Return `{lang_file: {lang: tags}}` for every lang file of every locale in
+    `PROD_LANGUAGES`, reading the tags of each file once.
+    """
+    index = {}
+    for lang in settings.PROD_LANGUAGES:
+        lang_dir = os.path.join(settings.ROOT, 'locale', lang)
+        for root, dirs, files in os.walk(lang_dir):
+            for filename in files:
+                if not filename.endswith('.lang'):
+                    continue
+
+                path = os.path.join(root, filename)
+                lang_file = os.path.relpath(path, lang_dir)[:-len('.lang')]
+                compiled = load_compiled(path, tags_only=True)
+                tags = compiled[0] if compiled else parse_tags(path)
+                index.setdefault(lang_file, {})[lang] = frozenset(tags)
+
+    return index
+
+
+def get_lang_file_index():
+    """
+    Return the lang file index built by `build_lang_file_index`.
+
+    The index is kept in process and rebuilt when the version stamp written by
+    `l10n_update` changes.
+    """
+    return catalogs.get_index('lang_file_index', build_lang_file_index)
+
+
 def translate(text, files):
     """Search a list of .lang files for a translation"""
     lang = fix_case(translation.get_language())
@@ -105,30 +310,19 @@ def translate(text, files):
     if lang == settings.LANGUAGE_CODE:
         return Markup(text)
 
-    tweaked_text = strip_whitespace(text)
+    trans = catalogs.get(lang, files).get(strip_whitespace(text))
+    if trans is None:
+        return Markup(text)
 
-    for file_ in files:
-        key = "dotlang-%s-%s" % (lang, file_)
-        rel_path = os.path.join('locale', lang, '%s.lang' % file_)
+    translated, rel_path, valid = trans
+    if not valid:
+        explanation = ('The translation has a different set of '
+                       'replaced text (aka %s)')
+        message = '%s\n\n%s\n%s' % (explanation, text, translated)
+        mail_error(rel_path, message)
+        return Markup(text)
 
-        trans = cache.get(key)
-        if trans is None:
-            path = os.path.join(settings.ROOT, rel_path)
-            trans = parse(path)
-            cache.set(key, trans, settings.DOTLANG_CACHE)
-
-        if tweaked_text in trans:
-            original = FORMAT_IDENTIFIER_RE.findall(text)
-            translated = FORMAT_IDENTIFIER_RE.findall(trans[tweaked_text])
-            if set(original) != set(translated):
-                explanation = ('The translation has a different set of '
-                               'replaced text (aka %s)')
-                message = '%s\n\n%s\n%s' % (explanation, text,
-                                            trans[tweaked_text])
-                mail_error(rel_path, message)
-                return Markup(text)
-            return Markup(trans[tweaked_text])
-    return Markup(text)
+    return Markup(translated)
 
 
 def _get_extra_lang_files():
@@ -147,10 +341,33 @@ def _get_extra_lang_files():
             new_lang_files = frame.f_back.f_back.f_globals.get('LANG_FILES', [])
         finally:
             del frame
-        if new_lang_files:
-            if isinstance(new_lang_files, basestring):
-                new_lang_files = [new_lang_files]
-    return [lf for lf in new_lang_files if lf not in settings.DOTLANG_FILES]
+    return _module_lang_files(new_lang_files)
+
+
+def _module_lang_files(lang_files):
+    """Return the `LANG_FILES` value of a module as a list without the default files."""
+    if isinstance(lang_files, basestring):
+        lang_files = [lang_files]
+    return [lf for lf in lang_files if lf not in settings.DOTLANG_FILES]
+
+
+def _translate(text, args, lang_files, default_lang_files):
+    """
+    Translate `text` using `lang_files` (from the `lang_files` kwarg of `_`) if
+    any, otherwise `default_lang_files`, followed by the global lang files.
+    """
+    if lang_files:
+        if isinstance(lang_files, list):
+            lang_files = lang_files + settings.DOTLANG_FILES
+        else:
+            lang_files = [lang_files] + settings.DOTLANG_FILES
+    else:
+        lang_files = default_lang_files
+
+    text = translate(text, lang_files)
+    if args:
+        text = text % args
+    return text
 
 
 def _(text, *args, **kwargs):
@@ -159,6 +376,9 @@ def _(text, *args, **kwargs):
     in the module from which this function is called, those files (or file)
     will be searched first for the translation, followed by the default files.
 
+    Modules that define `LANG_FILES` should prefer the functions returned by
+    `bind`, which don't have to inspect the stack on every call.
+
     :param text: string to translate
     :param args: items for interpolation into `text`
     :param lang_files: extra lang file names to search for a translation.
@@ -168,19 +388,11 @@ def _(text, *args, **kwargs):
         add that file for the whole module via the `LANG_FILES` constant.
     :return: translated string
     """
-    lang_files = kwargs.pop('lang_files', [])
-    if isinstance(lang_files, list):
-        lang_files = lang_files[:]
-    else:
-        lang_files = [lang_files]
+    lang_files = kwargs.pop('lang_files', None)
+    default_lang_files = None
     if not lang_files:
-        lang_files += _get_extra_lang_files()
-    lang_files += settings.DOTLANG_FILES
-
-    text = translate(text, lang_files)
-    if args:
-        text = text % args
-    return text
+        default_lang_files = _get_extra_lang_files() + settings.DOTLANG_FILES
+    return _translate(text, args, lang_files, default_lang_files)
 
 
 _lazy_proxy = lazy(_, unicode)
@@ -193,6 +405,28 @@ def _lazy(*args, **kwargs):
     return _lazy_proxy(*args, **kwargs)
 
 
+def bind(module_name):
+    """
+    Return `_` and `_lazy` functions for the module `module_name` that search
+    its `LANG_FILES` before the global lang files. `LANG_FILES` is read once
+    when this is called instead of being looked up from the stack on every call,
+    so it must be defined before it::
+
+        LANG_FILES = ['mozorg/newsletters']
+        _, _lazy = bind(__name__)
+
+    Keep the names `_` and `_lazy` so that the strings are still extracted.
+    The returned functions accept the same arguments as the module level ones.
+    """
+    module_lang_files = getattr(sys.modules[module_name], 'LANG_FILES', [])
+    default_lang_files = _module_lang_files(module_lang_files) + settings.DOTLANG_FILES
+
+    def bound_gettext(text, *args, **kwargs):
+        return _translate(text, args, kwargs.pop('lang_files', None), default_lang_files)
+
+    return bound_gettext, lazy(bound_gettext, unicode)
+
+
 def get_lang_path(path):
     """Generate the path to a lang file from a django path.
     /apps/foo/templates/foo/bar.html -> foo/bar
@@ -238,22 +472,9 @@ def lang_file_tag_set(path, lang=None):
     cache_key = 'tag:%s' % rel_path
     tag_set = cache.get(cache_key)
     if tag_set is None:
-        tag_set = set()
         fpath = os.path.join(settings.ROOT, rel_path)
-        try:
-            with codecs.open(fpath, 'r', 'utf-8', errors='replace') as lines:
-                for line in lines:
-                    # Filter out Byte order Mark
-                    line = line.replace(u'\ufeff', '')
-                    m = TAG_REGEX.match(line)
-                    if m:
-                        tag_set.add(m.group(1))
-                    else:
-                        # Stop at the first non-tag line.
-                        break
-        except IOError:
-            pass
-
+        compiled = load_compiled(fpath, tags_only=True)
+        tag_set = compiled[0] if compiled else parse_tags(fpath)
         cache.set(cache_key, tag_set, settings.DOTLANG_CACHE)
 
     return tag_set
@@ -289,10 +510,15 @@ def get_translations_for_langfile(langfile):
     if translations:
         return translations
 
+    if settings.DEV:
+        active = ALL_THE_THINGS
+    else:
+        tags = get_lang_file_index().get(langfile, {})
+        active = set(lang for lang, tag_set in tags.items() if 'active' in tag_set)
+
     for lang in settings.PROD_LANGUAGES:
         if (lang in product_details.languages and
-                (lang == settings.LANGUAGE_CODE or
-                 lang_file_is_active(langfile, lang))):
+                (lang == settings.LANGUAGE_CODE or lang in active)):
             translations[lang] = product_details.languages[lang]['native']
 
     cache.set(cache_key, translations, settings.DOTLANG_CACHE)
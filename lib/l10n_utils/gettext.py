@@ -7,6 +7,7 @@
 from __future__ import with_statement
 
 import codecs
+import json
 import os
 import re
 from os.path import join
@@ -15,7 +16,8 @@ from tokenize import generate_tokens, NAME, NEWLINE, OP, untokenize
 from django.conf import settings
 from django.core.cache import get_cache
 from django.template.loader import get_template
-from jinja2 import Environment
+from jingo import get_env
+from jinja2 import Environment, TemplateSyntaxError
 
 from dotlang import (parse as parse_lang, get_lang_path,
                      get_translations_for_langfile, lang_file_tag_set)
@@ -138,16 +140,8 @@ def parse_python(path):
     return []
 
 
-def parse_template(path):
-    """Look through a template for the lang_files tag and extract the
-    given lang files"""
-
-    cache_key = 'template_lang_files:{0}'.format(path)
-    lang_files = cache.get(cache_key)
-    if lang_files:
-        return lang_files
-
-    src = codecs.open(path, encoding='utf-8').read()
+def lang_files_from_source(src):
+    """Return the lang files given to the first lang files tag in template source."""
     tokens = Environment().lex(src)
     lang_files = []
 
@@ -173,15 +167,85 @@ def parse_template(path):
                 # remove empties
                 lang_files = [lf for lf in lang_files if lf]
                 if lang_files:
-                    cache.set(cache_key, lang_files, settings.DOTLANG_CACHE)
                     return lang_files
     return []
 
 
+def parse_template(path):
+    """Look through a template for the lang_files tag and extract the
+    given lang files"""
+
+    cache_key = 'template_lang_files:{0}'.format(path)
+    lang_files = cache.get(cache_key)
+    if lang_files is None:
+        src = codecs.open(path, encoding='utf-8').read()
+        lang_files = lang_files_from_source(src)
+        cache.set(cache_key, lang_files, settings.DOTLANG_CACHE)
+
+    return lang_files
+
+
+def list_templates():
+    """Return the set of names of all the templates the jinja environment can load."""
+    env = get_env()
+    names = set()
+    for loader in getattr(env.loader, 'loaders', [env.loader]):
+        try:
+            names.update(name for name in loader.list_templates() if is_template(name))
+        except OSError:
+            # apps without a templates directory
+            pass
+
+    return names
+
+
+def build_template_manifest():
+    """
+    Return the lang files set in every template, keyed by template name.
+
+    Templates that fail to lex are left out so that they are parsed when used.
+    """
+    env = get_env()
+    manifest = {}
+    for name in list_templates():
+        src = env.loader.get_source(env, name)[0]
+        try:
+            manifest[name] = lang_files_from_source(src)
+        except TemplateSyntaxError:
+            pass
+
+    return manifest
+
+
+def get_template_manifest():
+    """Return the manifest written by the `l10n_templates` command, or {} if there isn't one."""
+    manifest = cache.get('template_manifest')
+    if manifest is None:
+        try:
+            with open(settings.TEMPLATE_LANG_FILES_MANIFEST) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (IOError, ValueError):
+            manifest = {}
+        cache.set('template_manifest', manifest, None)
+
+    return manifest
+
+
+def template_lang_files(template_name):
+    """
+    Return the lang files set in the template `template_name`, looking them up
+    in the template manifest before loading and parsing the template.
+    """
+    lang_files = get_template_manifest().get(template_name)
+    if lang_files is None:
+        lang_files = parse_template(get_template(template_name).filename)
+
+    return lang_files
+
+
 def _get_template_tag_set(lang, path):
     lang_files = [get_lang_path(path)]
-    template = get_template(path)
-    lang_files.extend(parse_template(template.filename))
+    lang_files.extend(template_lang_files(path))
     tag_set = set()
     for lf in lang_files:
         tag_set |= lang_file_tag_set(lf, lang)
@@ -244,8 +308,7 @@ def translations_for_template(template_name):
     :return: dict, like {'en-US': 'English (US)', 'fr': 'Français'}
     """
     lang_files = [get_lang_path(template_name)]
-    template = get_template(template_name)
-    lang_files.extend(parse_template(template.filename))
+    lang_files.extend(template_lang_files(template_name))
     active_translations = {}
     for lf in lang_files:
         active_translations.update(get_translations_for_langfile(lf))
@@ -0,0 +1,42 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+from __future__ import print_function
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lib.l10n_utils.dotlang import compile_lang_file
+
+
+def lang_files(langs):
+    """Yield the path of every .lang file for the given locales."""
+    locale_dir = os.path.join(settings.ROOT, 'locale')
+    for lang in langs:
+        for root, dirs, files in os.walk(os.path.join(locale_dir, lang)):
+            for filename in files:
+                if filename.endswith('.lang'):
+                    yield os.path.join(root, filename)
+
+
+class Command(BaseCommand):
+    args = '[locale ...]'
+    help = 'Compiles .lang files so they can be loaded without parsing'
+
+    def handle(self, *args, **options):
+        if args:
+            langs = args
+        else:
+            langs = os.listdir(os.path.join(settings.ROOT, 'locale'))
+            langs = filter(lambda x: x != 'templates', langs)
+            langs = filter(lambda x: x[0] != '.', langs)
+
+        count = 0
+        for path in lang_files(langs):
+            compile_lang_file(path)
+            count += 1
+
+        if int(options.get('verbosity', 1)) > 0:
+            print('Compiled {} lang files'.format(count))
@@ -0,0 +1,24 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+from __future__ import print_function
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lib.l10n_utils.gettext import build_template_manifest
+
+
+class Command(BaseCommand):
+    args = ''
+    help = 'Writes the lang files set in each template to TEMPLATE_LANG_FILES_MANIFEST'
+
+    def handle(self, *args, **options):
+        manifest = build_template_manifest()
+        with open(settings.TEMPLATE_LANG_FILES_MANIFEST, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=0, sort_keys=True)
+
+        if int(options.get('verbosity', 1)) > 0:
+            print('Found lang files for {} templates'.format(len(manifest)))
@@ -9,6 +9,8 @@ from subprocess import check_output, STDOUT
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 
+from lib.l10n_utils.dotlang import update_l10n_version
+
 
 GIT = getattr(settings, 'GIT_BIN', 'git')
 
@@ -30,6 +32,8 @@ class Command(BaseCommand):
         else:
             self.clone_repo()
 
+        update_l10n_version()
+
     @property
     def remote_name(self):
         return 'l10n-dev' if settings.DEV else 'l10n-prod'
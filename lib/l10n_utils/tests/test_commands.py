@@ -6,6 +6,7 @@
 from __future__ import unicode_literals
 
 import codecs
+import json
 from os import path
 from StringIO import StringIO
 from textwrap import dedent
@@ -24,7 +25,7 @@ from lib.l10n_utils.management.commands.l10n_check import (
     update_templates,
 )
 from lib.l10n_utils.management.commands.l10n_extract import extract_from_files
-from lib.l10n_utils.management.commands import l10n_update
+from lib.l10n_utils.management.commands import l10n_compile, l10n_templates, l10n_update
 from lib.l10n_utils.tests import capture_stdio
 
 
@@ -46,6 +47,9 @@ TRUE_MOCK.return_value = True
 class TestL10nUpdate(TestCase):
     def setUp(self):
         self.cmd = l10n_update.Command()
+        patcher = patch.object(l10n_update, 'update_l10n_version')
+        self.update_version_mock = patcher.start()
+        self.addCleanup(patcher.stop)
 
     @override_settings(DEV=True)
     def test_clone_if_no_locales(self, git_mock):
@@ -54,6 +58,7 @@ class TestL10nUpdate(TestCase):
         self.cmd.handle()
         git_mock.assert_called_once_with('clone', '--origin', 'l10n-dev',
                                          self.cmd.locales_repo, self.cmd.locales_path_str)
+        self.update_version_mock.assert_called_once_with()
 
     @override_settings(DEV=True)
     @patch.object(l10n_update.os, 'chdir', Mock())
@@ -68,6 +73,7 @@ class TestL10nUpdate(TestCase):
             call('fetch', 'l10n-dev'),
             call('checkout', '-f', 'l10n-dev/master'),
         ])
+        self.update_version_mock.assert_called_once_with()
 
     @override_settings(DEV=False)
     @patch.object(l10n_update.os, 'chdir', Mock())
@@ -92,6 +98,58 @@ class TestL10nUpdate(TestCase):
         self.cmd.locales_path.joinpath.return_value.is_dir.return_value = False
         with self.assertRaises(CommandError):
             self.cmd.handle()
+        self.assertFalse(self.update_version_mock.called)
+
+
+@override_settings(ROOT=ROOT)
+@patch.object(l10n_compile, 'compile_lang_file')
+class TestL10nCompile(TestCase):
+    def test_compile_all_locales(self, compile_mock):
+        with capture_stdio() as out:
+            l10n_compile.Command().handle()
+        compiled = sorted(c[0][0] for c in compile_mock.call_args_list)
+        expected = [path.join(ROOT, 'locale', name) for name in [
+            'de/active_de_lang_file.lang',
+            'de/active_de_lang_file_bom.lang',
+            'de/firefox/fx.lang',
+            'de/inactive_de_lang_file.lang',
+            'de/main.lang',
+            'de/trans_block_reload_test.lang',
+            'en-GB/firefox/new.lang',
+            'es-ES/firefox/new.lang',
+            'fr/firefox/new.lang',
+            'fr/format_identifier_mismatch.lang',
+            'fr/tweaked_message_translation.lang',
+        ]]
+        self.assertEqual(compiled, expected)
+        self.assertEqual(out[0], 'Compiled 11 lang files')
+
+    def test_compile_some_locales(self, compile_mock):
+        l10n_compile.Command().handle('fr', verbosity=0)
+        compiled = sorted(c[0][0] for c in compile_mock.call_args_list)
+        self.assertEqual(compiled, [path.join(ROOT, 'locale', 'fr', name) for name in [
+            'firefox/new.lang',
+            'format_identifier_mismatch.lang',
+            'tweaked_message_translation.lang',
+        ]])
+
+
+class TestL10nTemplates(TestCase):
+    @patch('lib.l10n_utils.management.commands.l10n_templates.build_template_manifest')
+    def test_write_manifest(self, build_mock):
+        build_mock.return_value = {'the/dude.html': ['walter'], 'the/bums.html': []}
+        open_mock = MagicMock()
+        with override_settings(TEMPLATE_LANG_FILES_MANIFEST='/the/manifest.json'):
+            with patch('lib.l10n_utils.management.commands.l10n_templates.open',
+                       open_mock, create=True):
+                with capture_stdio() as out:
+                    l10n_templates.Command().handle()
+
+        open_mock.assert_called_once_with('/the/manifest.json', 'w')
+        written = ''.join(c[0][0] for c in
+                          open_mock.return_value.__enter__.return_value.write.call_args_list)
+        self.assertEqual(json.loads(written), build_mock.return_value)
+        self.assertEqual(out[0], 'Found lang files for 2 templates')
 
 
 @override_settings(ROOT=ROOT)
@@ -5,10 +5,12 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import os
+import shutil
+from tempfile import mkdtemp
 
 from django.conf import settings
 from django.core import mail
-from django.core.cache import cache
+from django.core.cache import cache, get_cache
 from django.core.urlresolvers import clear_url_caches
 from django.http import HttpRequest
 from django.test.utils import override_settings
@@ -22,14 +24,21 @@ from pyquery import PyQuery as pq
 
 from bedrock.mozorg.tests import TestCase
 from lib.l10n_utils import render
-from lib.l10n_utils.dotlang import (_, _lazy, FORMAT_IDENTIFIER_RE, lang_file_has_tag,
-                                    lang_file_is_active, parse, translate)
+from lib.l10n_utils.dotlang import (_, _lazy, _module_lang_files, bind,
+                                    build_lang_file_index, catalogs,
+                                    compile_lang_file, compiled_path, FORMAT_IDENTIFIER_RE,
+                                    get_lang_file_index,
+                                    get_translations_for_langfile, lang_file_has_tag,
+                                    lang_file_is_active, lang_file_tag_set, load_compiled,
+                                    parse, translate,
+                                    update_l10n_version)
 from lib.l10n_utils.extract import extract_python
 
 
 ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_files')
 LANG_FILES = 'test_file'
 TEMPLATE_DIRS = (os.path.join(ROOT, 'templates'),)
+dotlang_cache = get_cache('l10n')
 
 
 @override_settings(DEV=False, LANGUAGE_CODE='en-US')
@@ -65,6 +74,42 @@ class TestLangFilesActivation(TestCase):
         ok_(not lang_file_has_tag('main', 'de', 'tag_after_non_tag_lines'))
         ok_(not lang_file_has_tag('main', 'de', 'no_such_tag'))
 
+    def test_build_lang_file_index(self):
+        """The index should have the tags of every lang file for every locale."""
+        index = build_lang_file_index()
+        eq_(index['active_de_lang_file'], {'de': frozenset(['active'])})
+        eq_(index['inactive_de_lang_file'], {'de': frozenset()})
+        ok_('guten_tag' in index['main']['de'])
+        eq_(sorted(index['firefox/new']), ['en-GB', 'es-ES', 'fr'])
+        ok_('does_not_exist' not in index)
+
+    @patch('lib.l10n_utils.dotlang.lang_file_tag_set')
+    def test_translations_for_langfile_use_index(self, tag_set_mock):
+        """
+        Available translations should come from the lang file index, which
+        is built once instead of checking each locale's lang file.
+        """
+        catalogs.clear()
+        with patch('lib.l10n_utils.dotlang.build_lang_file_index',
+                   wraps=build_lang_file_index) as build_mock:
+            translations = get_translations_for_langfile('active_de_lang_file')
+            eq_(sorted(translations), ['de', 'en-US'])
+            translations = get_translations_for_langfile('firefox/new')
+            eq_(sorted(translations), ['en-GB', 'en-US', 'es-ES', 'fr'])
+            eq_(get_translations_for_langfile('does_not_exist').keys(), ['en-US'])
+
+        eq_(build_mock.call_count, 1)
+        self.assertFalse(tag_set_mock.called)
+
+    def test_lang_file_index_rebuilt_on_new_version(self):
+        """The index should be rebuilt when the l10n version changes."""
+        catalogs.clear()
+        index = get_lang_file_index()
+        ok_(get_lang_file_index() is index)
+        with patch.object(catalogs, 'version', 'new version'):
+            with patch.object(catalogs, 'check_version'):
+                ok_(get_lang_file_index() is not index)
+
     def test_active_locale_not_redirected(self):
         """ Active lang file should render correctly.
 
@@ -107,6 +152,7 @@ class TestLangFilesActivation(TestCase):
 class TestDotlang(TestCase):
     def setUp(self):
         cache.clear()
+        catalogs.clear()
         clear_url_caches()
 
     def test_parse(self):
@@ -373,24 +419,226 @@ class TestDotlang(TestCase):
         dirty_string = u'Stuff\xa0about\r\nmany\t   things.'
         trans_patch.assert_called_with(dirty_string, settings.DOTLANG_FILES)
 
+    @patch('lib.l10n_utils.dotlang.translate')
+    def test_bound_gettext_searches_module_lang_files(self, trans_patch):
+        """
+        The functions returned by `l10n_utils.dotlang.bind` should search the
+        .lang files of the module they were bound to before the default files.
+        """
+        from lib.l10n_utils.tests.test_files import extract_me_with_bind
+
+        dirty_string = u"I'm The Dude, so that's what you call me, man."
+        call_lang_files = ['donnie', 'walter'] + settings.DOTLANG_FILES
+        extract_me_with_bind.do_translate()
+        trans_patch.assert_called_with(dirty_string, call_lang_files)
+
+        trans_patch.reset_mock()
+        dude_says = extract_me_with_bind.do_translate_lazy()
+        self.assertFalse(trans_patch.called)
+        dude_says.__unicode__()
+        trans_patch.assert_called_with(dirty_string, call_lang_files)
+
+    @patch('lib.l10n_utils.dotlang.translate')
+    def test_bound_gettext_searches_kwarg_specified_lang_files(self, trans_patch):
+        """
+        The `lang_files` keyword arg should override the bound module's files.
+        """
+        from lib.l10n_utils.tests.test_files import extract_me_with_bind
+
+        trans_str = 'Translate me'
+        extract_me_with_bind._(trans_str, lang_files='maude')
+        trans_patch.assert_called_with(trans_str, ['maude'] + settings.DOTLANG_FILES)
+
+        extract_me_with_bind._lazy(trans_str, lang_files=['maude', 'uli']).__unicode__()
+        trans_patch.assert_called_with(trans_str, ['maude', 'uli'] + settings.DOTLANG_FILES)
+
+    def test_bound_gettext_str_interpolation(self):
+        from lib.l10n_utils.tests.test_files import extract_me_with_bind
+
+        eq_(extract_me_with_bind._('The %s %s.', 'dude', 'abides'), 'The dude abides.')
+
+    @patch('lib.l10n_utils.dotlang._get_extra_lang_files')
+    @patch('lib.l10n_utils.dotlang._module_lang_files', wraps=_module_lang_files)
+    @patch('lib.l10n_utils.dotlang.translate')
+    def test_bound_gettext_resolves_lang_files_once(self, trans_patch, module_mock, extra_mock):
+        """
+        The bound functions should read `LANG_FILES` once when they are bound,
+        without the stack inspection that the module level `_` does on every call.
+        """
+        from lib.l10n_utils.tests.test_files import extract_me_with_bind
+
+        module_mock.reset_mock()
+        bound_gettext, bound_lazy = bind(extract_me_with_bind.__name__)
+        eq_(module_mock.call_count, 1)
+        module_mock.reset_mock()
+        for i in range(3):
+            bound_gettext('Translate me')
+            bound_lazy('Translate me').__unicode__()
+
+        ok_(not module_mock.called)
+        ok_(not extra_mock.called)
+        eq_(trans_patch.call_count, 6)
+        trans_patch.assert_called_with('Translate me',
+                                       ['donnie', 'walter'] + settings.DOTLANG_FILES)
+
     def test_gettext_str_interpolation(self):
         result = _('The %s %s.', 'dude', 'abides')
         eq_(result, 'The dude abides.')
 
-    @patch('lib.l10n_utils.dotlang.cache')
-    def test_translate_skips_for_default_locale(self, cache_mock):
+    @patch('lib.l10n_utils.dotlang.parse')
+    def test_translate_skips_for_default_locale(self, parse_mock):
         """
-        Translation calls should not hit the cache for the default language.
+        Translation calls should not load lang files for the default language.
         There will never be any lang files, and the strings in the calls are
         the correct ones already.
         """
+        parse_mock.return_value = {}
         with self.activate('fr'):
             translate('The Dude abides.', ['main'])
-        self.assertEqual(cache_mock.get.call_count, 1)
-        cache_mock.reset_mock()
+        self.assertEqual(parse_mock.call_count, 1)
+        parse_mock.reset_mock()
         with self.activate(settings.LANGUAGE_CODE):
             translate('The Dude abides.', ['main'])
-        self.assertEqual(cache_mock.get.call_count, 0)
+        self.assertEqual(parse_mock.call_count, 0)
+
+
+class TestTranslationCatalogs(TestCase):
+    def setUp(self):
+        self.root = mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.mkdir(os.path.join(self.root, 'locale'))
+        os.mkdir(os.path.join(self.root, 'locale', 'de'))
+        self.write_lang_file('main', {'The Dude abides.': 'Der Dude bleibt.',
+                                      'Far out.': 'Weit draussen.'})
+        self.write_lang_file('dude', {'The Dude abides.': 'Der Dude ruht.'})
+        patcher = patch.object(settings, 'ROOT', self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        catalogs.clear()
+
+    def write_lang_file(self, name, strings, lang='de'):
+        with open(os.path.join(self.root, 'locale', lang, name + '.lang'), 'w') as lang_file:
+            for source, translated in strings.items():
+                lang_file.write(';{}\n{}\n\n'.format(source, translated))
+
+    def test_precedence(self):
+        """Earlier lang files in the list should win."""
+        with self.activate('de'):
+            eq_(translate('The Dude abides.', ['dude', 'main']), 'Der Dude ruht.')
+            eq_(translate('The Dude abides.', ['main', 'dude']), 'Der Dude bleibt.')
+            eq_(translate('Far out.', ['dude', 'main']), 'Weit draussen.')
+            eq_(translate('Not translated.', ['dude', 'main']), 'Not translated.')
+
+    @patch('lib.l10n_utils.dotlang.parse')
+    def test_lang_files_parsed_once(self, parse_mock):
+        """Lang files should be parsed once per process, not per lookup."""
+        parse_mock.return_value = {}
+        with self.activate('de'):
+            for i in range(5):
+                translate('The Dude abides.', ['dude', 'main'])
+                translate('The Dude abides.', ['main'])
+        eq_(parse_mock.call_count, 2)
+
+    def test_reload_on_new_version(self):
+        """Catalogs should only be reloaded when the l10n version changes."""
+        with self.activate('de'):
+            eq_(translate('The Dude abides.', ['main']), 'Der Dude bleibt.')
+            self.write_lang_file('main', {'The Dude abides.': 'Der Dude schlaeft.'})
+            with override_settings(DOTLANG_CACHE=0):
+                eq_(translate('The Dude abides.', ['main']), 'Der Dude bleibt.')
+                update_l10n_version()
+                eq_(translate('The Dude abides.', ['main']), 'Der Dude schlaeft.')
+
+    def test_version_checked_at_most_every_dotlang_cache_seconds(self):
+        with self.activate('de'):
+            eq_(translate('The Dude abides.', ['main']), 'Der Dude bleibt.')
+            self.write_lang_file('main', {'The Dude abides.': 'Der Dude schlaeft.'})
+            update_l10n_version()
+            with override_settings(DOTLANG_CACHE=600):
+                eq_(translate('The Dude abides.', ['main']), 'Der Dude bleibt.')
+
+    def test_page_render_lookups(self):
+        """
+        Rendering a page with 200 strings from 4 lang files should read each
+        lang file once and merge its catalog, without using the l10n cache.
+        """
+        files = ['page', 'dude', 'main', 'download_button']
+        sources = ['String number {}.'.format(i) for i in range(200)]
+        for i, name in enumerate(files):
+            self.write_lang_file(name, {source: source.upper()
+                                        for source in sources[i * 50:(i + 1) * 50]})
+
+        template = get_env().from_string(
+            ''.join('<p>{{ _(%r, lang_files=lang_files) }}</p>' % str(source)
+                    for source in sources))
+        context = {'_': _, 'lang_files': files[:2]}
+
+        with self.activate('de'):
+            with patch.object(catalogs, 'get_lang_file',
+                              wraps=catalogs.get_lang_file) as lang_file_mock:
+                with patch('lib.l10n_utils.dotlang.cache') as cache_mock:
+                    for i in range(3):
+                        eq_(template.render(context).count('STRING NUMBER'), 200)
+
+        eq_(sorted(call[0][1] for call in lang_file_mock.call_args_list), sorted(files))
+        ok_((settings.ROOT, 'de', tuple(files)) in catalogs.catalogs)
+        ok_(not cache_mock.method_calls)
+
+
+@override_settings(DEV=False)
+class TestCompiledLangFiles(TestCase):
+    def setUp(self):
+        self.root = mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.root, 'locale', 'de'))
+        self.path = os.path.join(self.root, 'locale', 'de', 'main.lang')
+        self.write_lang_file(u'Der Dude bleibt.')
+        patcher = patch.object(settings, 'ROOT', self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        dotlang_cache.clear()
+        catalogs.clear()
+
+    def write_lang_file(self, translated):
+        with open(self.path, 'w') as lang_file:
+            lang_file.write(u'## active ##\n\n;The Dude abides.\n{}\n'.format(
+                translated).encode('utf-8'))
+
+    def test_compile_and_load(self):
+        compile_lang_file(self.path)
+        ok_(os.path.exists(compiled_path(self.path)))
+        eq_(load_compiled(self.path), ({'active'}, parse(self.path)))
+        eq_(load_compiled(self.path, tags_only=True), ({'active'}, None))
+
+    def test_load_not_compiled(self):
+        eq_(load_compiled(self.path), None)
+        eq_(load_compiled(os.path.join(self.root, 'does_not_exist.lang')), None)
+
+    def test_load_stale(self):
+        """A compiled file should be ignored once the lang file changes."""
+        compile_lang_file(self.path)
+        self.write_lang_file(u'Der Dude schl\xe4ft.')
+        os.utime(self.path, (0, 0))
+        eq_(load_compiled(self.path), None)
+
+    def test_translate_uses_compiled(self):
+        compile_lang_file(self.path)
+        with patch('lib.l10n_utils.dotlang.parse') as parse_mock, \
+                patch('lib.l10n_utils.dotlang.parse_tags') as parse_tags_mock:
+            with self.activate('de'):
+                eq_(translate('The Dude abides.', ['main']), u'Der Dude bleibt.')
+                ok_(lang_file_is_active('main', 'de'))
+        self.assertFalse(parse_mock.called)
+        self.assertFalse(parse_tags_mock.called)
+
+    def test_translate_falls_back_to_stale_lang_file(self):
+        compile_lang_file(self.path)
+        self.write_lang_file(u'Der Dude schl\xe4ft.')
+        os.utime(self.path, (0, 0))
+        with self.activate('de'):
+            eq_(translate('The Dude abides.', ['main']), u'Der Dude schl\xe4ft.')
+            eq_(lang_file_tag_set('main', 'de'), {'active'})
 
 
 @patch.object(get_env(), 'loader', FileSystemLoader(TEMPLATE_DIRS))
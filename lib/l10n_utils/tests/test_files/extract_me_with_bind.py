@@ -0,0 +1,22 @@
+# coding: utf-8
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from lib.l10n_utils.dotlang import bind
+
+
+LANG_FILES = [
+    'donnie',
+    'walter',
+]
+_, _lazy = bind(__name__)
+
+
+def do_translate():
+    return _(u"I'm The Dude, so that's what you call me, man.")
+
+
+def do_translate_lazy():
+    return _lazy(u"I'm The Dude, so that's what you call me, man.")
@@ -4,19 +4,25 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import json
 import os
+import shutil
+from tempfile import mkdtemp
 
 from django.conf import settings
 from django.core.cache import get_cache
 from django.test.utils import override_settings
 
+from jinja2 import Environment, FileSystemLoader
 from mock import ANY, MagicMock, Mock, patch
 from nose.tools import eq_, ok_
 
-from lib.l10n_utils.gettext import (_append_to_lang_file, langfiles_for_path,
+from lib.l10n_utils.gettext import (_append_to_lang_file, build_template_manifest,
+                                    get_template_manifest, langfiles_for_path,
                                     parse_python, parse_template,
                                     po_msgs, pot_to_langfiles, template_is_active,
-                                    _get_template_tag_set, template_has_tag)
+                                    _get_template_tag_set, template_has_tag,
+                                    template_lang_files)
 from lib.l10n_utils.tests import TempFileMixin
 from bedrock.mozorg.tests import TestCase
 
@@ -195,6 +201,68 @@ class TestParseTemplate(TempFileMixin, TestCase):
         lang_files = parse_template('file/doesnt/matter.html')
         eq_(lang_files, ['lebowski', 'walter', 'dude'])
 
+    @patch('lib.l10n_utils.gettext.codecs')
+    def test_no_lang_files_cached(self, codecs_mock):
+        """Templates without lang files should not be parsed again."""
+        tempf = self.tempfile("""
+            {% block title %}El Dudarino{% endblock %}
+        """)
+        codecs_mock.open.return_value = tempf
+        eq_(parse_template('file/doesnt/matter.html'), [])
+        eq_(parse_template('file/doesnt/matter.html'), [])
+        eq_(codecs_mock.open.call_count, 1)
+
+
+class TestTemplateManifest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('lib.l10n_utils.gettext.get_env')
+    def test_build_template_manifest(self, env_mock):
+        """The manifest should have the lang files set in every template."""
+        env_mock.return_value = Environment(loader=FileSystemLoader(TEMPLATE_DIRS))
+        manifest = build_template_manifest()
+        eq_(manifest['no_lang_files.html'], [])
+        eq_(manifest['some_lang_files.html'], ['dude', 'walter', 'main'])
+        eq_(manifest['reset_lang_files.html'], ['maud', 'bunny', 'uli'])
+        eq_(manifest['firefox/new.html'], [])
+
+    def test_get_template_manifest(self):
+        tempdir = mkdtemp()
+        manifest_path = os.path.join(tempdir, 'template_lang_files.json')
+        try:
+            with open(manifest_path, 'w') as manifest_file:
+                json.dump({'the/dude.html': ['walter']}, manifest_file)
+
+            with override_settings(TEMPLATE_LANG_FILES_MANIFEST=manifest_path):
+                eq_(get_template_manifest(), {'the/dude.html': ['walter']})
+                # kept in memory
+                os.remove(manifest_path)
+                eq_(get_template_manifest(), {'the/dude.html': ['walter']})
+        finally:
+            shutil.rmtree(tempdir)
+
+    @override_settings(TEMPLATE_LANG_FILES_MANIFEST='/does/not/exist.json')
+    def test_get_template_manifest_missing(self):
+        eq_(get_template_manifest(), {})
+
+    @patch('lib.l10n_utils.gettext.get_template')
+    @patch('lib.l10n_utils.gettext.parse_template')
+    @patch('lib.l10n_utils.gettext.get_template_manifest')
+    def test_template_lang_files(self, manifest_mock, parse_template_mock, get_template_mock):
+        """Templates in the manifest should not be loaded or parsed."""
+        manifest_mock.return_value = {'the/dude.html': ['walter'], 'the/bums.html': []}
+        eq_(template_lang_files('the/dude.html'), ['walter'])
+        eq_(template_lang_files('the/bums.html'), [])
+        ok_(not parse_template_mock.called)
+        ok_(not get_template_mock.called)
+
+        parse_template_mock.return_value = ['donnie']
+        get_template_mock.return_value.filename = '/templates/the/rug.html'
+        eq_(template_lang_files('the/rug.html'), ['donnie'])
+        get_template_mock.assert_called_once_with('the/rug.html')
+        parse_template_mock.assert_called_once_with('/templates/the/rug.html')
+
 
 class TestParsePython(TempFileMixin, TestCase):
     @patch('lib.l10n_utils.gettext.codecs')
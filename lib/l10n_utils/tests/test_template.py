@@ -4,7 +4,6 @@
 
 import os
 
-from django.template import TemplateDoesNotExist
 from django.test import RequestFactory, override_settings
 
 from jingo import get_env
@@ -15,7 +14,8 @@ from nose.plugins.skip import SkipTest
 from nose.tools import eq_, ok_
 from pyquery import PyQuery as pq
 
-from lib.l10n_utils import render
+from lib.l10n_utils import get_template_names, localized_template, render
+from lib.l10n_utils.dotlang import catalogs
 from bedrock.mozorg.tests import TestCase
 
 
@@ -131,49 +131,107 @@ class TestNoLocale(TestCase):
 @patch.object(get_env(), 'loader', FileSystemLoader(TEMPLATE_DIRS))
 @patch('lib.l10n_utils.template_is_active', Mock(return_value=True))
 @patch('lib.l10n_utils.django_render')
+@patch('lib.l10n_utils.get_template_names')
 class TestLocaleTemplates(TestCase):
     def setUp(self):
         self.rf = RequestFactory()
 
-    def test_enUS_render(self, django_render):
+    def test_enUS_render(self, names_mock, django_render):
         """
         en-US requests do not look for localized templates and should render the
         originally requested template.
         """
+        names_mock.return_value = {'en-US/templates/firefox/new.html'}
         request = self.rf.get('/')
         request.locale = 'en-US'
         render(request, 'firefox/new.html')
-        django_render.assert_called_with(request, 'firefox/new.html', ANY)
+        django_render.assert_called_once_with(request, 'firefox/new.html', ANY)
 
-    def test_default_render(self, django_render):
+    def test_default_render(self, names_mock, django_render):
         """
         Non en-US requests without l10n or locale template should render the
         originally requested template.
         """
-        django_render.side_effect = [TemplateDoesNotExist, TemplateDoesNotExist,
-                                     True]
+        names_mock.return_value = {'firefox/new.html', 'firefox/new.es-ES.html'}
         request = self.rf.get('/')
         request.locale = 'de'
         render(request, 'firefox/new.html')
-        django_render.assert_called_with(request, 'firefox/new.html', ANY)
+        django_render.assert_called_once_with(request, 'firefox/new.html', ANY)
 
-    def test_bedrock_locale_render(self, django_render):
+    def test_bedrock_locale_render(self, names_mock, django_render):
         """
         Non en-US requests with a locale-specific template should render the
         locale-specific template.
         """
-        django_render.side_effect = [TemplateDoesNotExist, True]
+        names_mock.return_value = {'firefox/new.html', 'firefox/new.es-ES.html'}
         request = self.rf.get('/')
         request.locale = 'es-ES'
         render(request, 'firefox/new.html')
-        django_render.assert_called_with(request, 'firefox/new.es-ES.html', ANY)
+        django_render.assert_called_once_with(request, 'firefox/new.es-ES.html', ANY)
 
-    def test_l10n_render(self, django_render):
+    def test_l10n_render(self, names_mock, django_render):
         """
         Non en-US requests with an l10n template should render the l10n
         template.
         """
+        names_mock.return_value = {'firefox/new.html', 'firefox/new.es-ES.html',
+                                   'es-ES/templates/firefox/new.html'}
         request = self.rf.get('/')
         request.locale = 'es-ES'
         render(request, 'firefox/new.html')
-        django_render.assert_called_with(request, 'es-ES/templates/firefox/new.html', ANY)
+        django_render.assert_called_once_with(request, 'es-ES/templates/firefox/new.html', ANY)
+
+    def test_l10n_render_not_html(self, names_mock, django_render):
+        """
+        Templates other than .html aren't listed, so their l10n templates
+        should be found by the loaders.
+        """
+        names_mock.return_value = set()
+        request = self.rf.get('/')
+        request.locale = 'de'
+        render(request, 'tabzilla/transbar.jsonp')
+        django_render.assert_called_once_with(request, 'de/templates/tabzilla/transbar.jsonp',
+                                              ANY)
+        ok_(not names_mock.called)
+
+        django_render.reset_mock()
+        request.locale = 'fr'
+        render(request, 'tabzilla/transbar.jsonp')
+        django_render.assert_called_once_with(request, 'tabzilla/transbar.jsonp', ANY)
+
+
+@override_settings(ROOT=ROOT)
+class TestTemplateNames(TestCase):
+    def setUp(self):
+        catalogs.clear()
+
+    @patch('lib.l10n_utils.list_templates')
+    def test_template_names_cached(self, list_mock):
+        """Templates should be listed once until the l10n version changes."""
+        list_mock.return_value = {'firefox/new.html'}
+        eq_(get_template_names(), {'firefox/new.html'})
+        eq_(get_template_names(), {'firefox/new.html'})
+        eq_(list_mock.call_count, 1)
+        with patch.object(catalogs, 'version', 'new version'):
+            with patch.object(catalogs, 'check_version'):
+                get_template_names()
+        eq_(list_mock.call_count, 2)
+
+    @patch('lib.l10n_utils.get_env')
+    @patch('lib.l10n_utils.list_templates')
+    def test_localized_template_uses_names(self, list_mock, env_mock):
+        """
+        The localized template should be found in the list of templates,
+        without asking the loaders for templates that don't exist.
+        """
+        list_mock.return_value = {'mozorg/home/home.html',
+                                  'de/templates/mozorg/home/home.html',
+                                  'mozorg/home/home.fr.html'}
+        template = 'mozorg/home/home.html'
+        eq_(localized_template(template, 'de'), 'de/templates/mozorg/home/home.html')
+        eq_(localized_template(template, 'fr'), 'mozorg/home/home.fr.html')
+        for locale in ['es-ES', 'it', 'ja', 'pl', 'pt-BR', 'ru', 'zh-TW']:
+            eq_(localized_template(template, locale), template)
+
+        eq_(list_mock.call_count, 1)
+        ok_(not env_mock.called)
@@ -1,6 +1,8 @@
+from django.core.cache import cache
 from django.test.utils import override_settings
 
-from mock import Mock, patch
+from mock import patch
+from nose.tools import eq_, ok_
 
 from bedrock.firefox.models import FirefoxOSFeedLink
 from bedrock.mozorg.tests import TestCase
@@ -9,38 +11,61 @@ from scripts import update_firefox_os_feeds
 
 
 class TestUpdateFirefoxOSFeeds(TestCase):
+    def tearDown(self):
+        cache.clear()
+
+    def feed_links(self, locale):
+        return list(FirefoxOSFeedLink.objects.filter(locale=locale).order_by(
+            'id').values_list('link', 'title'))
+
     @override_settings(FIREFOX_OS_FEEDS=[('xx', 'http://example.com/feed'),
                                          ('yy', 'http://example.com/feed2')])
     @patch('scripts.update_firefox_os_feeds.create_or_update_fxos_feed_links')
-    @patch('scripts.update_firefox_os_feeds.parse')
-    def test_run_exception_handling(self, parse, create_or_update_fxos_feed_links):
-        parse.side_effect = [Exception('test'), 'parsed feed']
+    @patch('scripts.update_firefox_os_feeds.parse_feeds')
+    def test_run_exception_handling(self, parse_feeds, create_or_update_fxos_feed_links):
+        parse_feeds.return_value = {'http://example.com/feed2': 'parsed feed'}
         update_firefox_os_feeds.run()
-        create_or_update_fxos_feed_links.assert_called_with('yy', 'parsed feed')
-
-    @patch('scripts.update_firefox_os_feeds.create_or_update_fxos_feed_link')
-    def test_create_or_update_fxos_feed_links(
-            self, create_or_update_fxos_feed_link):
-        update_firefox_os_feeds.create_or_update_fxos_feed_links(
-            'xx',
-            {'entries': [{}, {'link': 'http://example.com', 'title': 'Title'}]})
-        create_or_update_fxos_feed_link.assert_called_with(
-            'xx', 'http://example.com', 'Title')
-
-    @patch('scripts.update_firefox_os_feeds.FirefoxOSFeedLink.objects')
-    def test_create_or_update_fxos_feed_link(self, objects):
-        objects.get_or_create.return_value = ('feed_link', True)
-        update_firefox_os_feeds.create_or_update_fxos_feed_link(
-            'xx', 'http://example.com', 'Title')
-        objects.get_or_create.assert_called_with(
-            locale='xx', link='http://example.com', defaults={'title': 'Title'})
-
-    @patch('scripts.update_firefox_os_feeds.FirefoxOSFeedLink.objects')
-    def test_create_or_update_fxos_feed_link_update_title(self, objects):
-        feed_link = Mock(title='Old Title')
-        objects.get_or_create.return_value = (feed_link, False)
-        update_firefox_os_feeds.create_or_update_fxos_feed_link(
-            'xx', 'http://example.com', 'Title')
-        objects.get_or_create.assert_called_with(
-            locale='xx', link='http://example.com', defaults={'title': 'Title'})
-        feed_link.save.assert_called_with(update_fields=['title'])
+        create_or_update_fxos_feed_links.assert_called_once_with('yy', 'parsed feed')
+
+    @override_settings(FIREFOX_OS_FEEDS=[('xx', 'http://example.com/feed'),
+                                         ('yy', 'http://example.com/feed2')])
+    @patch('scripts.update_firefox_os_feeds.create_or_update_fxos_feed_links')
+    @patch('scripts.update_firefox_os_feeds.parse_feeds')
+    def test_run_invalidates_changed_locales(self, parse_feeds,
+                                             create_or_update_fxos_feed_links):
+        """Only the cached links of locales that changed should be dropped."""
+        parse_feeds.return_value = {'http://example.com/feed': 'parsed feed',
+                                    'http://example.com/feed2': None}
+        create_or_update_fxos_feed_links.return_value = True
+        cache.set('firefox-os-feed-links-xx', ['dude'])
+        cache.set('firefox-os-feed-links-yy', ['walter'])
+        update_firefox_os_feeds.run()
+        create_or_update_fxos_feed_links.assert_called_once_with('xx', 'parsed feed')
+        eq_(cache.get('firefox-os-feed-links-xx'), None)
+        eq_(cache.get('firefox-os-feed-links-yy'), ['walter'])
+
+    def test_create_or_update_fxos_feed_links(self):
+        FirefoxOSFeedLink.objects.create(locale='xx', link='http://example.com/1',
+                                         title='Old Title')
+        FirefoxOSFeedLink.objects.create(locale='yy', link='http://example.com/2',
+                                         title='Title 2')
+        changed = update_firefox_os_feeds.create_or_update_fxos_feed_links('xx', {
+            'entries': [
+                {},
+                {'link': 'http://example.com/2', 'title': 'Title 2'},
+                {'link': 'http://example.com/1', 'title': 'Title 1'},
+                {'link': 'http://example.com/3'},
+            ]})
+        ok_(changed)
+        eq_(self.feed_links('xx'), [('http://example.com/1', 'Title 1'),
+                                    ('http://example.com/2', 'Title 2')])
+        eq_(self.feed_links('yy'), [('http://example.com/2', 'Title 2')])
+
+    def test_create_or_update_fxos_feed_links_unchanged(self):
+        FirefoxOSFeedLink.objects.create(locale='xx', link='http://example.com/1',
+                                         title='Title 1')
+        with self.assertNumQueries(1):
+            changed = update_firefox_os_feeds.create_or_update_fxos_feed_links('xx', {
+                'entries': [{'link': 'http://example.com/1', 'title': 'Title 1'}]})
+        ok_(not changed)
+        eq_(self.feed_links('xx'), [('http://example.com/1', 'Title 1')])
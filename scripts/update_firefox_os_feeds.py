@@ -1,33 +1,80 @@
 from __future__ import print_function
 
 from django.conf import settings
-
-from feedparser import parse
+from django.core.cache import cache
+from django.db import transaction
 
 from bedrock.firefox.models import FirefoxOSFeedLink
+from bedrock.mozorg.feed_ingest import forget_validators, parse_feeds
 
 
-def create_or_update_fxos_feed_link(locale, link, title):
-    feed_link, created = FirefoxOSFeedLink.objects.get_or_create(
-        locale=locale, link=link, defaults={'title': title}) 
-    if not created and title != feed_link.title:
-        feed_link.title = title
-        feed_link.save(update_fields=['title'])
+def feed_links_cache_key(locale):
+    return 'firefox-os-feed-links-' + locale
 
 
-def create_or_update_fxos_feed_links(locale, parsed_feed):
+def get_fxos_feed_links(parsed_feed):
+    """Return the (link, title) of every entry with both, in feed order."""
+    links = []
+    seen = set()
     for entry in parsed_feed.get('entries', []):
         link = entry.get('link')
         title = entry.get('title')
-        if link and title:
-            create_or_update_fxos_feed_link(locale, link, title)
+        if link and title and link not in seen:
+            seen.add(link)
+            links.append((link, title))
+
+    return links
+
+
+def create_or_update_fxos_feed_links(locale, parsed_feed):
+    """
+    Add the new links of the feed and update the changed titles, reading the
+    existing links of the locale in one query.
+
+    :return: True if the links of the locale changed.
+    """
+    links = get_fxos_feed_links(parsed_feed)
+    if not links:
+        return False
+
+    feed_links = FirefoxOSFeedLink.objects.filter(locale=locale)
+    feed_links_in_feed = feed_links.filter(link__in=[link for link, title in links])
+    existing = dict(feed_links_in_feed.values_list('link', 'title'))
+    new_links = [FirefoxOSFeedLink(locale=locale, link=link, title=title)
+                 for link, title in links if link not in existing]
+    new_titles = [(link, title) for link, title in links
+                  if link in existing and existing[link] != title]
+    if not (new_links or new_titles):
+        return False
+
+    with transaction.atomic():
+        for link, title in new_titles:
+            feed_links.filter(link=link).update(title=title)
+        FirefoxOSFeedLink.objects.bulk_create(new_links)
+
+    return True
 
 
 def run(*args):
+    urls = [url for locale, url in settings.FIREFOX_OS_FEEDS]
+    parsed_feeds = parse_feeds(urls)
+    changed_locales = []
     for locale, url in settings.FIREFOX_OS_FEEDS:
-        try:
-            parsed_feed = parse(url)
-        except:
+        if url not in parsed_feeds:
             print('Unable to fetch and parse ' + url)
-        else:
-            create_or_update_fxos_feed_links(locale, parsed_feed)
+            continue
+
+        parsed_feed = parsed_feeds[url]
+        if parsed_feed is None:
+            # not modified since the last run
+            continue
+
+        try:
+            if create_or_update_fxos_feed_links(locale, parsed_feed):
+                changed_locales.append(locale)
+        except Exception:
+            forget_validators(url)
+            raise
+
+    if changed_locales:
+        cache.delete_many([feed_links_cache_key(locale) for locale in changed_locales])
@@ -24,6 +24,16 @@ from django.core.wsgi import get_wsgi_application
 from bedrock.base.static import BedrockWhiteNoise
 
 application = get_wsgi_application()
+
+# read the tags of all lang files and list the templates before the first
+# request needs them
+from lib.l10n_utils import get_template_names
+from lib.l10n_utils.dotlang import get_lang_file_index
+get_lang_file_index()
+get_template_names()
+# send requests without a locale in the URL to one before Django handles them
+from bedrock.base.locale_redirect import LocaleRedirector
+application = LocaleRedirector(application)
 application = BedrockWhiteNoise(application)
 
 if newrelic: